@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Almacén de Gráficos
+===================
+
+Guarda las imágenes dibujadas con matplotlib en .cache/graficos, con el hash de
+todo aquello de lo que dependen como nombre:
+- Tipo de gráfico, datos (resultados o resumen de la convocatoria) y título
+- Colores, etiquetas y versión del estilo (huella_estilo)
+- Tamaño (TAMANOS_GRAFICOS), formato, resolución y compresión (CONFIG_GRAFICOS) y versión de matplotlib
+
+Antes de dibujar un gráfico se busca en el almacén; si ya se dibujó (en una
+ejecución anterior, en otro informe o en otro fragmento) se enlaza (enlace duro)
+o, si no se puede, se copia en output/graficos. Así, volver a generar los
+informes tras cambios que no afectan a un gráfico no vuelve a dibujarlo, aunque
+la carpeta output se haya borrado.
+
+Las imágenes del almacén nunca se modifican: renderizado_graficos borra el
+archivo de destino antes de dibujar, para no escribir a través de un enlace.
+
+Uso desde la línea de comandos:
+    python almacen_graficos.py info
+    python almacen_graficos.py limitar 200      # Dejar como mucho 200 MB
+    python almacen_graficos.py vaciar
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import shutil
+import argparse
+import tempfile
+
+from construccion_incremental import calcular_huella, huella_estilo
+from config import (
+    DIRECTORIO_CACHE, SUBDIRECTORIO_CACHE_GRAFICOS, CACHE_GRAFICOS, CACHE_GRAFICOS_MAX_MB,
+    TAMANOS_GRAFICOS, CONFIG_GRAFICOS, ASIGNATURAS, TEXTOS
+)
+
+# Incrementar si cambia la forma de calcular las claves
+VERSION_ALMACEN = 1
+
+def version_matplotlib():
+    """
+    Versión de matplotlib instalada (sin importarlo), o "" si no está instalado.
+    """
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        return version("matplotlib")
+    except PackageNotFoundError:
+        return ""
+
+def _normalizar(valor):
+    """
+    Convierte los arrays y escalares de numpy (p.ej. los porcentajes del resumen de
+    una convocatoria) en listas y números, para que la clave no dependa de su repr.
+    """
+    if isinstance(valor, dict):
+        return {str(clave): _normalizar(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    if hasattr(valor, "tolist"):
+        return valor.tolist()
+    return valor
+
+def clave_grafico(trabajo):
+    """
+    Calcula la clave de un gráfico en el almacén.
+
+    Args:
+        trabajo (dict): Trabajo de gráfico (ver renderizado_graficos)
+
+    Returns:
+        str: Hash en hexadecimal
+    """
+    tipo = trabajo["tipo"]
+    partes = {
+        "version": VERSION_ALMACEN,
+        "tipo": tipo,
+        "datos": _normalizar(trabajo["datos"]),
+        "titulo": trabajo["titulo"],
+        "formato": os.path.splitext(trabajo["ruta"])[1].lower(),
+        "estilo": huella_estilo(),
+        "tamano": TAMANOS_GRAFICOS.get(tipo),
+        "salida": CONFIG_GRAFICOS,
+        "matplotlib": version_matplotlib(),
+    }
+    if tipo == "tendencias":
+        # Las leyendas y el eje usan los nombres de las asignaturas y los textos de config.py
+        partes["asignaturas"] = {codigo: ASIGNATURAS.get(codigo, "") for codigo in trabajo["datos"]}
+        partes["eje"] = TEXTOS["eje_curso"]
+    return calcular_huella(partes)
+
+def _enlazar(origen, destino):
+    """
+    Instala `origen` en `destino` con un enlace duro (o una copia si no se puede),
+    sustituyendo de forma atómica el archivo que hubiera.
+    """
+    directorio = os.path.dirname(destino) or "."
+    os.makedirs(directorio, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, prefix=f".{os.path.basename(destino)}.")
+    os.close(descriptor)
+    os.remove(temporal)
+    try:
+        try:
+            os.link(origen, temporal)
+        except OSError:
+            shutil.copyfile(origen, temporal)  # Otro sistema de archivos o sin enlaces duros
+        os.replace(temporal, destino)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+class AlmacenGraficos:
+    """
+    Imágenes de gráficos indexadas por su clave (ver clave_grafico).
+
+    Args:
+        directorio (str): Carpeta del almacén (None = .cache/graficos)
+    """
+
+    def __init__(self, directorio=None):
+        self.directorio = directorio or os.path.join(DIRECTORIO_CACHE, SUBDIRECTORIO_CACHE_GRAFICOS)
+
+    def ruta(self, clave, formato):
+        """
+        Ruta de una imagen del almacén (repartidas en subcarpetas por los dos primeros caracteres).
+        """
+        return os.path.join(self.directorio, clave[:2], f"{clave}{formato}")
+
+    def instalar(self, clave, destino):
+        """
+        Enlaza o copia en `destino` la imagen del almacén, si existe.
+
+        Returns:
+            bool: True si estaba en el almacén
+        """
+        ruta = self.ruta(clave, os.path.splitext(destino)[1].lower())
+        if not os.path.exists(ruta):
+            return False
+        _enlazar(ruta, destino)
+        os.utime(ruta)  # Usada recientemente (ver limitar)
+        return True
+
+    def guardar(self, clave, origen):
+        """
+        Añade al almacén la imagen recién dibujada en `origen`.
+        """
+        _enlazar(origen, self.ruta(clave, os.path.splitext(origen)[1].lower()))
+
+    def imagenes(self):
+        """
+        Devuelve las imágenes del almacén.
+
+        Returns:
+            list: Tuplas (ruta, bytes, fecha de último uso)
+        """
+        imagenes = []
+        if not os.path.isdir(self.directorio):
+            return imagenes
+        for subcarpeta in os.scandir(self.directorio):
+            if not subcarpeta.is_dir():
+                continue
+            for entrada in os.scandir(subcarpeta.path):
+                if entrada.is_file() and not entrada.name.startswith("."):
+                    estado = entrada.stat()
+                    imagenes.append((entrada.path, estado.st_size, estado.st_mtime))
+        return imagenes
+
+    def limitar(self, max_mb=CACHE_GRAFICOS_MAX_MB):
+        """
+        Elimina las imágenes usadas hace más tiempo hasta dejar el almacén en max_mb.
+        Los enlaces ya instalados en output no se ven afectados.
+
+        Returns:
+            int: Número de imágenes eliminadas
+        """
+        imagenes = sorted(self.imagenes(), key=lambda imagen: imagen[2], reverse=True)
+        limite = max(0, max_mb) * 2**20
+        total = 0
+        eliminadas = 0
+        for ruta, tamano, _ in imagenes:
+            total += tamano
+            if total > limite:
+                os.remove(ruta)
+                eliminadas += 1
+        return eliminadas
+
+    def vaciar(self):
+        """
+        Elimina todo el almacén.
+
+        Returns:
+            int: Número de imágenes eliminadas
+        """
+        eliminadas = len(self.imagenes())
+        shutil.rmtree(self.directorio, ignore_errors=True)
+        return eliminadas
+
+# Almacén del proceso (None si CACHE_GRAFICOS está desactivado)
+_almacen = None
+
+def obtener_almacen():
+    """
+    Devuelve el almacén compartido por todos los gráficos del proceso, o None si
+    el almacén está desactivado (CACHE_GRAFICOS = False).
+    """
+    global _almacen
+    if CACHE_GRAFICOS and _almacen is None:
+        _almacen = AlmacenGraficos()
+    return _almacen
+
+def limitar_almacen():
+    """
+    Mantiene el almacén del proceso dentro de CACHE_GRAFICOS_MAX_MB tras dibujar gráficos nuevos.
+    """
+    almacen = obtener_almacen()
+    if almacen is not None:
+        try:
+            almacen.limitar()
+        except OSError:
+            pass
+
+def main():
+    """
+    Punto de entrada para gestionar el almacén desde la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Gestiona el almacén de gráficos dibujados")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    subparsers.add_parser("info", help="Muestra el estado del almacén")
+    subparsers.add_parser("vaciar", help="Elimina todas las imágenes del almacén")
+    p_limitar = subparsers.add_parser("limitar", help="Reduce el almacén a un tamaño máximo")
+    p_limitar.add_argument("max_mb", type=float, nargs="?", default=CACHE_GRAFICOS_MAX_MB)
+    args = parser.parse_args()
+
+    almacen = AlmacenGraficos()
+    if args.comando == "info":
+        imagenes = almacen.imagenes()
+        print(f"🖼️  Almacén de gráficos: {almacen.directorio}")
+        print(f"  Imágenes: {len(imagenes)}")
+        print(f"  Tamaño: {sum(tamano for _, tamano, _ in imagenes) / 2**20:.1f} MB "
+              f"(máximo: {CACHE_GRAFICOS_MAX_MB} MB)")
+    elif args.comando == "vaciar":
+        print(f"🧹 Eliminadas {almacen.vaciar()} imágenes del almacén")
+    elif args.comando == "limitar":
+        eliminadas = almacen.limitar(args.max_mb)
+        print(f"✂️  Eliminadas {eliminadas} imágenes (máximo {args.max_mb} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Archivo Histórico de Resultados
+===============================
+
+Guarda los conteos extraídos de cada curso en un archivo Parquet columnar,
+particionado por curso académico y convocatoria:
+
+    historico/
+    ├── anyo=2023/
+    │   ├── convocatoria=1Q1/datos.parquet
+    │   └── ...
+    └── anyo=2024/
+        └── ...
+
+Cada fila es un acta (asignatura y grupo) con los conteos de cada categoría.
+Volver a archivar un curso y una convocatoria sustituye su partición, así que
+archivar es idempotente. Las consultas leen solo las particiones y columnas
+necesarias, de modo que las tendencias de varios cursos se obtienen sin volver
+a leer ningún Excel.
+
+Requiere el paquete opcional pyarrow (pip install pyarrow).
+
+Uso:
+    python archivo_historico.py archivar                           # excels/ como curso ANYO_ACADEMICO
+    python archivo_historico.py archivar --anyo 2022 --excels excels_2022
+    python archivo_historico.py tendencia 34156                    # Tasa de aprobados por curso
+    python archivo_historico.py tendencia 34156 --por-convocatoria --json
+    python archivo_historico.py info
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime
+
+from extraer_resultado_de_excel import obtener_info_asignatura
+from config import (
+    DIRECTORIO_HISTORICO, ANYO_ACADEMICO, CATEGORIAS_APROBADO, ETIQUETAS_RESULTADOS,
+    TIPOS_CONVOCATORIAS
+)
+
+ARCHIVO_PARTICION = "datos.parquet"
+
+def etiqueta_curso(anyo):
+    """
+    Etiqueta de un curso académico a partir de su año de inicio (2024 -> "2024-25").
+    """
+    return f"{anyo}-{(anyo + 1) % 100:02d}"
+
+def _pyarrow():
+    """
+    Importa pyarrow (solo cuando se usa el archivo histórico).
+
+    Returns:
+        tuple: Módulos (pyarrow, pyarrow.parquet, pyarrow.dataset, pyarrow.compute)
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        import pyarrow.dataset as ds
+        import pyarrow.compute as pc
+    except ImportError as e:
+        raise RuntimeError(f"El archivo histórico necesita pyarrow ({e}). "
+                           "Puedes instalarlo con: pip install pyarrow")
+    return pa, pq, ds, pc
+
+def _esquema_particiones():
+    """
+    Esquema de las particiones (curso y convocatoria), fijado para que una carpeta
+    como "1" no se interprete como número.
+    """
+    pa, _, ds, _ = _pyarrow()
+    return ds.partitioning(pa.schema([("anyo", pa.int16()), ("convocatoria", pa.string())]), flavor="hive")
+
+def registros_conjunto(conjunto):
+    """
+    Convierte un conjunto de datos (ver conjunto_datos) en filas del archivo.
+
+    Args:
+        conjunto (dict): Conjunto de datos extraído
+
+    Returns:
+        dict: {carpeta: [fila, ...]} con una fila por acta extraída sin errores
+    """
+    filas = {}
+    for carpeta, info in conjunto["carpetas"].items():
+        for archivo in info["archivos"]:
+            resultados, error = conjunto["extracciones"][archivo]
+            if error is not None:
+                continue
+            codigo, nombre, grupo, _ = obtener_info_asignatura(archivo)
+            fila = {"asignatura": codigo, "nombre": nombre, "grupo": grupo}
+            for categoria in ETIQUETAS_RESULTADOS:
+                fila[categoria] = int(resultados.get(categoria, 0))
+            fila["total"] = sum(fila[categoria] for categoria in ETIQUETAS_RESULTADOS)
+            fila["archivo"] = os.path.basename(archivo)
+            filas.setdefault(carpeta, []).append(fila)
+    return filas
+
+def archivar_conjunto(conjunto, anyo=None, directorio=None):
+    """
+    Guarda los conteos de un conjunto de datos como el curso `anyo`.
+    Las particiones (curso, convocatoria) que ya existían se sustituyen.
+
+    Args:
+        conjunto (dict): Conjunto de datos extraído (ver conjunto_datos)
+        anyo (int): Año de inicio del curso académico (None = ANYO_ACADEMICO)
+        directorio (str): Directorio del archivo (None = DIRECTORIO_HISTORICO)
+
+    Returns:
+        dict: {carpeta: número de actas archivadas}
+    """
+    pa, pq, _, _ = _pyarrow()
+    anyo = ANYO_ACADEMICO if anyo is None else int(anyo)
+    directorio = directorio or DIRECTORIO_HISTORICO
+    archivado = datetime.now().isoformat(timespec="seconds")
+
+    archivadas = {}
+    for carpeta, filas in registros_conjunto(conjunto).items():
+        # Ordenadas por asignatura: las estadísticas de cada grupo de filas permiten
+        # saltarse los bloques que no contienen la asignatura consultada
+        filas.sort(key=lambda fila: (fila["asignatura"], fila["grupo"]))
+        columnas = {
+            "asignatura": pa.array([f["asignatura"] for f in filas], pa.string()),
+            "nombre": pa.array([f["nombre"] for f in filas], pa.string()),
+            "grupo": pa.array([f["grupo"] for f in filas], pa.string()),
+        }
+        for categoria in list(ETIQUETAS_RESULTADOS) + ["total"]:
+            columnas[categoria] = pa.array([f[categoria] for f in filas], pa.int32())
+        columnas["archivo"] = pa.array([f["archivo"] for f in filas], pa.string())
+        columnas["archivado"] = pa.array([archivado] * len(filas), pa.string())
+
+        destino = os.path.join(directorio, f"anyo={anyo}", f"convocatoria={carpeta}")
+        os.makedirs(destino, exist_ok=True)
+        ruta = os.path.join(destino, ARCHIVO_PARTICION)
+        # Escribir en un temporal y renombrar: una partición nunca queda a medias
+        temporal = os.path.join(destino, f".{ARCHIVO_PARTICION}.tmp")  # Oculto: el dataset lo ignora
+        pq.write_table(pa.table(columnas), temporal, compression="zstd")
+        os.replace(temporal, ruta)
+        archivadas[carpeta] = len(filas)
+
+    return archivadas
+
+def consultar(asignaturas=None, anyos=None, convocatorias=None, columnas=None, directorio=None):
+    """
+    Lee del archivo las filas pedidas. Solo se abren las particiones de los cursos
+    y convocatorias indicados, y solo se leen las columnas indicadas.
+
+    Args:
+        asignaturas (list): Códigos de asignatura (None = todas)
+        anyos (list): Cursos (None = todos)
+        convocatorias (list): Carpetas de convocatoria (None = todas)
+        columnas (list): Columnas a leer, además de "anyo" y "convocatoria" (None = todas)
+        directorio (str): Directorio del archivo (None = DIRECTORIO_HISTORICO)
+
+    Returns:
+        pyarrow.Table: Filas encontradas (tabla vacía si el archivo no existe)
+    """
+    pa, _, ds, _ = _pyarrow()
+    directorio = directorio or DIRECTORIO_HISTORICO
+    if not os.path.isdir(directorio):
+        return pa.table({"anyo": pa.array([], pa.int16()), "convocatoria": pa.array([], pa.string())})
+
+    dataset = ds.dataset(directorio, format="parquet", partitioning=_esquema_particiones())
+    filtro = None
+    for campo, valores in (("anyo", anyos), ("convocatoria", convocatorias), ("asignatura", asignaturas)):
+        if valores is not None:
+            condicion = ds.field(campo).isin(list(valores))
+            filtro = condicion if filtro is None else filtro & condicion
+    if columnas is not None:
+        columnas = ["anyo", "convocatoria"] + [c for c in columnas if c not in ("anyo", "convocatoria")]
+    return dataset.to_table(columns=columnas, filter=filtro)
+
+def tendencia(codigo, categorias=None, anyos=None, convocatorias=None, por_convocatoria=False,
+              directorio=None):
+    """
+    Evolución de la proporción de estudiantes de una asignatura en unas categorías
+    (por defecto, la tasa de aprobados AP+NO+EX+MH sobre el total, NP incluidos).
+
+    Args:
+        codigo (str): Código de la asignatura
+        categorias (list): Categorías que se suman (None = CATEGORIAS_APROBADO)
+        anyos (list): Cursos a consultar (None = todos)
+        convocatorias (list): Carpetas de convocatoria (None = todas)
+        por_convocatoria (bool): Si True, una fila por curso y convocatoria; si no, por curso
+        directorio (str): Directorio del archivo (None = DIRECTORIO_HISTORICO)
+
+    Returns:
+        list: [{"anyo", ("convocatoria",) "seleccion", "total", "tasa"}, ...] ordenada por curso
+    """
+    return tendencias([codigo], categorias, anyos, convocatorias, por_convocatoria,
+                      directorio).get(str(codigo), [])
+
+def tendencias(codigos, categorias=None, anyos=None, convocatorias=None, por_convocatoria=False,
+               directorio=None):
+    """
+    Como tendencia, para varias asignaturas con una sola lectura del archivo.
+
+    Returns:
+        dict: {codigo: [{"anyo", ("convocatoria",) "seleccion", "total", "tasa"}, ...]}
+    """
+    categorias = list(categorias or CATEGORIAS_APROBADO)
+    codigos = [str(codigo) for codigo in codigos]
+    tabla = consultar(asignaturas=codigos, anyos=anyos, convocatorias=convocatorias,
+                      columnas=["asignatura", "total"] + categorias, directorio=directorio)
+    if tabla.num_rows == 0:
+        return {}
+
+    _, _, _, pc = _pyarrow()
+    seleccion = tabla.column(categorias[0])
+    for categoria in categorias[1:]:
+        seleccion = pc.add(seleccion, tabla.column(categoria))
+    tabla = tabla.append_column("seleccion", seleccion)
+
+    claves = ["asignatura", "anyo"] + (["convocatoria"] if por_convocatoria else [])
+    agregada = tabla.group_by(claves).aggregate([("seleccion", "sum"), ("total", "sum")]).to_pylist()
+
+    resultado = {}
+    for fila in sorted(agregada, key=lambda f: tuple(f[clave] for clave in claves)):
+        punto = {"anyo": fila["anyo"]}
+        if por_convocatoria:
+            punto["convocatoria"] = fila["convocatoria"]
+        punto["seleccion"] = fila["seleccion_sum"]
+        punto["total"] = fila["total_sum"]
+        punto["tasa"] = fila["seleccion_sum"] / fila["total_sum"] * 100 if fila["total_sum"] else 0.0
+        resultado.setdefault(fila["asignatura"], []).append(punto)
+    return resultado
+
+def info_historico(directorio=None):
+    """
+    Resumen del contenido del archivo.
+
+    Returns:
+        dict: {"cursos": {anyo: {carpeta: actas}}, "actas": total, "bytes": tamaño en disco}
+    """
+    directorio = directorio or DIRECTORIO_HISTORICO
+    tabla = consultar(columnas=[], directorio=directorio)
+    cursos = {}
+    for fila in tabla.group_by(["anyo", "convocatoria"]).aggregate([([], "count_all")]).to_pylist():
+        cursos.setdefault(fila["anyo"], {})[fila["convocatoria"]] = fila["count_all"]
+    tamano = 0
+    for raiz, _, archivos in os.walk(directorio):
+        tamano += sum(os.path.getsize(os.path.join(raiz, nombre)) for nombre in archivos)
+    return {"cursos": dict(sorted(cursos.items())), "actas": tabla.num_rows, "bytes": tamano}
+
+def main():
+    """
+    Gestión del archivo histórico desde la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Archivo histórico de resultados (Parquet)")
+    parser.add_argument("--directorio", default=None,
+                        help=f"Directorio del archivo (por defecto, {DIRECTORIO_HISTORICO})")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    archivar = subparsers.add_parser("archivar", help="Extrae los Excel de un curso y los guarda en el archivo")
+    archivar.add_argument("--anyo", type=int, default=None,
+                          help=f"Año de inicio del curso (por defecto, {ANYO_ACADEMICO})")
+    archivar.add_argument("--excels", default=None, help="Directorio de los Excel del curso (por defecto, excels)")
+    archivar.add_argument("-j", "--jobs", type=int, default=None, help="Procesos para extraer los Excel")
+
+    consulta = subparsers.add_parser("tendencia", help="Evolución de una asignatura a lo largo de los cursos")
+    consulta.add_argument("codigo", help="Código de la asignatura")
+    consulta.add_argument("--categorias", nargs="+", choices=list(ETIQUETAS_RESULTADOS), default=None,
+                          help=f"Categorías que se suman (por defecto, {'+'.join(CATEGORIAS_APROBADO)})")
+    consulta.add_argument("--convocatorias", nargs="+", choices=list(TIPOS_CONVOCATORIAS), default=None,
+                          help="Limitar a estas convocatorias")
+    consulta.add_argument("--por-convocatoria", action="store_true", help="Separar por convocatoria")
+    consulta.add_argument("--json", action="store_true", help="Mostrar el resultado en JSON")
+
+    subparsers.add_parser("info", help="Cursos y convocatorias archivados")
+    args = parser.parse_args()
+
+    if args.comando == "archivar":
+        from conjunto_datos import extraer_conjunto_datos
+        anyo = ANYO_ACADEMICO if args.anyo is None else args.anyo
+        print(f"📂 Extrayendo los Excel del curso {etiqueta_curso(anyo)}...")
+        conjunto = extraer_conjunto_datos(args.jobs, directorio=args.excels)
+        for carpeta, actas in archivar_conjunto(conjunto, anyo, args.directorio).items():
+            print(f"  ✓ {carpeta}: {actas} actas archivadas")
+        print(f"🗄️  Archivo histórico actualizado: {args.directorio or DIRECTORIO_HISTORICO}")
+    elif args.comando == "tendencia":
+        puntos = tendencia(args.codigo, args.categorias, convocatorias=args.convocatorias,
+                           por_convocatoria=args.por_convocatoria, directorio=args.directorio)
+        if args.json:
+            print(json.dumps(puntos, ensure_ascii=False, indent=2))
+        elif not puntos:
+            print(f"⚠️  No hay datos archivados de la asignatura {args.codigo}")
+        else:
+            categorias = "+".join(args.categorias or CATEGORIAS_APROBADO)
+            print(f"📈 {args.codigo}: % {categorias} sobre el total")
+            for punto in puntos:
+                convocatoria = f" {punto['convocatoria']:<4}" if args.por_convocatoria else ""
+                print(f"  {etiqueta_curso(punto['anyo'])}{convocatoria}: "
+                      f"{punto['tasa']:5.1f}% ({punto['seleccion']}/{punto['total']})")
+    else:
+        info = info_historico(args.directorio)
+        print(f"🗄️  Archivo histórico: {info['actas']} actas, {info['bytes'] / 1024:.1f} KB")
+        for anyo, convocatorias in info["cursos"].items():
+            detalle = ", ".join(f"{carpeta}: {actas}" for carpeta, actas in sorted(convocatorias.items()))
+            print(f"  {etiqueta_curso(anyo)}: {detalle}")
+
+if __name__ == "__main__":
+    main()
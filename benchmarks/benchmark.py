@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Benchmark del Sistema de Informes
+=================================
+
+Genera un conjunto de actas sintéticas (ver generar_actas.py) y mide por
+separado cada etapa del proceso:
+- extraccion:                lectura de la columna M y conteo de calificaciones
+- extraccion_cache_fria:     extracción guardando en la caché SQLite vacía
+- extraccion_cache_caliente: extracción con todos los resultados ya en caché
+- canalizacion:              extracción y diagramas de sectores solapados (ver canalizacion.py)
+- graficos_sectores:         un diagrama de sectores por acta (matplotlib)
+- graficos_barras:           un gráfico de barras apiladas por convocatoria (matplotlib)
+- latex_sectores:            construcción de las secciones LaTeX del informe de sectores
+- agregacion_barras:         cubo de resultados y resúmenes por convocatoria del informe de barras
+- latex_barras:              construcción de las secciones LaTeX del informe de barras
+- tikz:                      generación del código TikZ/pgfplots de todos los gráficos
+- informe_completo:          generar_informes() de principio a fin, sin caché
+
+Para cada etapa se guarda el tiempo real (mejor y mediana de varias repeticiones),
+el tiempo de CPU y el pico de memoria reservada por Python (tracemalloc, en una
+pasada adicional para no falsear los tiempos). El pico de memoria solo cubre el
+proceso principal: con --jobs > 1 no incluye la de los procesos auxiliares.
+
+El resultado se escribe en JSON (por defecto benchmarks/resultados/<commit>.json)
+para poder comparar ejecuciones de distintas versiones con --comparar.
+
+Uso:
+    python benchmarks/benchmark.py                                  # Tamaño por defecto
+    python benchmarks/benchmark.py --asignaturas 60 --estudiantes 120 -r 5
+    python benchmarks/benchmark.py --etapas extraccion latex_barras
+    python benchmarks/benchmark.py --comparar benchmarks/resultados/abc1234.json
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import io
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+
+DIRECTORIO_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_REPO)
+
+import extraer_resultado_de_excel
+from generar_actas import generar_actas
+from config import ASIGNATURAS
+
+VERSION_RESULTADOS = 1
+
+def registrar_actas_sinteticas(asignaturas):
+    """
+    Hace visibles para el sistema las asignaturas y grupos de las actas sintéticas:
+    añade los códigos a ASIGNATURAS (el mismo diccionario que usan todos los módulos)
+    y acepta cualquier letra de grupo.
+    """
+    ASIGNATURAS.update(asignaturas)
+    extraer_resultado_de_excel.PATRON_GRUPO = r'_([A-Z])_[^.]*'
+
+def informacion_entorno():
+    """
+    Datos de la ejecución necesarios para comparar resultados entre versiones.
+    """
+    from importlib import metadata
+
+    def git(*argumentos):
+        try:
+            return subprocess.run(["git", *argumentos], cwd=DIRECTORIO_REPO, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    versiones = {}
+    for paquete in ["matplotlib", "numpy", "pandas", "openpyxl"]:
+        try:
+            versiones[paquete] = metadata.version(paquete)
+        except metadata.PackageNotFoundError:
+            versiones[paquete] = None
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "cambios_sin_commit": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "nucleos": os.cpu_count(),
+        "paquetes": versiones,
+    }
+
+def medir(ejecutar, preparar=None, repeticiones=3, memoria=True):
+    """
+    Mide una etapa: tiempo real y de CPU en cada repetición y pico de memoria en
+    una pasada adicional con tracemalloc.
+
+    Args:
+        ejecutar (callable): Función a medir (sin argumentos)
+        preparar (callable): Función que se ejecuta, sin medir, antes de cada pasada
+        repeticiones (int): Número de pasadas cronometradas
+        memoria (bool): Si True, hace la pasada adicional para medir la memoria
+
+    Returns:
+        dict: Medidas de la etapa
+    """
+    tiempos = []
+    tiempos_cpu = []
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        gc.collect()
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        ejecutar()
+        tiempos.append(time.perf_counter() - inicio)
+        tiempos_cpu.append(time.process_time() - inicio_cpu)
+
+    pico = None
+    if memoria:
+        if preparar is not None:
+            preparar()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            ejecutar()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "segundos": min(tiempos),
+        "mediana": statistics.median(tiempos),
+        "repeticiones": tiempos,
+        "cpu_segundos": min(tiempos_cpu),
+        "memoria_pico_mb": pico / 2**20 if pico is not None else None,
+    }
+
+def comprobar_errores(resultados, etapa):
+    """
+    Aborta el benchmark si alguna tarea de la etapa ha fallado (las medidas no serían comparables).
+    """
+    errores = [(item, error) for item, error in resultados if error is not None]
+    if errores:
+        item, error = errores[0]
+        raise RuntimeError(f"{etapa}: {len(errores)} errores (p.ej. {item}: {error})")
+
+def definir_etapas(archivos, jobs):
+    """
+    Define las etapas del benchmark. Cada etapa es un diccionario con "ejecutar",
+    opcionalmente "preparar" y el número de "elementos" que procesa. Las etapas se
+    ejecutan en orden y pueden usar lo que dejan las anteriores en `contexto`.
+
+    Returns:
+        dict: {nombre: etapa}
+    """
+    from cache_resultados import extraer_resultados_con_cache, invalidar_cache
+    from renderizado_graficos import renderizar_graficos
+    from conjunto_datos import descubrir_archivos, extraer_conjunto_datos
+    import generar_informe_sectores as sectores
+    import generar_informe_barras as barras
+    from graficos_tikz import generar_sectores_tikz, generar_barras_tikz
+    from salida_graficos import extension_graficos
+    from generar_informes import generar_informes
+    from config import DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS
+
+    contexto = {}
+    directorio_graficos = os.path.join(DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS)
+
+    def extraer():
+        contexto["extracciones"] = {
+            archivo: (resultados, error)
+            for archivo, resultados, error in extraer_resultado_de_excel.extraer_resultados_en_paralelo(archivos, jobs)
+        }
+        comprobar_errores([(a, e) for a, (_, e) in contexto["extracciones"].items()], "extraccion")
+
+    def conjunto():
+        if "conjunto" not in contexto:
+            if "extracciones" not in contexto:
+                extraer()
+            contexto["conjunto"] = {"carpetas": descubrir_archivos(), "extracciones": contexto["extracciones"]}
+        return contexto["conjunto"]
+
+    def informacion_actas():
+        if "infos" not in contexto:
+            extracciones = conjunto()["extracciones"]
+            trabajos = []
+            contexto["infos"] = [
+                sectores.generar_graficos_para_archivo(archivo, output_dir=directorio_graficos,
+                                                       resultados=extracciones[archivo][0],
+                                                       trabajos=trabajos, backend="matplotlib")
+                for archivo in archivos
+            ]
+            contexto["trabajos_sectores"] = trabajos
+        return contexto["infos"]
+
+    def datos_convocatorias():
+        if "convocatorias" not in contexto:
+            contexto["convocatorias"] = barras.obtener_datos_por_convocatoria(conjunto=conjunto())
+        return contexto["convocatorias"]
+
+    def resumenes():
+        if "resumenes" not in contexto:
+            cubo = datos_convocatorias()
+            contexto["resumenes"] = [cubo.resumen(carpeta) for carpeta in cubo.convocatorias]
+        return contexto["resumenes"]
+
+    def trabajos_barras():
+        return [
+            {"tipo": "barras",
+             "datos": resumen,
+             "titulo": resumen["nombre"],
+             "ruta": os.path.join(directorio_graficos, f"barras_{resumen['carpeta']}{extension_graficos()}"),
+             "origen": resumen["carpeta"]}
+            for resumen in resumenes()
+        ]
+
+    def renderizar(trabajos, etapa):
+        comprobar_errores(renderizar_graficos(trabajos, jobs), etapa)
+
+    return {
+        "extraccion": {
+            "ejecutar": extraer,
+            "elementos": len(archivos),
+        },
+        "extraccion_cache_fria": {
+            "preparar": invalidar_cache,
+            "ejecutar": lambda: comprobar_errores(
+                [(a, e) for a, _, e in extraer_resultados_con_cache(archivos, jobs)], "extraccion_cache_fria"),
+            "elementos": len(archivos),
+        },
+        "extraccion_cache_caliente": {
+            "preparar": lambda: extraer_resultados_con_cache(archivos, jobs),
+            "ejecutar": lambda: extraer_resultados_con_cache(archivos, jobs),
+            "elementos": len(archivos),
+        },
+        "canalizacion": {
+            "preparar": lambda: os.makedirs(directorio_graficos, exist_ok=True),
+            "ejecutar": lambda: comprobar_errores(
+                [(a, e) for a, (_, e) in extraer_conjunto_datos(
+                    jobs, usar_cache=False, canalizar=True,
+                    preparar_graficos=sectores.preparar_graficos(backend="matplotlib"))["extracciones"].items()],
+                "canalizacion"),
+            "elementos": len(archivos),
+        },
+        "graficos_sectores": {
+            "preparar": lambda: (informacion_actas(), os.makedirs(directorio_graficos, exist_ok=True)),
+            "ejecutar": lambda: renderizar(contexto["trabajos_sectores"], "graficos_sectores"),
+            "elementos": len(archivos),
+        },
+        "graficos_barras": {
+            "preparar": lambda: os.makedirs(directorio_graficos, exist_ok=True),
+            "ejecutar": lambda: renderizar(trabajos_barras(), "graficos_barras"),
+            "elementos": lambda: len(resumenes()),
+        },
+        "latex_sectores": {
+            "preparar": informacion_actas,
+            "ejecutar": lambda: "".join(sectores.generar_seccion_asignatura(info) for info in contexto["infos"]),
+            "elementos": len(archivos),
+        },
+        "agregacion_barras": {
+            "preparar": lambda: (conjunto(), contexto.pop("convocatorias", None), contexto.pop("resumenes", None)),
+            "ejecutar": resumenes,
+            "elementos": len(archivos),
+        },
+        "latex_barras": {
+            "preparar": resumenes,
+            "ejecutar": lambda: "".join(barras.generar_seccion_convocatoria(resumen, f"barras_{resumen['carpeta']}{extension_graficos()}")
+                                        for resumen in contexto["resumenes"]),
+            "elementos": lambda: len(resumenes()),
+        },
+        "tikz": {
+            "preparar": lambda: (informacion_actas(), resumenes()),
+            "ejecutar": lambda: (
+                [generar_sectores_tikz(info["resultados"]) for info in contexto["infos"]],
+                [generar_barras_tikz(resumen) for resumen in contexto["resumenes"]],
+            ),
+            "elementos": lambda: len(archivos) + len(resumenes()),
+        },
+        "informe_completo": {
+            "ejecutar": lambda: generar_informes(jobs=jobs, usar_cache=False),
+            "elementos": len(archivos),
+        },
+    }
+
+def ejecutar_benchmark(etapas=None, repeticiones=3, jobs=None, memoria=True, **parametros_actas):
+    """
+    Genera las actas sintéticas en el directorio actual y mide las etapas indicadas.
+
+    Args:
+        etapas (list): Nombres de las etapas a medir (None = todas)
+        repeticiones (int): Pasadas cronometradas por etapa
+        jobs (int): Procesos para extraer y dibujar (None = NUM_PROCESOS de config.py)
+        memoria (bool): Si True, mide también el pico de memoria de cada etapa
+        **parametros_actas: Argumentos de generar_actas (asignaturas, grupos, estudiantes, semilla)
+
+    Returns:
+        dict: Resultados (ver VERSION_RESULTADOS)
+    """
+    inicio = time.perf_counter()
+    generado = generar_actas(".", **parametros_actas)
+    segundos_generacion = time.perf_counter() - inicio
+    registrar_actas_sinteticas(generado["asignaturas"])
+    print(f"🧪 {len(generado['archivos'])} actas sintéticas ({generado['filas']} calificaciones) "
+          f"generadas en {segundos_generacion:.1f} s")
+
+    # Mismas rutas relativas que produce descubrir_archivos()
+    archivos = sorted(os.path.relpath(archivo) for archivo in generado["archivos"])
+    definidas = definir_etapas(archivos, jobs)
+    etapas = etapas or list(definidas)
+    medidas = {}
+    for nombre in etapas:
+        etapa = definidas[nombre]
+        print(f"⏱️  {nombre}...", end=" ", flush=True)
+        # Los mensajes de progreso del propio sistema no forman parte de la medida
+        with redirect_stdout(io.StringIO()):
+            medida = medir(etapa["ejecutar"], etapa.get("preparar"), repeticiones, memoria)
+            elementos = etapa["elementos"]() if callable(etapa["elementos"]) else etapa["elementos"]
+        medida["elementos"] = elementos
+        medida["ms_por_elemento"] = medida["segundos"] * 1000 / elementos if elementos else None
+        medidas[nombre] = medida
+        print(f"{medida['segundos']:.3f} s")
+
+    return {
+        "version": VERSION_RESULTADOS,
+        "entorno": informacion_entorno(),
+        "parametros": {**parametros_actas, "repeticiones": repeticiones, "jobs": jobs,
+                       "archivos": len(generado["archivos"]), "filas": generado["filas"]},
+        "etapas": medidas,
+    }
+
+def mostrar_resumen(resultados, base=None):
+    """
+    Muestra una tabla con las medidas y, si se indica, la comparación con otra ejecución.
+
+    Args:
+        resultados (dict): Resultados de ejecutar_benchmark
+        base (dict): Resultados de referencia (p.ej. de un commit anterior)
+    """
+    cabecera = f"{'Etapa':<28}{'Tiempo (s)':>12}{'ms/elem':>10}{'CPU (s)':>10}{'Mem (MB)':>10}"
+    if base is not None:
+        cabecera += f"{'Base (s)':>11}{'Cambio':>9}"
+    print(f"\n{cabecera}\n{'-' * len(cabecera)}")
+    for nombre, medida in resultados["etapas"].items():
+        memoria = f"{medida['memoria_pico_mb']:.1f}" if medida["memoria_pico_mb"] is not None else "-"
+        por_elemento = f"{medida['ms_por_elemento']:.2f}" if medida["ms_por_elemento"] is not None else "-"
+        linea = f"{nombre:<28}{medida['segundos']:>12.3f}{por_elemento:>10}{medida['cpu_segundos']:>10.3f}{memoria:>10}"
+        if base is not None:
+            referencia = base["etapas"].get(nombre)
+            if referencia:
+                cambio = (medida["segundos"] / referencia["segundos"] - 1) * 100 if referencia["segundos"] else 0
+                linea += f"{referencia['segundos']:>11.3f}{cambio:>+8.1f}%"
+            else:
+                linea += f"{'-':>11}{'-':>9}"
+        print(linea)
+
+    if base is not None and base.get("parametros", {}) != resultados["parametros"]:
+        print("\n⚠️  La ejecución de referencia usó otros parámetros: la comparación es orientativa")
+
+def main():
+    """
+    Ejecuta el benchmark desde la línea de comandos.
+    """
+    etapas_disponibles = ["extraccion", "extraccion_cache_fria", "extraccion_cache_caliente",
+                          "canalizacion", "graficos_sectores", "graficos_barras", "latex_sectores", "agregacion_barras",
+                          "latex_barras", "tikz", "informe_completo"]
+    parser = argparse.ArgumentParser(description="Mide cada etapa del sistema con actas sintéticas")
+    parser.add_argument("--asignaturas", type=int, default=18, help="Número de asignaturas")
+    parser.add_argument("--grupos", type=int, default=2, help="Grupos por asignatura")
+    parser.add_argument("--estudiantes", type=int, default=60, help="Estudiantes por grupo")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de las actas sintéticas")
+    parser.add_argument("--etapas", nargs="+", choices=etapas_disponibles, default=None,
+                        help="Etapas a medir (por defecto, todas)")
+    parser.add_argument("-r", "--repeticiones", type=int, default=3, help="Pasadas cronometradas por etapa")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Procesos para extraer y dibujar (0 = todos los núcleos)")
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir el pico de memoria")
+    parser.add_argument("-o", "--salida", default=None,
+                        help="Archivo JSON de resultados (por defecto benchmarks/resultados/<commit>.json)")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--directorio", default=None,
+                        help="Directorio de trabajo para las actas y la salida (por defecto, uno temporal)")
+    args = parser.parse_args()
+
+    # Todas las rutas del sistema son relativas: se trabaja dentro del directorio de las actas
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+    directorio = args.directorio or tempfile.mkdtemp(prefix="benchmark_informes_")
+    os.makedirs(directorio, exist_ok=True)
+    salida = os.path.abspath(args.salida) if args.salida else None
+    directorio_inicial = os.getcwd()
+    os.chdir(directorio)
+    try:
+        resultados = ejecutar_benchmark(
+            etapas=args.etapas, repeticiones=args.repeticiones, jobs=args.jobs, memoria=not args.sin_memoria,
+            asignaturas=args.asignaturas, grupos=args.grupos, estudiantes=args.estudiantes, semilla=args.semilla,
+        )
+    finally:
+        os.chdir(directorio_inicial)
+        if args.directorio is None:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    if salida is None:
+        nombre = resultados["entorno"]["commit"] or datetime.now().strftime("%Y%m%d_%H%M%S")
+        salida = os.path.join(DIRECTORIO_REPO, "benchmarks", "resultados", f"{nombre}.json")
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    mostrar_resumen(resultados, base)
+    print(f"\n💾 Resultados guardados en {salida}")
+
+if __name__ == "__main__":
+    main()
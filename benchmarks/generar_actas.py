@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Generador de Actas Sintéticas
+=============================
+
+Escribe libros Excel con el mismo formato que las actas reales, para poder medir
+el sistema a escala de facultad sin datos personales:
+- Fila de cabecera con los nombres de campo del acta (DSP_NOMID1 en la columna M)
+- Una fila por estudiante con la calificación en la columna M
+- Etiquetas en catalán o en castellano (variantes de MAPEO_CALIFICACIONES), con
+  algunas variaciones de mayúsculas y apóstrofos como las que aparecen en la práctica
+- Contenido .xlsx con extensión .xls, igual que los archivos que descarga la secretaría
+
+Las actas se reparten por las carpetas de TIPOS_CONVOCATORIAS: cada asignatura
+pertenece a un periodo (1Q, 2Q o anual) y tiene acta de primera y de segunda
+convocatoria, esta última con menos estudiantes.
+
+Uso:
+    python benchmarks/generar_actas.py /tmp/actas --asignaturas 40 --grupos 2 --estudiantes 80
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ASIGNATURAS, TIPOS_CONVOCATORIAS, DIRECTORIO_EXCELS
+
+# Cabecera de las actas reales (la columna M, índice 12, es DSP_NOMID1)
+CABECERA = [
+    "DSP_ALU_DNIALU", "DSP_ALU_NIFALU", "DSP_LL1ALU", "DSP_LL2ALU", "DSP_NOMALU",
+    "DSP_TAS_CODALF", "FLGBLO2", "FLGINC", "PLA_CODALF", "QUA_CODALF", "QUANUM",
+    "DSP_NOMID12", "DSP_NOMID1", "EXP_NUMORD", "ANY_ANYACAACT", "ACT_NUMORD",
+    "ASS_CODNUM", "GAS_CODNUM", "TCO_CODALF", "QUANUMPEN", "QUA_CODALFPEN",
+]
+
+# Etiquetas por idioma, en el orden NP, SU, AP, NO, EX, MH
+ETIQUETAS_IDIOMA = {
+    "ca": ["No presentat", "Suspès", "Aprovat", "Notable", "Excel·lent", "Matrícula d'Honor"],
+    "es": ["No presentado", "Suspenso", "Aprobado", "Notable", "Sobresaliente", "Matrícula de Honor"],
+}
+
+# Distribución aproximada de calificaciones (NP, SU, AP, NO, EX, MH)
+PESOS_PRIMERA = [12, 25, 33, 20, 7, 3]
+PESOS_SEGUNDA = [30, 40, 25, 5, 0, 0]
+
+# Fracción de estudiantes que se presentan a la segunda convocatoria
+FRACCION_SEGUNDA = 0.3
+
+def periodos_convocatorias():
+    """
+    Agrupa las carpetas de TIPOS_CONVOCATORIAS por periodo.
+
+    Returns:
+        dict: {periodo: {"1": carpeta, "2": carpeta}} (p.ej. {"1Q": {"1": "1Q1", "2": "1Q2"}})
+    """
+    periodos = {}
+    for carpeta, info in TIPOS_CONVOCATORIAS.items():
+        periodo = carpeta[:-1] if carpeta[-1:].isdigit() else carpeta
+        periodos.setdefault(periodo, {})[info["convocatoria"]] = carpeta
+    return periodos
+
+def codigos_asignaturas(num_asignaturas):
+    """
+    Códigos de asignatura para las actas: primero los de ASIGNATURAS y, si no
+    bastan, códigos sintéticos de 5 dígitos a partir de 90000.
+
+    Returns:
+        dict: {codigo: nombre}
+    """
+    codigos = dict(list(ASIGNATURAS.items())[:num_asignaturas])
+    siguiente = 90000
+    while len(codigos) < num_asignaturas:
+        codigos[str(siguiente)] = f"Assignatura sintètica {siguiente}"
+        siguiente += 1
+    return codigos
+
+def variar_etiqueta(etiqueta, rng):
+    """
+    Introduce, de vez en cuando, las variaciones que aparecen en las actas reales
+    (mayúsculas, apóstrofo tipográfico, espacios sobrantes).
+    """
+    tirada = rng.random()
+    if tirada < 0.02:
+        return etiqueta.upper()
+    if tirada < 0.04:
+        return etiqueta.replace("'", "’")
+    if tirada < 0.05:
+        return f" {etiqueta} "
+    return etiqueta
+
+def generar_calificaciones(num_estudiantes, idioma="ca", pesos=None, variantes=True, rng=None):
+    """
+    Genera una lista de calificaciones aleatorias.
+
+    Args:
+        num_estudiantes (int): Número de calificaciones
+        idioma (str): "ca" o "es"
+        pesos (list): Pesos de NP, SU, AP, NO, EX, MH (None = PESOS_PRIMERA)
+        variantes (bool): Si True, introduce variaciones de escritura en algunas etiquetas
+        rng (random.Random): Generador de números aleatorios
+
+    Returns:
+        list: Etiquetas de calificación
+    """
+    rng = rng or random.Random()
+    etiquetas = rng.choices(ETIQUETAS_IDIOMA[idioma], weights=pesos or PESOS_PRIMERA, k=num_estudiantes)
+    if variantes:
+        etiquetas = [variar_etiqueta(etiqueta, rng) for etiqueta in etiquetas]
+    return etiquetas
+
+def escribir_acta(ruta, codigo, calificaciones, rng=None):
+    """
+    Escribe un acta con el formato de las reales.
+
+    Args:
+        ruta (str): Ruta del archivo a crear (.xls con contenido .xlsx)
+        codigo (str): Código de la asignatura
+        calificaciones (list): Calificación de cada estudiante (columna M)
+        rng (random.Random): Generador para los datos de relleno del resto de columnas
+    """
+    from openpyxl import Workbook
+
+    rng = rng or random.Random()
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Acta")
+    hoja.append(CABECERA)
+    for orden, calificacion in enumerate(calificaciones, start=1):
+        dni = f"{rng.randrange(10**7, 10**8)}"
+        hoja.append([
+            dni, f"{dni}X", f"Cognom{rng.randrange(500)}", f"Cognom{rng.randrange(500)}",
+            f"Nom{rng.randrange(300)}", codigo, "N", "N", "MAT", None, None,
+            None, calificacion, orden, 2024, 1, codigo, 1, "ORD", None, None,
+        ])
+    # openpyxl decide el formato por la extensión: se guarda en un objeto archivo
+    with open(ruta, "wb") as f:
+        libro.save(f)
+
+def generar_actas(directorio, asignaturas=18, grupos=2, estudiantes=60, semilla=0, variantes=True):
+    """
+    Genera un conjunto completo de actas sintéticas con la estructura de carpetas de excels/.
+
+    Args:
+        directorio (str): Directorio base; las actas se escriben en <directorio>/<DIRECTORIO_EXCELS>/<carpeta>/
+        asignaturas (int): Número de asignaturas
+        grupos (int): Grupos por asignatura (A, B, C, ...)
+        estudiantes (int): Estudiantes por grupo en primera convocatoria
+        semilla (int): Semilla aleatoria (el mismo valor produce las mismas actas)
+        variantes (bool): Si True, mezcla variaciones de escritura en las etiquetas
+
+    Returns:
+        dict: {"archivos": [rutas], "asignaturas": {codigo: nombre}, "filas": total de calificaciones}
+    """
+    if not 1 <= grupos <= 26:
+        raise ValueError("El número de grupos debe estar entre 1 y 26")
+
+    rng = random.Random(semilla)
+    periodos = list(periodos_convocatorias().values())
+    codigos = codigos_asignaturas(asignaturas)
+
+    archivos = []
+    filas = 0
+    for i, codigo in enumerate(codigos):
+        carpetas = periodos[i % len(periodos)]
+        idioma = "ca" if rng.random() < 0.7 else "es"
+        for g in range(grupos):
+            grupo = chr(ord("A") + g)
+            for convocatoria, carpeta in sorted(carpetas.items()):
+                if convocatoria == "1":
+                    n, pesos = estudiantes, PESOS_PRIMERA
+                else:
+                    n, pesos = max(1, int(estudiantes * FRACCION_SEGUNDA)), PESOS_SEGUNDA
+                destino = os.path.join(directorio, DIRECTORIO_EXCELS, carpeta)
+                os.makedirs(destino, exist_ok=True)
+                ruta = os.path.join(destino, f"{codigo}_{grupo}_{carpeta}.xls")
+                escribir_acta(ruta, codigo, generar_calificaciones(n, idioma, pesos, variantes, rng), rng)
+                archivos.append(ruta)
+                filas += n
+
+    return {"archivos": archivos, "asignaturas": codigos, "filas": filas}
+
+def main():
+    """
+    Genera actas sintéticas desde la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Genera actas Excel sintéticas con el formato de las reales")
+    parser.add_argument("directorio", help=f"Directorio base (las actas se escriben en <directorio>/{DIRECTORIO_EXCELS}/)")
+    parser.add_argument("--asignaturas", type=int, default=18, help="Número de asignaturas")
+    parser.add_argument("--grupos", type=int, default=2, help="Grupos por asignatura")
+    parser.add_argument("--estudiantes", type=int, default=60, help="Estudiantes por grupo")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla aleatoria")
+    parser.add_argument("--sin-variantes", action="store_true",
+                        help="Escribir las etiquetas exactamente como en MAPEO_CALIFICACIONES")
+    args = parser.parse_args()
+
+    generado = generar_actas(args.directorio, args.asignaturas, args.grupos, args.estudiantes,
+                             args.semilla, not args.sin_variantes)
+    print(f"✅ {len(generado['archivos'])} actas generadas ({generado['filas']} calificaciones) "
+          f"en {os.path.join(args.directorio, DIRECTORIO_EXCELS)}")
+
+if __name__ == "__main__":
+    main()
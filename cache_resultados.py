@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Caché Persistente de Resultados de Actas
+========================================
+
+Guarda en una base de datos SQLite los diccionarios {"NP": ..., "MH": ...}
+devueltos por extraer_resultado_de_excel, de modo que una nueva ejecución
+solo vuelve a leer los Excel cuyo contenido ha cambiado.
+
+La clave de cada entrada combina:
+- El hash SHA-256 del contenido del archivo
+- El hash de MAPEO_CALIFICACIONES (si cambia el mapeo, la entrada deja de valer)
+- La versión del formato de la caché
+
+Uso desde la línea de comandos:
+    python cache_resultados.py info
+    python cache_resultados.py invalidar [archivo ...]
+    python cache_resultados.py limitar 5000
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+
+import instrumentacion
+from ingesta_entregas import hash_origen, existe_origen
+from extraer_resultado_de_excel import extraer_resultados_en_paralelo
+from config import (
+    DIRECTORIO_CACHE, ARCHIVO_CACHE_RESULTADOS, CACHE_MAX_ENTRADAS,
+    MAPEO_CALIFICACIONES
+)
+
+# Incrementar si cambia la forma de extraer los resultados de un Excel
+VERSION_CACHE = 2
+
+def ruta_cache():
+    """
+    Devuelve la ruta del archivo SQLite de la caché.
+    """
+    return os.path.join(DIRECTORIO_CACHE, ARCHIVO_CACHE_RESULTADOS)
+
+def conectar_cache():
+    """
+    Abre la base de datos de la caché, creándola si no existe.
+
+    Returns:
+        sqlite3.Connection: Conexión abierta
+    """
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    conexion = sqlite3.connect(ruta_cache())
+    conexion.execute("""
+        CREATE TABLE IF NOT EXISTS resultados (
+            clave TEXT PRIMARY KEY,
+            archivo TEXT NOT NULL,
+            resultados TEXT NOT NULL,
+            creado REAL NOT NULL,
+            usado REAL NOT NULL
+        )
+    """)
+    conexion.execute("CREATE INDEX IF NOT EXISTS idx_resultados_usado ON resultados (usado)")
+    return conexion
+
+def calcular_hash_archivo(filename, tam_bloque=1 << 20):
+    """
+    Calcula el hash SHA-256 del contenido de un archivo.
+
+    Args:
+        filename (str): Ruta del archivo (o ruta de origen de un acta de una entrega,
+                        ver ingesta_entregas)
+        tam_bloque (int): Tamaño de los bloques de lectura
+
+    Returns:
+        str: Hash en hexadecimal
+    """
+    return hash_origen(filename, tam_bloque)
+
+def huella_mapeo():
+    """
+    Calcula una huella de la configuración que afecta a la extracción.
+
+    Returns:
+        str: Hash de MAPEO_CALIFICACIONES y VERSION_CACHE
+    """
+    contenido = json.dumps({"version": VERSION_CACHE, "mapeo": MAPEO_CALIFICACIONES},
+                           sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def calcular_clave(filename, huella=None):
+    """
+    Calcula la clave de caché de un archivo Excel.
+
+    Args:
+        filename (str): Ruta del archivo Excel
+        huella (str): Huella del mapeo (si es None se calcula)
+
+    Returns:
+        str: Clave de la entrada en la caché
+    """
+    if huella is None:
+        huella = huella_mapeo()
+    return f"{calcular_hash_archivo(filename)}:{huella}"
+
+def extraer_resultados_con_cache(archivos, jobs=None):
+    """
+    Extrae los resultados de varios archivos usando la caché persistente.
+    Solo los archivos que no están en la caché se leen (en paralelo si jobs > 1).
+
+    Args:
+        archivos (list): Rutas de los archivos Excel
+        jobs (int): Número de procesos para los archivos no cacheados
+
+    Returns:
+        list: Tuplas (archivo, resultados, error) en el mismo orden que `archivos`,
+              igual que extraer_resultados_en_paralelo
+    """
+    archivos = list(archivos)
+    huella = huella_mapeo()
+
+    claves = {}
+    errores = {}
+    for archivo in archivos:
+        try:
+            claves[archivo] = calcular_clave(archivo, huella)
+        except OSError as e:
+            errores[archivo] = e
+
+    conexion = conectar_cache()
+    try:
+        cacheados = consultar_cache(conexion, claves)
+        instrumentacion.contar(cacheados=len(cacheados))
+
+        # Extraer solo los archivos que faltan
+        pendientes = [a for a in archivos if a in claves and a not in cacheados]
+        extraidos = {}
+        for archivo, resultados, error in extraer_resultados_en_paralelo(pendientes, jobs):
+            if error is not None:
+                errores[archivo] = error
+                continue
+            extraidos[archivo] = resultados
+
+        guardar_en_cache(conexion, [claves[archivo] for archivo in cacheados],
+                         [(claves[archivo], archivo, resultados) for archivo, resultados in extraidos.items()])
+    finally:
+        conexion.close()
+
+    salida = []
+    for archivo in archivos:
+        if archivo in errores:
+            salida.append((archivo, None, errores[archivo]))
+        else:
+            salida.append((archivo, cacheados.get(archivo, extraidos.get(archivo)), None))
+    return salida
+
+def consultar_cache(conexion, claves):
+    """
+    Busca en la caché los resultados de varios archivos (sin modificarla, para no
+    bloquear la base de datos mientras se extraen los que faltan).
+
+    Args:
+        conexion (sqlite3.Connection): Conexión abierta con conectar_cache
+        claves (dict): {archivo: clave} (ver calcular_clave)
+
+    Returns:
+        dict: {archivo: resultados} de los archivos que están en la caché
+    """
+    cacheados = {}
+    for archivo, clave in claves.items():
+        fila = conexion.execute(
+            "SELECT resultados FROM resultados WHERE clave = ?", (clave,)
+        ).fetchone()
+        if fila is not None:
+            cacheados[archivo] = json.loads(fila[0])
+    return cacheados
+
+def guardar_en_cache(conexion, usadas, nuevas):
+    """
+    Marca como usadas las entradas reutilizadas, añade las nuevas y limita el tamaño de la caché.
+
+    Args:
+        conexion (sqlite3.Connection): Conexión abierta con conectar_cache
+        usadas (list): Claves de las entradas reutilizadas
+        nuevas (list): Tuplas (clave, archivo, resultados) de los archivos extraídos
+    """
+    ahora = time.time()
+    if usadas:
+        conexion.executemany(
+            "UPDATE resultados SET usado = ? WHERE clave = ?",
+            [(ahora, clave) for clave in usadas]
+        )
+    if nuevas:
+        conexion.executemany(
+            "INSERT OR REPLACE INTO resultados (clave, archivo, resultados, creado, usado) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(clave, archivo, json.dumps(resultados), ahora, ahora) for clave, archivo, resultados in nuevas]
+        )
+    conexion.commit()
+    _limitar(conexion, CACHE_MAX_ENTRADAS)
+
+def _limitar(conexion, max_entradas):
+    """
+    Elimina las entradas menos usadas recientemente hasta dejar como mucho max_entradas.
+
+    Returns:
+        int: Número de entradas eliminadas
+    """
+    cursor = conexion.execute("""
+        DELETE FROM resultados WHERE clave IN (
+            SELECT clave FROM resultados ORDER BY usado DESC LIMIT -1 OFFSET ?
+        )
+    """, (max(0, max_entradas),))
+    conexion.commit()
+    return cursor.rowcount
+
+def limitar_cache(max_entradas=CACHE_MAX_ENTRADAS):
+    """
+    Reduce la caché a un número máximo de entradas.
+
+    Args:
+        max_entradas (int): Número máximo de entradas a conservar
+
+    Returns:
+        int: Número de entradas eliminadas
+    """
+    conexion = conectar_cache()
+    try:
+        eliminadas = _limitar(conexion, max_entradas)
+        conexion.execute("VACUUM")
+        return eliminadas
+    finally:
+        conexion.close()
+
+def invalidar_cache(archivos=None):
+    """
+    Elimina entradas de la caché.
+
+    Las entradas se buscan por su clave (contenido del archivo y mapeo actual, ver
+    calcular_clave): la columna "archivo" solo guarda la última ruta con ese
+    contenido. Solo los archivos que ya no existen se buscan por su ruta.
+
+    Args:
+        archivos (list): Rutas de los archivos a invalidar. Si es None se vacía toda la caché
+
+    Returns:
+        int: Número de entradas eliminadas
+    """
+    conexion = conectar_cache()
+    try:
+        if archivos is None:
+            cursor = conexion.execute("DELETE FROM resultados")
+            conexion.commit()
+            return cursor.rowcount
+        eliminadas = 0
+        huella = huella_mapeo()
+        for archivo in archivos:
+            if existe_origen(archivo):
+                cursor = conexion.execute("DELETE FROM resultados WHERE clave = ?",
+                                          (calcular_clave(archivo, huella),))
+            else:
+                cursor = conexion.execute("DELETE FROM resultados WHERE archivo = ? OR archivo = ?",
+                                          (archivo, os.path.normpath(archivo)))
+            eliminadas += cursor.rowcount
+        conexion.commit()
+        return eliminadas
+    finally:
+        conexion.close()
+
+def info_cache():
+    """
+    Obtiene información resumida del estado de la caché.
+
+    Returns:
+        dict: Ruta, número de entradas, archivos distintos, tamaño en disco y
+              entradas válidas para el MAPEO_CALIFICACIONES actual
+    """
+    conexion = conectar_cache()
+    try:
+        entradas, archivos = conexion.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT archivo) FROM resultados"
+        ).fetchone()
+        vigentes = conexion.execute(
+            "SELECT COUNT(*) FROM resultados WHERE clave LIKE ?", (f"%:{huella_mapeo()}",)
+        ).fetchone()[0]
+    finally:
+        conexion.close()
+
+    return {
+        "ruta": ruta_cache(),
+        "entradas": entradas,
+        "archivos": archivos,
+        "vigentes": vigentes,
+        "bytes": os.path.getsize(ruta_cache()),
+        "max_entradas": CACHE_MAX_ENTRADAS
+    }
+
+def main():
+    """
+    Punto de entrada para gestionar la caché desde la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Gestiona la caché de resultados de actas")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    subparsers.add_parser("info", help="Muestra el estado de la caché")
+    p_invalidar = subparsers.add_parser("invalidar", help="Elimina entradas (todas si no se indican archivos)")
+    p_invalidar.add_argument("archivos", nargs="*", help="Archivos Excel a invalidar")
+    p_limitar = subparsers.add_parser("limitar", help="Reduce la caché a un número máximo de entradas")
+    p_limitar.add_argument("max_entradas", type=int, nargs="?", default=CACHE_MAX_ENTRADAS)
+    args = parser.parse_args()
+
+    if args.comando == "info":
+        info = info_cache()
+        print(f"📦 Caché: {info['ruta']}")
+        print(f"  Entradas: {info['entradas']} (vigentes: {info['vigentes']}, máximo: {info['max_entradas']})")
+        print(f"  Archivos distintos: {info['archivos']}")
+        print(f"  Tamaño: {info['bytes'] / 1024:.1f} KiB")
+    elif args.comando == "invalidar":
+        eliminadas = invalidar_cache(args.archivos or None)
+        print(f"🧹 Eliminadas {eliminadas} entradas de la caché")
+    elif args.comando == "limitar":
+        eliminadas = limitar_cache(args.max_entradas)
+        print(f"✂️  Eliminadas {eliminadas} entradas (máximo {args.max_entradas})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Canalización Asíncrona de las Actas
+===================================
+
+En lugar de leer todas las actas, después analizarlas todas y después dibujar
+todos los gráficos, cada acta pasa por una cadena de etapas que trabajan a la vez:
+
+    descubrimiento -> lectura -> análisis -> dibujo -> (ensamblado LaTeX)
+
+- Descubrimiento: recorre las actas de las carpetas y entregas ya descubiertas
+- Lectura (hilos): lee cada acta para calcular su hash y la busca en la caché de
+  resultados; las que están en caché pasan directamente al dibujo
+- Análisis (procesos): extrae los resultados de las actas que no están en caché
+- Dibujo (procesos): en cuanto se conocen los resultados de un acta, dibuja sus
+  gráficos (los que indique preparar_graficos, p.ej. el diagrama de sectores)
+- El ensamblado LaTeX lo hacen después los generadores, que no vuelven a dibujar
+  los gráficos ya dibujados (ver "graficos" en el conjunto de datos)
+
+Las etapas se comunican con colas asyncio acotadas (CAPACIDAD_COLAS): si una etapa
+va más lenta, las anteriores esperan en lugar de acumular actas en memoria. El
+análisis y el dibujo comparten el mismo pool de procesos, de modo que los núcleos
+no quedan ociosos mientras una etapa espera a la otra y el tiempo total se acerca
+al de la etapa más lenta en lugar de a la suma de todas. Las consultas a la caché
+(SQLite) se hacen en un hilo propio, fuera del bucle de eventos.
+
+Con un solo proceso no hay nada que solapar: cada acta se lee, se analiza y se
+dibuja en el propio proceso, una tras otra, sin pools ni bucle de eventos.
+
+El resultado es el mismo conjunto de datos que el de la extracción por lotes
+(ver conjunto_datos), con una entrada más:
+    "graficos": {ruta: error}    # Gráficos ya dibujados (error es None si todo fue bien)
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import instrumentacion
+from cache_resultados import calcular_clave, huella_mapeo, conectar_cache, consultar_cache, guardar_en_cache
+from extraer_resultado_de_excel import resolver_num_procesos, extraer_sin_excepciones, registrar_extraccion
+from almacen_graficos import limitar_almacen
+from renderizado_graficos import (
+    configurar_backend, instalar_del_almacen, renderizar_sin_excepciones, registrar_grafico
+)
+from config import CAPACIDAD_COLAS, HILOS_LECTURA
+
+# Marca de fin de cola: cada trabajador de la etapa siguiente recibe una
+FIN = object()
+
+class CanalizacionActas:
+    """
+    Extrae las actas (y dibuja sus gráficos) con las etapas solapadas.
+
+    Args:
+        jobs (int): Procesos del pool de análisis y dibujo (None = NUM_PROCESOS de config.py,
+                    0 = todos los núcleos)
+        usar_cache (bool): Si True, reutiliza y actualiza la caché persistente de resultados
+        preparar_graficos (callable): Función (archivo, resultados) -> lista de trabajos de
+                                      gráfico (ver renderizado_graficos); None = sin gráficos
+        capacidad (int): Actas en espera entre dos etapas (None = CAPACIDAD_COLAS)
+    """
+
+    def __init__(self, jobs=None, usar_cache=True, preparar_graficos=None, capacidad=None):
+        self.jobs = resolver_num_procesos(jobs)
+        self.usar_cache = usar_cache
+        self.preparar_graficos = preparar_graficos
+        self.capacidad = capacidad or CAPACIDAD_COLAS or 2 * self.jobs
+        self.extracciones = {}
+        self.graficos = {}
+        self._claves = {}
+        self._usadas = []
+        self._nuevas = []
+        self._conexion = None
+        self._huella = None
+        self._dibujo = None
+        self._sqlite = None
+
+    def ejecutar(self, carpetas):
+        """
+        Recorre todas las actas de las carpetas.
+
+        Args:
+            carpetas (dict): Carpetas devueltas por conjunto_datos.descubrir_archivos
+
+        Returns:
+            dict: Conjunto de datos (ver la documentación del módulo)
+        """
+        if self.jobs <= 1:
+            self._ejecutar_en_proceso(carpetas)
+        else:
+            asyncio.run(self._ejecutar(carpetas))
+        if self.graficos:
+            limitar_almacen()
+        instrumentacion.contar(cacheados=len(self._usadas))
+        # Mismo orden que la extracción por lotes
+        extracciones = {archivo: self.extracciones[archivo]
+                        for info in carpetas.values() for archivo in info["archivos"]}
+        return {"carpetas": carpetas, "extracciones": extracciones, "graficos": self.graficos}
+
+    def _ejecutar_en_proceso(self, carpetas):
+        """
+        Recorre las actas una tras otra en el propio proceso (jobs <= 1).
+        """
+        if self.usar_cache:
+            self._conexion = conectar_cache()
+            self._huella = huella_mapeo()
+        try:
+            for info in carpetas.values():
+                origenes = info.get("origenes", {})
+                for archivo in info["archivos"]:
+                    resultados, error = self._extraer_en_proceso(origenes.get(archivo, archivo))
+                    self.extracciones[archivo] = (resultados, error)
+                    for trabajo in self._trabajos_grafico(archivo, resultados, error):
+                        salida = instalar_del_almacen(trabajo)
+                        if salida is None:
+                            configurar_backend()
+                            salida = renderizar_sin_excepciones(trabajo)
+                        ruta, error_grafico = registrar_grafico(salida)
+                        self.graficos[ruta] = error_grafico
+            if self._conexion is not None:
+                guardar_en_cache(self._conexion, self._usadas, self._nuevas)
+        finally:
+            if self._conexion is not None:
+                self._conexion.close()
+
+    def _extraer_en_proceso(self, origen):
+        """
+        Resultados de un acta: de la caché si está, o extrayéndolos aquí mismo.
+
+        Returns:
+            tuple: (resultados, error)
+        """
+        clave = None
+        if self._conexion is not None:
+            try:
+                clave = calcular_clave(origen, self._huella)
+            except Exception as e:
+                return None, e
+            resultados = consultar_cache(self._conexion, {origen: clave}).get(origen)
+            if resultados is not None:
+                self._usadas.append(clave)
+                return resultados, None
+        _, resultados, error = registrar_extraccion(extraer_sin_excepciones(origen, self.usar_cache))
+        if error is None and clave is not None:
+            self._nuevas.append((clave, origen, resultados))
+        return resultados, error
+
+    async def _ejecutar(self, carpetas):
+        lectura = asyncio.Queue(self.capacidad)
+        analisis = asyncio.Queue(self.capacidad)
+        self._dibujo = dibujo = asyncio.Queue(self.capacidad)
+        hilos = ThreadPoolExecutor(max_workers=HILOS_LECTURA)
+        procesos = ProcessPoolExecutor(max_workers=self.jobs, initializer=configurar_backend)
+        bucle = asyncio.get_running_loop()
+        if self.usar_cache:
+            # La conexión SQLite solo se usa desde el hilo en el que se abre
+            self._sqlite = ThreadPoolExecutor(max_workers=1)
+            self._conexion = await bucle.run_in_executor(self._sqlite, conectar_cache)
+            self._huella = huella_mapeo()
+        try:
+            await asyncio.gather(
+                self._descubrir(carpetas, lectura, HILOS_LECTURA),
+                self._etapa(lectura, HILOS_LECTURA, lambda acta: self._leer(acta, hilos, analisis),
+                            analisis, self.jobs),
+                self._etapa(analisis, self.jobs, lambda acta: self._analizar(acta, procesos),
+                            dibujo, self.jobs),
+                self._etapa(dibujo, self.jobs, lambda trabajo: self._dibujar(trabajo, hilos, procesos)),
+            )
+            if self._conexion is not None:
+                await bucle.run_in_executor(self._sqlite, guardar_en_cache,
+                                            self._conexion, self._usadas, self._nuevas)
+        finally:
+            hilos.shutdown()
+            procesos.shutdown()
+            if self._conexion is not None:
+                self._sqlite.submit(self._conexion.close).result()
+                self._sqlite.shutdown()
+
+    async def _descubrir(self, carpetas, cola, consumidores):
+        """
+        Etapa de descubrimiento: pone en la cola cada acta como (ruta lógica, origen).
+        """
+        for info in carpetas.values():
+            origenes = info.get("origenes", {})
+            for archivo in info["archivos"]:
+                await cola.put((archivo, origenes.get(archivo, archivo)))
+        for _ in range(consumidores):
+            await cola.put(FIN)
+
+    async def _etapa(self, cola, trabajadores, procesar, siguiente=None, consumidores=0):
+        """
+        Ejecuta una etapa con varios trabajadores y, al terminar, cierra la cola siguiente.
+        """
+        async def trabajador():
+            while True:
+                elemento = await cola.get()
+                if elemento is FIN:
+                    return
+                await procesar(elemento)
+
+        await asyncio.gather(*(trabajador() for _ in range(trabajadores)))
+        for _ in range(consumidores):
+            await siguiente.put(FIN)
+
+    async def _leer(self, acta, hilos, analisis):
+        """
+        Etapa de lectura: hash del acta y consulta de la caché.
+        """
+        archivo, origen = acta
+        if self._conexion is not None:
+            try:
+                clave = await asyncio.get_running_loop().run_in_executor(
+                    hilos, calcular_clave, origen, self._huella)
+            except Exception as e:
+                await self._anotar(archivo, None, e)
+                return
+            cacheados = await asyncio.get_running_loop().run_in_executor(
+                self._sqlite, consultar_cache, self._conexion, {origen: clave})
+            resultados = cacheados.get(origen)
+            if resultados is not None:
+                self._usadas.append(clave)
+                await self._anotar(archivo, resultados, None)
+                return
+            self._claves[origen] = clave
+        await analisis.put(acta)
+
+    async def _analizar(self, acta, procesos):
+        """
+        Etapa de análisis: extracción de los resultados en el pool de procesos.
+        """
+        archivo, origen = acta
+        salida = await asyncio.get_running_loop().run_in_executor(procesos, extraer_sin_excepciones, origen,
+                                                                    self.usar_cache)
+        _, resultados, error = registrar_extraccion(salida)
+        if error is None and origen in self._claves:
+            self._nuevas.append((self._claves[origen], origen, resultados))
+        await self._anotar(archivo, resultados, error)
+
+    async def _anotar(self, archivo, resultados, error):
+        """
+        Guarda los resultados de un acta y pasa sus gráficos a la etapa de dibujo.
+        """
+        self.extracciones[archivo] = (resultados, error)
+        for trabajo in self._trabajos_grafico(archivo, resultados, error):
+            await self._dibujo.put(trabajo)
+
+    def _trabajos_grafico(self, archivo, resultados, error):
+        """
+        Trabajos de gráfico de un acta ya extraída (ninguno si falló).
+        """
+        if error is not None or self.preparar_graficos is None:
+            return []
+        try:
+            return self.preparar_graficos(archivo, resultados)
+        except Exception:
+            return []  # El generador volverá a encontrar (y mostrará) el error al preparar su sección
+
+    async def _dibujar(self, trabajo, hilos, procesos):
+        """
+        Etapa de dibujo: renderizado de un gráfico en el pool de procesos (salvo que
+        ya esté en el almacén de gráficos: entonces se enlaza o copia en un hilo, fuera
+        del bucle de eventos).
+        """
+        salida = await asyncio.get_running_loop().run_in_executor(hilos, instalar_del_almacen, trabajo)
+        if salida is None:
+            salida = await asyncio.get_running_loop().run_in_executor(procesos, renderizar_sin_excepciones, trabajo)
+        ruta, error = registrar_grafico(salida)
+        self.graficos[ruta] = error
+
+def canalizar_extraccion(carpetas, jobs=None, usar_cache=True, preparar_graficos=None):
+    """
+    Extrae las actas de las carpetas con las etapas solapadas (ver la documentación del módulo).
+
+    Args:
+        carpetas (dict): Carpetas devueltas por conjunto_datos.descubrir_archivos
+        jobs (int): Procesos para analizar y dibujar (None = NUM_PROCESOS de config.py)
+        usar_cache (bool): Si True, reutiliza la caché persistente de resultados
+        preparar_graficos (callable): Función (archivo, resultados) -> trabajos de gráfico
+
+    Returns:
+        dict: Conjunto de datos
+    """
+    return CanalizacionActas(jobs, usar_cache, preparar_graficos).ejecutar(carpetas)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Compilación de los Informes LaTeX
+=================================
+
+Compila los documentos .tex generados sin intervención manual:
+- Todos los documentos se compilan a la vez (un proceso de LaTeX por documento)
+- Cada documento usa su propio directorio de trabajo (.cache/latex/<documento>),
+  así los archivos auxiliares de uno no interfieren con los de otro
+- Cada pasada tiene un tiempo máximo (COMPILACION_LATEX["timeout"])
+- Si el .tex y los gráficos que incluye son idénticos a los de la última
+  compilación correcta, el documento no se vuelve a compilar
+- Los documentos que empiezan con el preámbulo común (ver preambulo_latex) se
+  compilan con -fmt y un formato precompilado de ese preámbulo (paquete
+  mylatexformat), que se construye una vez en .cache/latex/formatos a partir del
+  primer documento y se reutiliza en todas las compilaciones. Cada formato se
+  guarda con su clave (preámbulo, LATEX_CONFIG y ejecutable de LaTeX), así que
+  cambiar de backend no invalida los demás; se conservan los
+  COMPILACION_LATEX["max_formatos"] usados más recientemente. Si no se puede
+  construir o la compilación falla con él, se compila sin él y se avisa
+
+Uso:
+    python compilacion_latex.py                       # Todos los .tex de output/
+    python compilacion_latex.py output/informe_barras.tex
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import re
+import glob
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentacion
+from extraer_resultado_de_excel import resolver_num_procesos
+from salida_graficos import formato_graficos
+from preambulo_latex import preambulo_documento, directorio_formatos
+from config import COMPILACION_LATEX, DIRECTORIO_OUTPUT, DIRECTORIO_CACHE, LATEX_CONFIG
+
+_PATRON_DEPENDENCIA = re.compile(r"\\(includegraphics|includesvg|input|include)(?:\[[^\]]*\])?\{([^}]+)\}")
+_EXTENSIONES = {
+    "includegraphics": ["", ".pdf", ".png", ".jpg"],
+    "includesvg": ["", ".svg"],
+    "input": ["", ".tex"],
+    "include": [".tex"],
+}
+
+# Motores con los que mylatexformat puede volcar el formato
+MOTORES_FORMATO = ("pdflatex", "latex")
+
+# Formatos comprobados por este proceso: {clave: (ruta sin .fmt o None si no se puede usar, motivo)}
+_formatos = {}
+_cerrojo_formatos = threading.Lock()  # Varios documentos se compilan a la vez con el mismo formato
+
+def directorio_build(ruta_tex):
+    """
+    Directorio de trabajo aislado para compilar un documento. Los documentos de
+    subcarpetas de output (p.ej. los fragmentos del informe de facultad) usan su
+    ruta relativa, para que documentos con el mismo nombre no compartan directorio.
+    """
+    partes = os.path.relpath(os.path.splitext(os.path.abspath(ruta_tex))[0]).split(os.sep)
+    if partes[0] == os.pardir:
+        partes = partes[-1:]
+    elif len(partes) > 1 and partes[0] == os.path.normpath(DIRECTORIO_OUTPUT).split(os.sep)[0]:
+        partes = partes[1:]
+    return os.path.join(DIRECTORIO_CACHE, "latex", "__".join(partes))
+
+def dependencias_documento(ruta_tex):
+    """
+    Obtiene los archivos incluidos por un documento (\\includegraphics, \\input, \\include),
+    recorriendo también los .tex incluidos. Cada ruta se busca relativa al documento y,
+    si no existe, relativa al archivo que la incluye (como hace \\graphicspath en el índice
+    de los fragmentos).
+
+    Args:
+        ruta_tex (str): Ruta del documento .tex
+
+    Returns:
+        list: Rutas existentes de las dependencias, ordenadas
+    """
+    base = os.path.dirname(ruta_tex)
+    pendientes = [ruta_tex]
+    vistos = set()
+    dependencias = set()
+    while pendientes:
+        actual = pendientes.pop()
+        if actual in vistos:
+            continue
+        vistos.add(actual)
+        with open(actual, encoding="utf-8") as f:
+            contenido = f.read()
+        for comando, nombre in _PATRON_DEPENDENCIA.findall(contenido):
+            candidatas = [os.path.join(directorio, nombre.strip() + extension)
+                          for directorio in dict.fromkeys([base, os.path.dirname(actual)])
+                          for extension in _EXTENSIONES[comando]]
+            for ruta in candidatas:
+                if os.path.isfile(ruta):
+                    dependencias.add(ruta)
+                    if ruta.endswith(".tex"):
+                        pendientes.append(ruta)
+                    break
+    return sorted(dependencias)
+
+def huella_compilacion(ruta_tex):
+    """
+    Huella del contenido exacto que se va a compilar: el .tex, sus dependencias
+    y la configuración de compilación.
+    """
+    h = hashlib.sha256(repr(sorted(COMPILACION_LATEX.items())).encode("utf-8"))
+    for ruta in [ruta_tex] + dependencias_documento(ruta_tex):
+        h.update(os.path.relpath(ruta, os.path.dirname(ruta_tex)).encode("utf-8"))
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+    return h.hexdigest()
+
+def clave_formato(preambulo, motor):
+    """
+    Clave del formato precompilado de un preámbulo: su texto, LATEX_CONFIG y el
+    ejecutable de LaTeX (un formato solo se puede cargar con el mismo ejecutable).
+    """
+    ejecutable = os.path.realpath(shutil.which(motor))
+    estado = os.stat(ejecutable)
+    h = hashlib.sha256(repr(sorted(LATEX_CONFIG.items())).encode("utf-8"))
+    h.update(f"{ejecutable}|{estado.st_size}|{estado.st_mtime_ns}".encode("utf-8"))
+    h.update(preambulo.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def _construir_formato(ruta_tex, motor, directorio, nombre):
+    """
+    Vuelca el preámbulo de un documento a directorio/nombre.fmt con mylatexformat,
+    que lee el documento hasta \\csname endofdump\\endcsname. Se construye en una
+    carpeta temporal y se mueve al final, porque los fragmentos del informe de
+    facultad se compilan en procesos distintos que pueden construirlo a la vez.
+
+    Returns:
+        str: None si se ha construido, o el motivo del fallo
+    """
+    os.makedirs(directorio, exist_ok=True)
+    temporal = tempfile.mkdtemp(dir=directorio, prefix=".")
+    base = os.path.splitext(os.path.basename(motor))[0]
+    comando = [motor, "-ini", "-interaction=nonstopmode", "-halt-on-error", f"-jobname={nombre}",
+               f"-output-directory={temporal}", f"&{base}", "mylatexformat.ltx", os.path.basename(ruta_tex)]
+    try:
+        proceso = subprocess.run(comando, cwd=os.path.dirname(os.path.abspath(ruta_tex)),
+                                 capture_output=True, timeout=COMPILACION_LATEX["timeout"])
+        volcado = os.path.join(temporal, f"{nombre}.fmt")
+        if proceso.returncode != 0 or not os.path.exists(volcado):
+            salida = proceso.stdout.decode("utf-8", errors="replace").strip().splitlines()
+            return "\n".join(salida[-5:]) or f"{motor} -ini terminó con código {proceso.returncode}"
+        os.replace(volcado, os.path.join(directorio, f"{nombre}.fmt"))
+        return None
+    except subprocess.TimeoutExpired:
+        return f"Se superaron {COMPILACION_LATEX['timeout']} s"
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+def formato_precompilado(ruta_tex, preambulo):
+    """
+    Devuelve el formato precompilado del preámbulo común de un documento,
+    construyéndolo a partir del propio documento si no existe. Todos los documentos
+    con el mismo preámbulo comparten el formato.
+
+    Args:
+        ruta_tex (str): Ruta del documento .tex
+        preambulo (str): Texto del preámbulo (ver preambulo_documento)
+
+    Returns:
+        tuple: (ruta del formato sin la extensión .fmt para -fmt, o None si el motor
+                no lo admite o no se ha podido construir; motivo del fallo o "")
+    """
+    motor = COMPILACION_LATEX["motor"]
+    if os.path.basename(motor) not in MOTORES_FORMATO or shutil.which(motor) is None:
+        return None, ""
+    clave = clave_formato(preambulo, motor)
+    directorio = os.path.abspath(directorio_formatos())
+    ruta = os.path.join(directorio, clave)
+    with _cerrojo_formatos:
+        if clave not in _formatos:
+            if os.path.exists(f"{ruta}.fmt"):
+                os.utime(f"{ruta}.fmt")  # Usado ahora: el último en eliminarse (ver limitar_formatos)
+                fallo = None
+            else:
+                fallo = _construir_formato(ruta_tex, motor, directorio, clave)
+                if not fallo:
+                    limitar_formatos()
+            _formatos[clave] = (None, fallo) if fallo else (ruta, "")
+        return _formatos[clave]
+
+def limitar_formatos(max_formatos=None):
+    """
+    Elimina los formatos precompilados usados hace más tiempo hasta dejar
+    max_formatos (por defecto COMPILACION_LATEX["max_formatos"]).
+
+    Returns:
+        int: Número de formatos eliminados
+    """
+    if max_formatos is None:
+        max_formatos = COMPILACION_LATEX["max_formatos"]
+    formatos = sorted(glob.glob(os.path.join(directorio_formatos(), "*.fmt")),
+                      key=os.path.getmtime, reverse=True)
+    eliminados = 0
+    for ruta in formatos[max(0, max_formatos):]:
+        try:
+            os.remove(ruta)
+            eliminados += 1
+        except FileNotFoundError:
+            pass  # Lo ha eliminado a la vez otro proceso
+    return eliminados
+
+def _descartar_formato(formato):
+    """
+    Deja de usar en este proceso un formato con el que ha fallado una compilación
+    que sin él funciona, para no repetir el intento en los demás documentos.
+    """
+    with _cerrojo_formatos:
+        for clave, (ruta, _) in list(_formatos.items()):
+            if ruta == formato:
+                _formatos[clave] = (None, "El formato falló al compilar con él")
+
+def _ejecutar_pasadas(comando, directorio_tex):
+    """
+    Ejecuta las pasadas de LaTeX.
+
+    Returns:
+        tuple: (estado, mensaje); estado es None si todas las pasadas fueron bien
+    """
+    for _ in range(COMPILACION_LATEX["pasadas"]):
+        try:
+            proceso = subprocess.run(comando, cwd=directorio_tex, capture_output=True,
+                                     timeout=COMPILACION_LATEX["timeout"])
+        except subprocess.TimeoutExpired:
+            return "timeout", f"Se superaron {COMPILACION_LATEX['timeout']} s"
+        if proceso.returncode != 0:
+            salida = proceso.stdout.decode("utf-8", errors="replace").strip().splitlines()
+            return "error", "\n".join(salida[-15:])
+    return None, ""
+
+def compilar_documento(ruta_tex, forzar=False):
+    """
+    Compila un documento LaTeX en su directorio de trabajo aislado.
+
+    Args:
+        ruta_tex (str): Ruta del documento .tex
+        forzar (bool): Si True, compila aunque no haya cambios
+
+    Returns:
+        dict: {"documento", "estado" ("compilado" | "sin cambios" | "error" | "timeout"),
+               "segundos", "mensaje", "formato" (True si se usó el formato precompilado),
+               "aviso" (por qué no se usó el formato precompilado, o "")}
+    """
+    inicio = time.perf_counter()
+    nombre = os.path.splitext(os.path.basename(ruta_tex))[0]
+    directorio_tex = os.path.dirname(os.path.abspath(ruta_tex))
+    build = os.path.abspath(directorio_build(ruta_tex))
+    pdf_build = os.path.join(build, f"{nombre}.pdf")
+    pdf_salida = os.path.join(directorio_tex, f"{nombre}.pdf")
+    archivo_huella = os.path.join(build, "huella")
+
+    formato = None
+    aviso = ""
+
+    def resultado(estado, mensaje=""):
+        return {"documento": ruta_tex, "estado": estado,
+                "segundos": time.perf_counter() - inicio, "mensaje": mensaje,
+                "formato": formato is not None, "aviso": aviso}
+
+    huella = huella_compilacion(ruta_tex)
+    if not forzar and os.path.exists(pdf_build) and os.path.exists(archivo_huella):
+        with open(archivo_huella, encoding="utf-8") as f:
+            if f.read() == huella:
+                # Recuperar el PDF si se borró la carpeta output
+                if not os.path.exists(pdf_salida):
+                    shutil.copy2(pdf_build, pdf_salida)
+                return resultado("sin cambios")
+
+    motor = COMPILACION_LATEX["motor"]
+    if shutil.which(motor) is None:
+        return resultado("error", f"No se encontró el ejecutable '{motor}'")
+
+    os.makedirs(build, exist_ok=True)
+    # \\include escribe un .aux por archivo incluido, en su misma subcarpeta
+    for dependencia in dependencias_documento(ruta_tex):
+        if dependencia.endswith(".tex"):
+            subcarpeta = os.path.dirname(os.path.relpath(dependencia, os.path.dirname(ruta_tex)))
+            os.makedirs(os.path.join(build, subcarpeta), exist_ok=True)
+    comando = [motor, "-interaction=nonstopmode", "-halt-on-error",
+               f"-output-directory={build}", os.path.basename(ruta_tex)]
+    if formato_graficos() == "svg":
+        comando.insert(1, "-shell-escape")  # El paquete svg convierte los gráficos con Inkscape
+
+    preambulo = preambulo_documento(ruta_tex) if COMPILACION_LATEX.get("formato_precompilado") else None
+    if preambulo is not None:
+        formato, aviso = formato_precompilado(ruta_tex, preambulo)
+        if aviso:
+            aviso = f"Sin formato precompilado: {aviso}"
+    if formato is not None:
+        estado, mensaje = _ejecutar_pasadas(comando[:1] + [f"-fmt={formato}"] + comando[1:], directorio_tex)
+        if estado == "error":
+            # Por si el error se debe al formato, se vuelve a intentar sin él (y se avisa)
+            aviso = f"Falló con el formato precompilado, compilado sin él:\n{mensaje}"
+            _descartar_formato(formato)
+            formato = None
+    if formato is None:
+        estado, mensaje = _ejecutar_pasadas(comando, directorio_tex)
+    if estado is not None:
+        return resultado(estado, mensaje)
+
+    shutil.copy2(pdf_build, pdf_salida)
+    with open(archivo_huella, "w", encoding="utf-8") as f:
+        f.write(huella)
+    return resultado("compilado")
+
+def compilar_documentos(rutas_tex, jobs=0, forzar=False):
+    """
+    Compila varios documentos LaTeX a la vez.
+
+    Args:
+        rutas_tex (list): Rutas de los documentos .tex
+        jobs (int): Número máximo de compilaciones simultáneas
+                    (0 = todos los núcleos, None = NUM_PROCESOS de config.py)
+        forzar (bool): Si True, compila aunque no haya cambios
+
+    Returns:
+        list: Resultados de compilar_documento, en el mismo orden que `rutas_tex`
+    """
+    rutas_tex = list(rutas_tex)
+    if not rutas_tex:
+        return []
+    # Cada compilación es un proceso externo: basta con hilos para lanzarlas en paralelo
+    jobs = min(resolver_num_procesos(jobs), len(rutas_tex))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lambda ruta: compilar_documento(ruta, forzar), rutas_tex))
+
+def mostrar_resultados(resultados):
+    """
+    Muestra un resumen de las compilaciones y cuenta en la etapa en curso las que
+    no han podido usar el formato precompilado.
+    """
+    iconos = {"compilado": "✅", "sin cambios": "⏭️ ", "error": "❌", "timeout": "⏱️ "}
+    for r in resultados:
+        formato = ", formato precompilado" if r.get("formato") else ""
+        print(f"  {iconos[r['estado']]} {os.path.basename(r['documento'])}: {r['estado']} "
+              f"({r['segundos']:.1f} s{formato})")
+        if r.get("aviso"):
+            instrumentacion.contar(sin_formato=1)
+            for linea in r["aviso"].splitlines():
+                print(f"      ⚠️  {linea}")
+        if r["mensaje"] and r["estado"] != "sin cambios":
+            for linea in r["mensaje"].splitlines():
+                print(f"      {linea}")
+
+def main():
+    """
+    Compila desde la línea de comandos los documentos indicados (o todos los de output/).
+    """
+    parser = argparse.ArgumentParser(description="Compila los informes LaTeX generados")
+    parser.add_argument("documentos", nargs="*", help="Archivos .tex (por defecto, todos los de output/)")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Compilaciones simultáneas (0 = todos los núcleos)")
+    parser.add_argument("-f", "--forzar", action="store_true", help="Compilar aunque no haya cambios")
+    args = parser.parse_args()
+
+    documentos = args.documentos or sorted(glob.glob(os.path.join(DIRECTORIO_OUTPUT, "*.tex")))
+    print(f"📄 Compilando {len(documentos)} documentos...")
+    mostrar_resultados(compilar_documentos(documentos, jobs=args.jobs, forzar=args.forzar))
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 # Este archivo contiene toda la configuración específica del curso y titulaciones.
 # Modifica los valores según tus necesidades.
 
+import os
+
 # INFORMACIÓN GENERAL
 # ===================
 CURSO = "2o curs"
@@ -129,6 +131,28 @@ COLORES_RESULTADOS = {
     "MH": "#800080"   # Morado
 }
 
+# Tamaño (en pulgadas) de las imágenes dibujadas con matplotlib
+TAMANOS_GRAFICOS = {
+    "sectores": (10, 8),
+    "barras": (12, 2.5),     # Altura reducida para mayor compactación
+    "tendencias": (12, 3),
+}
+
+# Archivos de las imágenes dibujadas con matplotlib (ver salida_graficos)
+CONFIG_GRAFICOS = {
+    "formato": "png",        # "png", "svg" o "pdf" (SVG en LaTeX: paquete svg, Inkscape y -shell-escape)
+    "dpi": 300,              # Resolución de los PNG
+    "compresion": 6,         # Nivel de compresión zlib de los PNG (0-9; 9 ocupa ~15% menos y tarda más)
+    "optimizar": False,      # Guardar los PNG con paleta indexada (opcional: los gráficos usan pocos colores planos)
+    "paleta": 256            # Colores máximos de la paleta
+}
+
+# Backend de los gráficos del informe:
+# - "matplotlib": imágenes PNG incluidas con \includegraphics
+# - "tikz": gráficos vectoriales generados como código TikZ/pgfplots dentro del .tex
+#   (no necesita matplotlib; requiere los paquetes LaTeX pgfplots y xcolor)
+BACKEND_GRAFICOS = "matplotlib"
+
 # CONFIGURACIÓN DE ARCHIVOS
 # =========================
 # Directorio base donde están los archivos Excel
@@ -144,6 +168,98 @@ ARCHIVO_LATEX_SECTORES = "informe_sectores.tex"
 # Nombre del archivo LaTeX de salida para informe compacto con barras apiladas
 ARCHIVO_LATEX_BARRAS = "informe_barras.tex"
 
+# Preámbulo común de los documentos LaTeX (marca de su primera línea)
+ARCHIVO_PREAMBULO = "preambulo"
+
+# CONFIGURACIÓN DE RENDIMIENTO
+# ============================
+# Número de procesos usados para extraer los archivos Excel en paralelo.
+# 1 = secuencial (comportamiento clásico), 0 = usar todos los núcleos disponibles.
+# Se puede sobrescribir desde la línea de comandos con --jobs N
+NUM_PROCESOS = 1
+
+# CACHÉ DE RESULTADOS
+# ===================
+# Los resultados extraídos de cada Excel se guardan en una base de datos SQLite,
+# indexados por el hash del contenido del archivo y por MAPEO_CALIFICACIONES.
+# Así, en una nueva ejecución solo se vuelven a leer los archivos que han cambiado.
+DIRECTORIO_CACHE = ".cache"
+ARCHIVO_CACHE_RESULTADOS = "resultados.sqlite"
+CACHE_MAX_ENTRADAS = 20000   # Número máximo de entradas (se eliminan las menos usadas)
+
+# ALMACÉN DE GRÁFICOS
+# ===================
+# Las imágenes dibujadas con matplotlib se guardan en .cache/graficos, indexadas por
+# el hash de sus datos, título, colores, tamaño, resolución y versión de matplotlib.
+# Un gráfico igual a uno ya dibujado (en otra ejecución o en otro informe) se enlaza
+# o se copia en output/graficos en lugar de volver a dibujarse.
+CACHE_GRAFICOS = True
+SUBDIRECTORIO_CACHE_GRAFICOS = "graficos"
+CACHE_GRAFICOS_MAX_MB = 500   # Tamaño máximo (se eliminan los gráficos usados hace más tiempo)
+
+# CANALIZACIÓN DE ETAPAS
+# ======================
+# La lectura, el análisis de los Excel y el dibujo de los gráficos de cada acta se
+# solapan (ver canalizacion.py) en lugar de ejecutarse uno detrás de otro.
+# Se puede desactivar desde la línea de comandos con --sin-canalizacion
+CANALIZACION = True
+CAPACIDAD_COLAS = 0   # Actas en espera entre dos etapas (0 = 2 por proceso); limita la memoria
+HILOS_LECTURA = 4     # Hilos que leen los Excel (hash y consulta de la caché)
+
+# MARCADOR DE LAS CALIFICACIONES
+# ==============================
+# Las calificaciones empiezan en la fila siguiente a la celda MARCADOR_CALIFICACIONES,
+# que el sistema de actas pone en la columna COLUMNA_CALIFICACIONES. La posición del
+# marcador se recuerda para cada disposición de hoja (número de columnas y nombres de
+# campo de la primera fila) en la tabla "disposiciones" de la caché, de modo que los
+# siguientes archivos del mismo sistema de exportación no lo vuelven a buscar.
+MARCADOR_CALIFICACIONES = "DSP_NOMID1"
+COLUMNA_CALIFICACIONES = "M"
+
+# ARCHIVO HISTÓRICO
+# =================
+# Con la opción --archivar, los conteos de cada ejecución se guardan en un archivo
+# Parquet particionado por curso académico y convocatoria (requiere pyarrow).
+# Así se puede consultar la evolución de una asignatura a lo largo de los años
+# sin volver a leer los Excel de cursos anteriores.
+DIRECTORIO_HISTORICO = "historico"
+ANYO_ACADEMICO = 2024                          # Año de inicio del curso (2024 = curso 2024-25)
+CATEGORIAS_APROBADO = ["AP", "NO", "EX", "MH"]  # Categorías que cuentan como aprobado
+TENDENCIAS_HISTORICAS = False                  # Añadir al informe de barras la evolución por curso
+
+# MODO VIGILANCIA
+# ===============
+# Con --vigilar, los informes se regeneran cuando cambian los Excel
+ESPERA_VIGILANCIA = 2.0     # Segundos sin cambios antes de regenerar (agrupa las copias de varias actas)
+INTERVALO_VIGILANCIA = 1.0  # Segundos entre comprobaciones de la carpeta si watchdog no está instalado
+
+# SERVICIO DE INFORMES
+# ====================
+# Servidor HTTP local (python servidor_informes.py) que devuelve bajo demanda los
+# conteos, gráficos y fragmentos de informe de una asignatura o convocatoria.
+HOST_SERVIDOR = "127.0.0.1"          # Solo accesible desde el propio ordenador
+PUERTO_SERVIDOR = 8765
+CACHE_SERVIDOR_ENTRADAS = 512        # Resultados y respuestas guardados en memoria
+DPI_SERVIDOR = 150                   # Resolución de los gráficos PNG del servicio
+
+# INFORME DE FACULTAD (FRAGMENTOS)
+# ================================
+# Para generar a la vez los informes de varias titulaciones o cursos. Cada fragmento
+# es un informe independiente con sus propias asignaturas (códigos de ASIGNATURAS),
+# curso y titulaciones; se genera en output/fragmentos/<fragmento>/ y se puede
+# compilar por separado. El índice output/fragmentos/<informe>.tex los reúne con \include.
+# Las claves "curso", "autor" y "titulaciones" son opcionales (por defecto, las de arriba).
+# Los generadores reciben el fragmento con --fragmento (ver generar_fragmentos.py).
+DIRECTORIO_FRAGMENTOS = "fragmentos"
+TITULO_FACULTAD = "Informe de Resultats Acadèmics de la Facultat"
+FRAGMENTOS = {
+    "2o-curs": {
+        "curso": CURSO,
+        "titulaciones": TITULACIONES,
+        "asignaturas": list(ASIGNATURAS),
+    },
+}
+
 # CONFIGURACIÓN REGEX
 # ===================
 # Patrones para extraer información de los nombres de archivos
@@ -163,6 +279,19 @@ LATEX_CONFIG = {
     "margins": "2.5cm"
 }
 
+# COMPILACIÓN LATEX
+# =================
+# Compilación opcional de los .tex generados (opción --compilar).
+# Cada documento se compila en su propio directorio de trabajo dentro de la caché,
+# y se omite si el .tex y sus gráficos no han cambiado desde la última compilación.
+COMPILACION_LATEX = {
+    "motor": "pdflatex",     # Ejecutable de LaTeX
+    "pasadas": 2,            # Pasadas necesarias para el índice y las referencias
+    "timeout": 300,          # Segundos máximos por pasada
+    "formato_precompilado": True, # Volcar el preámbulo común a un formato (paquete mylatexformat)
+    "max_formatos": 4        # Formatos precompilados que se conservan (los usados más recientemente)
+}
+
 # MENSAJES DE TEXTO
 # =================
 # Textos utilizados en el informe y mensajes
@@ -184,5 +313,7 @@ TEXTOS = {
     "assignatures": "assignatures", 
     "estudiants": "estudiants",
     "tabla_asignatura": "Assignatura",
-    "tabla_grupos": "Grups"
+    "tabla_grupos": "Grups",
+    "tendencia_aprobados": "Evolució del percentatge d'aprovats",
+    "eje_curso": "Curs"
 }
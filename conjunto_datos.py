@@ -0,0 +1,157 @@
+"""
+Conjunto de Datos Compartido
+============================
+
+Descubre los archivos Excel de todas las convocatorias y extrae sus resultados
+una sola vez. El conjunto resultante se pasa a los generadores de informes
+(sectores, barras, ...), de modo que producir varios informes cuesta una única
+pasada de lectura de los Excel.
+
+Además de las carpetas de convocatoria, se leen las entregas (zips o libros
+con una hoja por acta) que haya en la raíz de la carpeta de los Excel, sin
+descomprimirlas (ver ingesta_entregas). Sus actas aparecen con la ruta lógica
+que tendrían descomprimidas; "origenes" indica de dónde se leen.
+
+Por defecto (CANALIZACION) la extracción se solapa con el dibujo de los gráficos
+de cada acta (ver canalizacion); el conjunto lleva entonces también "graficos".
+
+Estructura del conjunto de datos:
+    {
+        "carpetas": {
+            "1Q1": {"nombre": "Primer Quadrimestre - ...", "archivos": ["excels/1Q1/...xls", ...],
+                    "origenes": {"excels/1Q1/...xls": "excels/entrega.zip::1Q1/...xls", ...}},
+            ...
+        },
+        "extracciones": {
+            "excels/1Q1/...xls": (resultados, error),
+            ...
+        }
+    }
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import re
+import glob
+
+import instrumentacion
+from ingesta_entregas import buscar_entregas, listar_entrega
+from extraer_resultado_de_excel import extraer_resultados_sin_cache
+from cache_resultados import extraer_resultados_con_cache
+from canalizacion import canalizar_extraccion
+from config import (
+    TIPOS_CONVOCATORIAS, DIRECTORIO_EXCELS, FRAGMENTOS, PATRON_CODIGO_ASIGNATURA, CANALIZACION
+)
+
+def _codigo_archivo(archivo):
+    """
+    Código de asignatura del nombre de un archivo (None si no tiene).
+    """
+    coincidencia = re.search(PATRON_CODIGO_ASIGNATURA, os.path.basename(archivo))
+    return coincidencia.group(1) if coincidencia else None
+
+def descubrir_archivos(directorio=None, entregas=None, fragmento=None):
+    """
+    Obtiene todos los archivos .xls organizados por carpetas de convocatoria,
+    incluidas las actas de las entregas (zips y libros con varias hojas).
+
+    Args:
+        directorio (str): Directorio base de los Excel (None = DIRECTORIO_EXCELS)
+        entregas (list): Entregas a leer (None = las de la raíz de `directorio`)
+        fragmento (str): Si se indica (clave de FRAGMENTOS en config.py), solo las actas
+                         de las asignaturas de ese fragmento
+
+    Returns:
+        dict: {carpeta: {"nombre": ..., "archivos": [rutas ordenadas]}}; las carpetas
+              con actas de entregas tienen además "origenes": {ruta lógica: ruta de origen}
+    """
+    if directorio is None:
+        directorio = DIRECTORIO_EXCELS
+    if entregas is None:
+        entregas = buscar_entregas(directorio)
+    carpetas = {}
+    for carpeta, info in TIPOS_CONVOCATORIAS.items():
+        patron = f"{directorio}/{carpeta}/*.xls"
+        carpetas[carpeta] = {
+            "nombre": info["nombre"],
+            "archivos": sorted(glob.glob(patron))
+        }
+
+    for entrega in entregas:
+        actas, descartadas = listar_entrega(entrega, directorio)
+        for origen, motivo in descartadas:
+            print(f"⚠️  {origen}: {motivo}, se ignora")
+        for acta in actas:
+            info = carpetas[acta["carpeta"]]
+            if acta["archivo"] in info["archivos"]:
+                print(f"⚠️  {acta['origen']}: ya hay un acta {acta['archivo']}, se ignora")
+                continue
+            info["archivos"].append(acta["archivo"])
+            info.setdefault("origenes", {})[acta["archivo"]] = acta["origen"]
+
+    asignaturas = set(FRAGMENTOS[fragmento]["asignaturas"]) if fragmento is not None else None
+    for info in carpetas.values():
+        info["archivos"].sort()
+        if asignaturas is not None:
+            info["archivos"] = [archivo for archivo in info["archivos"]
+                                if _codigo_archivo(archivo) in asignaturas]
+    return carpetas
+
+def extraer_archivos(carpetas, archivos, extraer, jobs=None):
+    """
+    Extrae un grupo de actas de las carpetas, leyendo cada una de su origen.
+
+    Args:
+        carpetas (dict): Carpetas devueltas por descubrir_archivos
+        archivos (list): Rutas lógicas de las actas a extraer
+        extraer (callable): extraer_resultados_con_cache o extraer_resultados_sin_cache
+        jobs (int): Número de procesos
+
+    Returns:
+        list: Tuplas (archivo, resultados, error) con la ruta lógica de cada acta
+    """
+    origenes = {}
+    for info in carpetas.values():
+        origenes.update(info.get("origenes", {}))
+    rutas = {origenes.get(archivo, archivo): archivo for archivo in archivos}
+    return [(rutas[origen], resultados, error)
+            for origen, resultados, error in extraer(list(rutas), jobs)]
+
+def extraer_conjunto_datos(jobs=None, usar_cache=True, directorio=None, entregas=None,
+                           canalizar=None, preparar_graficos=None, fragmento=None):
+    """
+    Descubre y extrae todos los archivos Excel en una sola pasada.
+
+    Args:
+        jobs (int): Número de procesos para extraer los Excel (None = NUM_PROCESOS de config.py)
+        usar_cache (bool): Si True, reutiliza los resultados de la caché persistente
+        directorio (str): Directorio base de los Excel (None = DIRECTORIO_EXCELS)
+        entregas (list): Entregas a leer (None = las de la raíz de `directorio`)
+        canalizar (bool): Si True, solapa la lectura, el análisis y el dibujo de los
+                          gráficos de cada acta (None = CANALIZACION de config.py)
+        preparar_graficos (callable): Con canalizar, función (archivo, resultados) que
+                                      devuelve los trabajos de gráfico de cada acta
+        fragmento (str): Si se indica, solo las actas de ese fragmento (ver descubrir_archivos)
+
+    Returns:
+        dict: Conjunto de datos (ver la documentación del módulo)
+    """
+    with instrumentacion.etapa("descubrimiento"):
+        carpetas = descubrir_archivos(directorio, entregas, fragmento)
+        todos_los_archivos = [archivo for info in carpetas.values() for archivo in info["archivos"]]
+        instrumentacion.contar(archivos=len(todos_los_archivos))
+
+    if CANALIZACION if canalizar is None else canalizar:
+        with instrumentacion.etapa("canalizacion"):
+            return canalizar_extraccion(carpetas, jobs, usar_cache, preparar_graficos)
+
+    # Extraer todos los archivos de una vez (en paralelo si jobs > 1)
+    extraer = extraer_resultados_con_cache if usar_cache else extraer_resultados_sin_cache
+    with instrumentacion.etapa("extraccion"):
+        extracciones = {
+            archivo: (resultados, error)
+            for archivo, resultados, error in extraer_archivos(carpetas, todos_los_archivos, extraer, jobs)
+        }
+
+    return {"carpetas": carpetas, "extracciones": extracciones}
@@ -0,0 +1,209 @@
+"""
+Construcción Incremental de Informes
+====================================
+
+En lugar de borrar la carpeta output en cada ejecución, se guarda un manifiesto
+por informe (output/.manifiesto_<informe>.json) con la huella de aquello a partir
+de lo que se construyó cada artefacto (gráfico, sección LaTeX, documento):
+archivo de entrada, resultados, título y configuración de estilo.
+
+En la siguiente ejecución:
+- Solo se regeneran los artefactos cuya huella ha cambiado o que ya no existen
+- Las secciones LaTeX sin cambios se reutilizan tal cual. El manifiesto solo
+  guarda su huella; el texto se guarda aparte, un archivo por sección
+  (output/.secciones_<informe>/<huella>.tex), y solo en modo incremental
+- Se eliminan únicamente los artefactos huérfanos (los que este informe generó
+  antes y ya no genera)
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import json
+import shutil
+import hashlib
+
+from escritura_latex import EscritorLatex
+from config import (
+    DIRECTORIO_OUTPUT, COLORES_RESULTADOS, ETIQUETAS_RESULTADOS, TEXTOS, CONFIG_GRAFICOS
+)
+
+# Incrementar si cambia el código de dibujo de los gráficos o el que genera las
+# secciones LaTeX (las plantillas ya forman parte de huella_plantillas)
+VERSION_ESTILO = 1
+
+def calcular_huella(*partes):
+    """
+    Calcula una huella estable de cualquier combinación de datos serializables.
+
+    Args:
+        *partes: Datos de los que depende el artefacto
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    contenido = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def huella_estilo():
+    """
+    Huella de la configuración visual compartida por todos los gráficos.
+    """
+    return calcular_huella(VERSION_ESTILO, COLORES_RESULTADOS, ETIQUETAS_RESULTADOS,
+                           TEXTOS["leyenda_estudiantes"], CONFIG_GRAFICOS)
+
+def huella_plantillas(*plantillas):
+    """
+    Huella de todo lo que llega al texto de las secciones además de sus datos:
+    TEXTOS y ETIQUETAS_RESULTADOS completos y el código de las plantillas LaTeX.
+
+    Args:
+        *plantillas (PlantillaLatex): Plantillas con las que se genera la sección
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    return calcular_huella(VERSION_ESTILO, TEXTOS, ETIQUETAS_RESULTADOS,
+                           [plantilla.template for plantilla in plantillas])
+
+def limpiar_outputs_anteriores(directorio=None):
+    """
+    Elimina toda la carpeta output de ejecuciones anteriores (sin modo incremental).
+
+    Args:
+        directorio (str): Carpeta a eliminar (None = DIRECTORIO_OUTPUT)
+    """
+    directorio = directorio or DIRECTORIO_OUTPUT
+    print("🧹 Limpiando outputs de ejecuciones anteriores...")
+    
+    # Eliminar toda la carpeta output si existe
+    if os.path.exists(directorio):
+        shutil.rmtree(directorio)
+        print(f"  ✅ Eliminada carpeta completa: {directorio}")
+    
+    print("✅ Limpieza completada\n")
+
+class ConstruccionIncremental:
+    """
+    Lleva el registro de los artefactos generados por un informe.
+
+    Args:
+        nombre (str): Nombre del informe (p.ej. "sectores", "barras")
+        incremental (bool): Si es False se ignora el manifiesto anterior y todo
+                            se considera obsoleto (pero se registra igualmente)
+        directorio (str): Carpeta de salida del informe (None = DIRECTORIO_OUTPUT)
+    """
+
+    def __init__(self, nombre, incremental=True, directorio=None):
+        self.nombre = nombre
+        self.incremental = incremental
+        self.directorio = directorio or DIRECTORIO_OUTPUT
+        self.ruta_manifiesto = os.path.join(self.directorio, f".manifiesto_{nombre}.json")
+        self.directorio_secciones = os.path.join(self.directorio, f".secciones_{nombre}")
+        self.anterior = self._cargar() if incremental else {"artefactos": {}, "secciones": {}}
+        self.actual = {"artefactos": {}, "secciones": {}}
+        self.regenerados = 0
+        self.reutilizados = 0
+
+    def _cargar(self):
+        try:
+            with open(self.ruta_manifiesto, encoding="utf-8") as f:
+                manifiesto = json.load(f)
+        except (OSError, ValueError):
+            return {"artefactos": {}, "secciones": {}}
+        manifiesto.setdefault("artefactos", {})
+        manifiesto.setdefault("secciones", {})
+        return manifiesto
+
+    def _clave(self, ruta):
+        return os.path.relpath(ruta, self.directorio).replace("\\", "/")
+
+    def vigente(self, ruta, huella):
+        """
+        Registra el artefacto y comprueba si la versión en disco sigue siendo válida.
+        Se puede consultar varias veces (p.ej. al preparar los gráficos durante la
+        extracción y al generar el informe): solo la primera cuenta en las estadísticas.
+
+        Args:
+            ruta (str): Ruta del artefacto
+            huella (str): Huella de los datos de los que depende
+
+        Returns:
+            bool: True si el artefacto existe y se construyó con la misma huella
+        """
+        clave = self._clave(ruta)
+        repetido = self.actual["artefactos"].get(clave) == huella
+        self.actual["artefactos"][clave] = huella
+        es_vigente = (self.anterior["artefactos"].get(clave) == huella and os.path.exists(ruta))
+        if not repetido and es_vigente:
+            self.reutilizados += 1
+        elif not repetido:
+            self.regenerados += 1
+        return es_vigente
+
+    def _ruta_seccion(self, huella):
+        return os.path.join(self.directorio_secciones, f"{huella}.tex")
+
+    def seccion(self, clave, huella, generar):
+        """
+        Devuelve el código LaTeX de una sección, reutilizándolo si su huella no ha cambiado.
+        Fuera del modo incremental la sección siempre se genera y no se guarda.
+
+        Args:
+            clave (str): Identificador único de la sección dentro del informe
+            huella (str): Huella de los datos de la sección
+            generar (callable): Función sin argumentos que genera el código LaTeX
+
+        Returns:
+            str: Código LaTeX de la sección
+        """
+        if not self.incremental:
+            return generar()
+        self.actual["secciones"][clave] = huella
+        ruta = self._ruta_seccion(huella)
+        if self.anterior["secciones"].get(clave) == huella and os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                return f.read()
+        latex = generar()
+        os.makedirs(self.directorio_secciones, exist_ok=True)
+        with EscritorLatex(ruta) as escritor:
+            escritor.escribir(latex)
+        return latex
+
+    def escribir_si_cambia(self, ruta, contenido):
+        """
+        Escribe un archivo de texto solo si su contenido ha cambiado (de forma atómica,
+        ver escritura_latex.EscritorLatex).
+
+        Returns:
+            bool: True si se ha escrito el archivo
+        """
+        with EscritorLatex(ruta, self) as escritor:
+            escritor.escribir(contenido)
+        return escritor.escrito
+
+    def finalizar(self):
+        """
+        Elimina los artefactos huérfanos y guarda el manifiesto actual.
+
+        Returns:
+            list: Rutas de los artefactos eliminados
+        """
+        eliminados = []
+        for clave in self.anterior["artefactos"]:
+            if clave not in self.actual["artefactos"]:
+                ruta = os.path.join(self.directorio, clave)
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+                    eliminados.append(ruta)
+        # Textos de las secciones que ya no están en el informe
+        if os.path.isdir(self.directorio_secciones):
+            vigentes = {f"{huella}.tex" for huella in self.actual["secciones"].values()}
+            for nombre in os.listdir(self.directorio_secciones):
+                if nombre not in vigentes:
+                    os.remove(os.path.join(self.directorio_secciones, nombre))
+
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(self.ruta_manifiesto, "w", encoding="utf-8") as f:
+            json.dump(self.actual, f, ensure_ascii=False, indent=1, sort_keys=True)
+        return eliminados
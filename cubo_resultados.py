@@ -0,0 +1,155 @@
+"""
+Cubo de Resultados
+==================
+
+Almacén denso de los conteos de calificaciones, indexado por
+(convocatoria, asignatura, grupo, categoría). Cada eje se codifica con enteros
+y los conteos se guardan en un único array de NumPy, de modo que los totales,
+los agregados por asignatura y los porcentajes se calculan una sola vez con
+operaciones vectorizadas y los comparten la tabla LaTeX, el gráfico de
+matplotlib y el gráfico TikZ.
+
+Ejemplo:
+    cubo = CuboResultados.desde_registros([
+        ("1Q1", "34154", "A", {"NP": 5, "SU": 3, ...}),
+        ("1Q1", "34154", "B", {"NP": 2, "SU": 4, ...}),
+    ])
+    resumen = cubo.resumen("1Q1")
+    resumen["porcentajes"]    # array (asignaturas, categorías)
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import numpy as np
+
+from config import ETIQUETAS_RESULTADOS, TIPOS_CONVOCATORIAS, ASIGNATURAS
+
+class CuboResultados:
+    """
+    Conteos de calificaciones en un array (convocatoria, asignatura, grupo, categoría).
+
+    Atributos:
+        convocatorias (list): Carpetas de convocatoria (eje 0)
+        asignaturas (list): Códigos de asignatura ordenados (eje 1)
+        grupos (list): Grupos ordenados (eje 2)
+        categorias (list): Categorías de ETIQUETAS_RESULTADOS (eje 3)
+        conteos (np.ndarray): Conteos, forma (C, A, G, K)
+        presentes (np.ndarray): True donde hay acta, forma (C, A, G)
+    """
+
+    def __init__(self, convocatorias, asignaturas, grupos, categorias, conteos, presentes):
+        self.convocatorias = list(convocatorias)
+        self.asignaturas = list(asignaturas)
+        self.grupos = list(grupos)
+        self.categorias = list(categorias)
+        self.conteos = conteos
+        self.presentes = presentes
+        self._indice_convocatoria = {c: i for i, c in enumerate(self.convocatorias)}
+        self._agregados = None
+
+    @classmethod
+    def desde_registros(cls, registros, convocatorias=None, categorias=None):
+        """
+        Construye el cubo a partir de registros (carpeta, codigo, grupo, resultados).
+        Si una combinación aparece varias veces, prevalece el último registro.
+
+        Args:
+            registros (iterable): Tuplas (carpeta, codigo, grupo, {categoria: conteo})
+            convocatorias (list): Orden del eje de convocatorias (None = orden de TIPOS_CONVOCATORIAS
+                                  con las carpetas que aparecen en los registros)
+            categorias (list): Orden del eje de categorías (None = ETIQUETAS_RESULTADOS)
+
+        Returns:
+            CuboResultados: Cubo con los conteos
+        """
+        registros = list(registros)
+        categorias = list(categorias or ETIQUETAS_RESULTADOS.keys())
+        if convocatorias is None:
+            vistas = {carpeta for carpeta, _, _, _ in registros}
+            convocatorias = [c for c in TIPOS_CONVOCATORIAS if c in vistas]
+            convocatorias += sorted(vistas - set(convocatorias))
+        asignaturas = sorted({codigo for _, codigo, _, _ in registros})
+        grupos = sorted({grupo for _, _, grupo, _ in registros})
+
+        indice_c = {c: i for i, c in enumerate(convocatorias)}
+        indice_a = {a: i for i, a in enumerate(asignaturas)}
+        indice_g = {g: i for i, g in enumerate(grupos)}
+
+        forma = (len(convocatorias), len(asignaturas), len(grupos))
+        conteos = np.zeros(forma + (len(categorias),), dtype=np.int32)
+        presentes = np.zeros(forma, dtype=bool)
+        if registros:
+            ic = np.fromiter((indice_c[r[0]] for r in registros), dtype=np.intp, count=len(registros))
+            ia = np.fromiter((indice_a[r[1]] for r in registros), dtype=np.intp, count=len(registros))
+            ig = np.fromiter((indice_g[r[2]] for r in registros), dtype=np.intp, count=len(registros))
+            valores = np.array([[r[3].get(categoria, 0) for categoria in categorias] for r in registros],
+                               dtype=np.int32)
+            conteos[ic, ia, ig] = valores
+            presentes[ic, ia, ig] = True
+
+        return cls(convocatorias, asignaturas, grupos, categorias, conteos, presentes)
+
+    def agregados(self):
+        """
+        Calcula (una sola vez) los agregados que usan la tabla y los gráficos.
+
+        Returns:
+            dict: {"por_asignatura": (C, A, K), "totales": (C, A), "porcentajes": (C, A, K),
+                   "con_datos": (C, A) bool}
+        """
+        if self._agregados is None:
+            por_asignatura = self.conteos.sum(axis=2, dtype=np.int64)
+            totales = por_asignatura.sum(axis=2)
+            porcentajes = np.zeros(por_asignatura.shape, dtype=np.float64)
+            np.divide(por_asignatura, totales[..., np.newaxis], out=porcentajes,
+                      where=totales[..., np.newaxis] > 0)
+            porcentajes *= 100
+            self._agregados = {
+                "por_asignatura": por_asignatura,
+                "totales": totales,
+                "porcentajes": porcentajes,
+                "con_datos": self.presentes.any(axis=2),
+            }
+        return self._agregados
+
+    def resumen(self, carpeta, nombre=None):
+        """
+        Datos de una convocatoria listos para la tabla y los gráficos: solo las
+        asignaturas con acta en esa convocatoria, ordenadas por código.
+
+        Args:
+            carpeta (str): Carpeta de la convocatoria
+            nombre (str): Nombre de la convocatoria (None = el de TIPOS_CONVOCATORIAS)
+
+        Returns:
+            dict: {"carpeta", "nombre", "codigos", "nombres", "grupos" (p.ej. "AB"),
+                   "conteos" (n, K), "totales" (n,), "porcentajes" (n, K), "categorias"}
+        """
+        agregados = self.agregados()
+        c = self._indice_convocatoria[carpeta]
+        filas = np.flatnonzero(agregados["con_datos"][c])
+        codigos = [self.asignaturas[i] for i in filas]
+        return {
+            "carpeta": carpeta,
+            "nombre": nombre if nombre is not None else TIPOS_CONVOCATORIAS.get(carpeta, {}).get("nombre", carpeta),
+            "codigos": codigos,
+            "nombres": [ASIGNATURAS.get(codigo, "Asignatura desconocida") for codigo in codigos],
+            "grupos": ["".join(self.grupos[g] for g in np.flatnonzero(self.presentes[c, i])) for i in filas],
+            "conteos": agregados["por_asignatura"][c, filas],
+            "totales": agregados["totales"][c, filas],
+            "porcentajes": agregados["porcentajes"][c, filas],
+            "categorias": self.categorias,
+        }
+
+    def num_asignaturas(self, carpeta):
+        """
+        Número de asignaturas con acta en una convocatoria.
+        """
+        return int(self.agregados()["con_datos"][self._indice_convocatoria[carpeta]].sum())
+
+def huella_resumen(resumen):
+    """
+    Partes serializables de un resumen para calcular su huella (ver construccion_incremental).
+    """
+    return [resumen["carpeta"], resumen["nombre"], resumen["codigos"], resumen["nombres"],
+            resumen["grupos"], resumen["conteos"].tolist()]
@@ -0,0 +1,166 @@
+"""
+Escritura de Documentos LaTeX
+=============================
+
+Piezas comunes para escribir los documentos LaTeX de los informes:
+- PlantillaLatex: plantillas string.Template que se compilan una sola vez al
+  importar el módulo. Los campos se escriben como @@campo o @@{campo}, ya que
+  $ es el delimitador del modo matemático de LaTeX.
+- escapar_latex: escapa los caracteres especiales de LaTeX en los textos que
+  vienen de la configuración o de los Excel (nombres de asignatura, títulos, ...)
+- EscritorLatex: escribe el documento por partes, a medida que se generan las
+  secciones, en un archivo temporal junto al destino. Al cerrarlo, el temporal
+  sustituye al documento con un renombrado atómico, o se descarta si el
+  contenido no ha cambiado. Así el documento nunca está completo en memoria y
+  nunca queda a medias en disco. Opcionalmente, el cuerpo (las secciones) se
+  escribe en un archivo aparte que el documento incluye con \\input, de modo que
+  otro documento puede reunir varios cuerpos con \\include (ver generar_fragmentos).
+
+Uso:
+    with EscritorLatex("output/informe.tex", construccion) as escritor:
+        escritor.escribir(PREAMBULO.substitute(titulo=escapar_latex(titulo)))
+        for seccion in secciones:
+            escritor.escribir(seccion)
+    escritor.escrito    # True si el documento ha cambiado
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import string
+import hashlib
+
+class PlantillaLatex(string.Template):
+    """
+    Plantilla de código LaTeX con campos @@campo o @@{campo}.
+    """
+    delimiter = "@@"
+
+# Caracteres especiales de LaTeX y su versión escapada
+ESCAPES_LATEX = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+
+_TABLA_ESCAPES = str.maketrans(ESCAPES_LATEX)
+
+def escapar_latex(texto):
+    """
+    Escapa los caracteres especiales de LaTeX de un texto.
+
+    Args:
+        texto (str): Texto plano (se convierte a str si no lo es)
+
+    Returns:
+        str: Texto que se puede incluir tal cual en el documento
+    """
+    return str(texto).translate(_TABLA_ESCAPES)
+
+class EscritorLatex:
+    """
+    Escribe un documento por partes en un temporal y lo instala al cerrarlo.
+
+    Args:
+        ruta (str): Ruta del documento
+        construccion (ConstruccionIncremental): Si se indica, el documento solo se
+            sustituye si su huella ha cambiado desde la ejecución anterior (y se
+            registra como artefacto del informe)
+    """
+
+    def __init__(self, ruta, construccion=None):
+        self.ruta = ruta
+        self.construccion = construccion
+        self.bytes = 0
+        self.escrito = False
+        self._hash = hashlib.sha256()
+        directorio = os.path.dirname(ruta) or "."
+        os.makedirs(directorio, exist_ok=True)
+        self._temporal = os.path.join(directorio, f".{os.path.basename(ruta)}.tmp")
+        self._archivo = open(self._temporal, "w", encoding="utf-8")
+        self._cuerpo = None
+        self._cuerpo_escrito = False
+
+    def escribir(self, texto):
+        """
+        Añade texto al documento (o a su cuerpo, si se ha separado).
+        """
+        if self._cuerpo is not None:
+            self._cuerpo.escribir(texto)
+            return
+        datos = texto.encode("utf-8")
+        self._hash.update(datos)
+        self.bytes += len(datos)
+        self._archivo.write(texto)
+
+    def separar_cuerpo(self):
+        """
+        A partir de aquí, el texto se escribe en el archivo del cuerpo (ver ruta_cuerpo)
+        y el documento solo lo incluye con \\input, hasta que se llama a cerrar_cuerpo.
+        """
+        ruta = ruta_cuerpo(self.ruta)
+        self.escribir(f"\\input{{{os.path.splitext(os.path.basename(ruta))[0]}}}\n")
+        self._cuerpo = EscritorLatex(ruta, self.construccion)
+
+    def cerrar_cuerpo(self):
+        """
+        Cierra el archivo del cuerpo (si se había separado) y vuelve a escribir en el documento.
+        """
+        if self._cuerpo is not None:
+            cuerpo, self._cuerpo = self._cuerpo, None
+            self._cuerpo_escrito = cuerpo.cerrar()
+            self.bytes += cuerpo.bytes
+
+    def cerrar(self):
+        """
+        Cierra el documento: sustituye al anterior si ha cambiado o, si no, descarta el temporal.
+
+        Returns:
+            bool: True si se ha escrito el documento
+        """
+        self.cerrar_cuerpo()
+        self._archivo.close()
+        huella = self._hash.hexdigest()
+        if self.construccion is not None and self.construccion.vigente(self.ruta, huella):
+            os.remove(self._temporal)
+            self.escrito = False
+        else:
+            os.replace(self._temporal, self.ruta)
+            self.escrito = True
+        self.escrito = self.escrito or self._cuerpo_escrito
+        return self.escrito
+
+    def descartar(self):
+        """
+        Abandona el documento sin tocar el que ya había en disco.
+        """
+        if self._cuerpo is not None:
+            self._cuerpo.descartar()
+            self._cuerpo = None
+        self._archivo.close()
+        if os.path.exists(self._temporal):
+            os.remove(self._temporal)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.descartar()
+        return False
+
+def ruta_cuerpo(ruta):
+    """
+    Ruta del archivo del cuerpo de un documento (output/informe.tex -> output/cuerpo_informe.tex).
+    """
+    directorio, nombre = os.path.split(ruta)
+    return os.path.join(directorio, f"cuerpo_{nombre}")
@@ -1,75 +1,160 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+# pandas y matplotlib se importan solo dentro de las funciones que los usan:
+# extraer resultados no debe pagar el coste de importar las librerías de gráficos.
 import os
+import glob
+import json
+import time
+import argparse
 import warnings
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from lector_columna_m import leer_columna_con_cabecera, indice_columna, letra_columna, FormatoNoCompatible
+from ingesta_entregas import abrir_origen, existe_origen, tamano_origen
+from localizador_cabecera import obtener_localizador, huella_disposicion, buscar_marcador, es_marcador
+import instrumentacion
+from salida_graficos import guardar_figura
 from config import (
     ASIGNATURAS, ETIQUETAS_RESULTADOS, COLORES_RESULTADOS, 
     TIPOS_CONVOCATORIAS, PATRON_CODIGO_ASIGNATURA, PATRON_GRUPO, 
-    PATRON_CARPETA, TEXTOS, MAPEO_CALIFICACIONES
+    PATRON_CARPETA, TEXTOS, MAPEO_CALIFICACIONES, NUM_PROCESOS, DIRECTORIO_EXCELS,
+    MARCADOR_CALIFICACIONES, COLUMNA_CALIFICACIONES, TAMANOS_GRAFICOS
 )
 warnings.filterwarnings("ignore")
 
-# A partir de un archivo de excel, extrae los resultados. Los resultados es una estructura con los campos
-# "NP", "SU", "AP", "NO", "EX", "MH".
-# Esta información está en la columna M. Cada fila desde la 2 hasta la última fila tiene las etiquetas:
-# "No presentat", "Suspès", "Aprovat", "Notable"
-# Si se encuentra una etiqueta que no sea esta, se lanza una excepción.
-def extraer_resultado_de_excel(filename):
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f"El archivo {filename} no existe.")
+# Variantes tipográficas del apóstrofo que aparecen en las exportaciones ("d'honor", "d’honor", ...)
+_APOSTROFOS = str.maketrans({"’": "'", "‘": "'", "`": "'", "´": "'", "ʼ": "'", "′": "'"})
+
+def normalizar_etiqueta(texto):
+    """
+    Normaliza una etiqueta de calificación para compararla sin depender de
+    mayúsculas, acentos, variantes del apóstrofo o espacios repetidos.
     
-    # Inicializar el diccionario de resultados
-    resultados = {"NP": 0, "SU": 0, "AP": 0, "NO": 0, "EX": 0, "MH": 0}
+    Args:
+        texto (str): Etiqueta tal como aparece en el Excel
+        
+    Returns:
+        str: Etiqueta normalizada (p.ej. "Matrícula d’Honor" -> "matricula d'honor")
+    """
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    # "Excel.lent" y "Excel·lent" (con "ŀ" ya descompuesta por NFKD) se tratan igual
+    texto = texto.translate(_APOSTROFOS).replace("l.l", "l·l")
+    return " ".join(texto.casefold().split())
+
+def construir_indice_calificaciones(mapeo=None):
+    """
+    Compila MAPEO_CALIFICACIONES en un diccionario etiqueta normalizada -> código.
     
-    try:
-        # Usar pandas para leer el archivo Excel sin interpretar cabeceras automáticamente
-        # header=None evita que pandas use la primera fila como cabeceras
-        df = pd.read_excel(filename, engine=None, header=None)  
+    Args:
+        mapeo (dict): Mapeo código -> lista de variantes (por defecto MAPEO_CALIFICACIONES)
         
-        # Verificar si existe la columna M (índice 12)
-        if len(df.columns) <= 12:
-            raise ValueError(f"El archivo {filename} no tiene suficientes columnas (necesita al menos columna M)")
+    Returns:
+        dict: Índice {etiqueta_normalizada: codigo}
+    """
+    if mapeo is None:
+        mapeo = MAPEO_CALIFICACIONES
+    indice = {}
+    for codigo, variantes in mapeo.items():
+        for variante in variantes:
+            clave = normalizar_etiqueta(variante)
+            if indice.setdefault(clave, codigo) != codigo:
+                raise ValueError(f"La etiqueta '{variante}' está asignada a {indice[clave]} y a {codigo} "
+                                 "en MAPEO_CALIFICACIONES")
+    return indice
+
+# Índice compilado una sola vez al importar el módulo
+INDICE_CALIFICACIONES = construir_indice_calificaciones()
+
+def contar_calificaciones(valores, fila_inicio=0, indice=None):
+    """
+    Cuenta las calificaciones de una lista de valores en una sola pasada.
+    
+    Las celdas se agrupan primero con Counter (en C) y solo se normaliza cada
+    etiqueta distinta una vez, de modo que el coste por alumno es mínimo.
+    
+    Args:
+        valores (list): Valores de la columna de calificaciones, uno por fila
+        fila_inicio (int): Posición del primer valor a contar
+        indice (dict): Índice de etiquetas normalizadas (por defecto INDICE_CALIFICACIONES)
+        
+    Returns:
+        tuple: (resultados, desconocidas) donde resultados es el diccionario de
+               conteos por código y desconocidas una lista de diccionarios
+               {"etiqueta", "total", "filas"} con las etiquetas no reconocidas
+               (filas numeradas desde 1, como en Excel)
+    """
+    if indice is None:
+        indice = INDICE_CALIFICACIONES
+    
+    resultados = {codigo: 0 for codigo in ETIQUETAS_RESULTADOS}
+    etiquetas_desconocidas = set()
+    
+    for valor, total in Counter(valores[fila_inicio:]).items():
+        # Ignorar celdas vacías (None, NaN de pandas o texto en blanco)
+        if valor is None or valor != valor:
+            continue
+        texto = str(valor).strip()
+        if not texto or texto == "nan":
+            continue
         
-        # Obtener la columna M (índice 12)
-        column_m = df.iloc[:, 12]  # Columna M es índice 12
+        codigo = indice.get(normalizar_etiqueta(texto))
+        if codigo is not None:
+            resultados[codigo] += total
+        else:
+            etiquetas_desconocidas.add(valor)
+    
+    # Localizar las filas solo si hay etiquetas desconocidas (caso poco habitual)
+    desconocidas = []
+    if etiquetas_desconocidas:
+        filas = {}
+        for i in range(fila_inicio, len(valores)):
+            if valores[i] in etiquetas_desconocidas:
+                filas.setdefault(valores[i], []).append(i + 1)
+        for valor, lista_filas in filas.items():
+            desconocidas.append({
+                "etiqueta": str(valor).strip(),
+                "total": len(lista_filas),
+                "filas": lista_filas
+            })
+    
+    return resultados, desconocidas
+
+def extraer_resultado_detallado(filename, usar_cache=True):
+    """
+    Extrae los resultados de un archivo Excel junto con un informe de la lectura.
+    
+    Args:
+        filename (str): Ruta del archivo Excel (o ruta de origen de un acta de una
+                        entrega, ver ingesta_entregas)
+        usar_cache (bool): Si False, las disposiciones de hoja no se leen ni se
+                           guardan en la caché (ver localizar_calificaciones)
         
-        # Buscar la fila que contiene "DSP_NOMID1" en la columna M
-        fila_inicio = None
-        for i, valor in enumerate(column_m):
-            if pd.notna(valor) and str(valor).strip() == "DSP_NOMID1":
-                fila_inicio = i + 1  # Las calificaciones empiezan en la siguiente fila
-                # print(f"Encontrado 'DSP_NOMID1' en fila {i+1} de {filename}")
-                break
+    Returns:
+        dict: {"resultados": {...}, "desconocidas": [...], "fila_inicio": int,
+               "filas": int, "marcador_encontrado": bool, "columna": str,
+               "disposicion_conocida": bool}
+    """
+    if not existe_origen(filename):
+        raise FileNotFoundError(f"El archivo {filename} no existe.")
+    
+    try:
+        # Columna de las calificaciones y fila siguiente al marcador "DSP_NOMID1"
+        column_m, columna, fila_inicio, disposicion_conocida = localizar_calificaciones(filename, usar_cache)
         
-        if fila_inicio is None:
+        marcador_encontrado = fila_inicio is not None
+        if not marcador_encontrado:
             # Si no se encuentra "DSP_NOMID1", intentar buscar otras variantes o usar comportamiento por defecto
-            print(f"Advertencia: No se encontró 'DSP_NOMID1' en {filename}")
-            # Mostrar algunas filas de la columna M para debug
-            print("Primeras 10 filas de la columna M:")
+            print(f"Advertencia: No se encontró '{MARCADOR_CALIFICACIONES}' en {filename}")
+            # Mostrar algunas filas de la columna para debug
+            print(f"Primeras 10 filas de la columna {columna}:")
             for i in range(min(10, len(column_m))):
-                valor = column_m.iloc[i]
+                valor = column_m[i]
                 print(f"  Fila {i+1}: '{valor}' (tipo: {type(valor)})")
             fila_inicio = 0
         
-        # Recorrer los valores de la columna M desde la fila de inicio
-        for i in range(fila_inicio, len(column_m)):
-            resultado = column_m.iloc[i]
-            # Convertir a string y limpiar espacios
-            resultado_str = str(resultado).strip() if pd.notna(resultado) else ""
-            
-            # Buscar la calificación en el mapeo configurado
-            calificacion_encontrada = False
-            for codigo, variantes in MAPEO_CALIFICACIONES.items():
-                if resultado_str in variantes:
-                    resultados[codigo] += 1
-                    calificacion_encontrada = True
-                    break
-            
-            if not calificacion_encontrada and resultado_str != "" and resultado_str != "nan":
-                # Si encontramos algo que no es una calificación conocida, podría ser el final de los datos
-                # Solo mostrar advertencia si no es una celda vacía
-                if resultado_str and resultado_str != "nan":
-                    print(f"Advertencia en {filename}: Etiqueta desconocida '{resultado_str}' en fila {i+1}")
+        # Contar todas las calificaciones desde la fila de inicio
+        resultados, desconocidas = contar_calificaciones(column_m, fila_inicio)
                 
     except Exception as e:
         if "No module named" in str(e):
@@ -78,17 +163,275 @@ def extraer_resultado_de_excel(filename):
         else:
             raise
     
-    return resultados
+    return {
+        "resultados": resultados,
+        "desconocidas": desconocidas,
+        "fila_inicio": fila_inicio,
+        "filas": len(column_m),
+        "marcador_encontrado": marcador_encontrado,
+        "columna": columna,
+        "disposicion_conocida": disposicion_conocida
+    }
+
+def localizar_calificaciones(filename, usar_cache=True):
+    """
+    Lee la columna de calificaciones de un acta y localiza la fila en la que empiezan.
+    
+    Si la disposición de la hoja ya se conoce (ver localizador_cabecera), se lee
+    directamente la columna del marcador y solo se comprueba que sigue en su fila.
+    Si no, el marcador se busca en la primera fila y en COLUMNA_CALIFICACIONES, y
+    su posición se recuerda para los siguientes archivos con la misma disposición.
+    
+    Args:
+        filename (str): Ruta del archivo Excel
+        usar_cache (bool): Si False, las disposiciones solo se recuerdan en memoria,
+                           sin leer ni escribir la tabla de la caché SQLite
+        
+    Returns:
+        tuple: (valores, columna, fila_inicio, disposicion_conocida) donde valores es la
+               columna leída, columna su letra y fila_inicio la posición de la primera
+               calificación (None si no se encuentra el marcador)
+    """
+    localizador = obtener_localizador(usar_cache)
+    columna = COLUMNA_CALIFICACIONES
+    valores, cabecera = leer_columna_y_cabecera(filename, columna)
+    huella = huella_disposicion(cabecera)
+    
+    # Disposición conocida: ir directamente a la columna de las calificaciones
+    posicion = localizador.consultar(huella)
+    if posicion is not None:
+        fila, columna_marcador = posicion
+        if columna_marcador != columna:
+            valores, _ = leer_columna_y_cabecera(filename, columna_marcador)
+            columna = columna_marcador
+        if es_marcador(valores, fila):
+            return valores, columna, fila + 1, True
+        localizador.olvidar(huella)
+    
+    # Disposición nueva: el marcador suele estar en la fila de nombres de campo (la
+    # primera de la hoja, que no es la fila 1 si se omiten las filas vacías iniciales)
+    indice = buscar_marcador(cabecera["fila"])
+    if indice is not None:
+        fila = cabecera["posicion"]
+        if letra_columna(indice) != columna:
+            columna = letra_columna(indice)
+            valores, _ = leer_columna_y_cabecera(filename, columna)
+    else:
+        fila = buscar_marcador(valores)
+    if fila is None:
+        return valores, columna, None, False
+    
+    localizador.recordar(huella, fila, columna, filename)
+    return valores, columna, fila + 1, False
+
+# A partir de un archivo de excel, extrae los resultados. Los resultados es una estructura con los campos
+# "NP", "SU", "AP", "NO", "EX", "MH".
+# Esta información está en la columna M, a partir de la fila siguiente a "DSP_NOMID1".
+# Las etiquetas se reconocen según MAPEO_CALIFICACIONES (sin distinguir mayúsculas, acentos ni apóstrofos).
+# Las etiquetas desconocidas se ignoran y se avisa de ellas agrupadas por etiqueta.
+def extraer_resultado_de_excel(filename):
+    detalle = extraer_resultado_detallado(filename)
+    _avisar_etiquetas_desconocidas(filename, detalle["desconocidas"])
+    return detalle["resultados"]
+
+def _avisar_etiquetas_desconocidas(filename, desconocidas):
+    """
+    Muestra un aviso por cada etiqueta desconocida (ver contar_calificaciones).
+    """
+    for desconocida in desconocidas:
+        filas = ", ".join(str(f) for f in desconocida["filas"][:10])
+        if len(desconocida["filas"]) > 10:
+            filas += ", ..."
+        print(f"Advertencia en {filename}: Etiqueta desconocida '{desconocida['etiqueta']}' "
+              f"({desconocida['total']} veces) en filas {filas}")
+
+def leer_columna_m(filename):
+    """
+    Obtiene los valores de la columna M de un archivo de actas.
+    
+    Args:
+        filename (str): Ruta del archivo Excel
+        
+    Returns:
+        list: Valores de la columna M, uno por fila
+    """
+    return leer_columna_y_cabecera(filename, "M")[0]
+
+def leer_columna_y_cabecera(filename, columna="M"):
+    """
+    Obtiene los valores de una columna de un archivo de actas y la cabecera de la hoja.
+    
+    Primero intenta el lector en streaming (paquetes xlsx, que es lo que exporta
+    el sistema de actas aunque la extensión sea .xls). Si el archivo no es compatible
+    se lee con pandas como siempre.
+    
+    Args:
+        filename (str): Ruta del archivo Excel (o ruta de origen, ver ingesta_entregas)
+        columna (str): Letra de la columna
+        
+    Returns:
+        tuple: (valores, cabecera) con los valores de la columna, uno por fila, y
+               {"columnas": número de columnas, "fila": valores de la primera fila,
+                "posicion": posición de esa fila en los valores (0 = fila 1)}
+    """
+    fuente, hoja = abrir_origen(filename)
+    try:
+        return leer_columna_con_cabecera(fuente, columna, hoja)
+    except FormatoNoCompatible:
+        pass
+    except ValueError:
+        raise ValueError(f"El archivo {filename} no tiene suficientes columnas (necesita al menos columna {columna})")
+    
+    import pandas as pd
+    
+    # Usar pandas para leer el archivo Excel sin interpretar cabeceras automáticamente
+    # header=None evita que pandas use la primera fila como cabeceras
+    if hasattr(fuente, "seek"):
+        fuente.seek(0)
+    df = pd.read_excel(fuente, engine=None, header=None, sheet_name=hoja if hoja is not None else 0)
+    
+    # Verificar si existe la columna (M es el índice 12)
+    indice = indice_columna(columna)
+    if len(df.columns) <= indice:
+        raise ValueError(f"El archivo {filename} no tiene suficientes columnas (necesita al menos columna {columna})")
+    
+    # Primera fila con algún valor, como en el lector en streaming
+    no_vacias = df.index[df.notna().any(axis=1)]
+    posicion = int(no_vacias[0]) if len(no_vacias) else 0
+    cabecera = {"columnas": len(df.columns), "fila": df.iloc[posicion].tolist() if len(df) else [],
+                "posicion": posicion}
+    return df.iloc[:, indice].tolist(), cabecera
+
+def resolver_num_procesos(jobs=None):
+    """
+    Determina el número de procesos a usar para el trabajo en paralelo.
+    
+    Args:
+        jobs (int): Número de procesos pedido. None usa NUM_PROCESOS de config.py;
+                    0 o negativo usa todos los núcleos disponibles
+        
+    Returns:
+        int: Número de procesos (al menos 1)
+    """
+    if jobs is None:
+        jobs = NUM_PROCESOS
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return jobs
+
+def extraer_sin_excepciones(filename, usar_cache=True):
+    """
+    Envoltorio de extraer_resultado_de_excel para los procesos del pool:
+    devuelve el error en lugar de lanzarlo, para no abortar el lote completo.
+    También devuelve las medidas del archivo (tiempo, CPU, bytes y filas) para
+    el informe de ejecución, ya que se toman en el proceso que lo lee.
+    """
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        detalle = extraer_resultado_detallado(filename, usar_cache)
+        _avisar_etiquetas_desconocidas(filename, detalle["desconocidas"])
+        resultados, error, filas = detalle["resultados"], None, detalle["filas"]
+        disposicion_conocida = int(detalle["disposicion_conocida"])
+    except Exception as e:
+        resultados, error, filas, disposicion_conocida = None, e, 0, 0
+    medida = {
+        "segundos": time.perf_counter() - inicio,
+        "cpu_segundos": time.process_time() - inicio_cpu,
+        "bytes": tamano_origen(filename),
+        "filas": filas,
+        "disposicion_conocida": disposicion_conocida,
+    }
+    return filename, resultados, error, medida
+
+def registrar_extraccion(salida):
+    """
+    Pasa al informe de ejecución la medida de un archivo y devuelve (archivo, resultados, error).
+    """
+    filename, resultados, error, medida = salida
+    instrumentacion.registrar_archivo("extraccion", filename, **medida)
+    return filename, resultados, error
+
+def extraer_resultados_en_paralelo(archivos, jobs=None, usar_cache=True):
+    """
+    Extrae los resultados de varios archivos Excel repartiéndolos entre varios procesos.
+    
+    Args:
+        archivos (list): Rutas de los archivos Excel
+        jobs (int): Número de procesos (ver resolver_num_procesos)
+        usar_cache (bool): Si False, no se usan las disposiciones guardadas en la caché
+        
+    Returns:
+        list: Tuplas (archivo, resultados, error) en el mismo orden que `archivos`.
+              Si la extracción falla, resultados es None y error contiene la excepción.
+    """
+    archivos = list(archivos)
+    jobs = min(resolver_num_procesos(jobs), len(archivos))
+    
+    if jobs <= 1:
+        return [registrar_extraccion(extraer_sin_excepciones(archivo, usar_cache)) for archivo in archivos]
+    
+    # map conserva el orden de entrada; los bloques reducen la comunicación entre procesos
+    chunksize = max(1, len(archivos) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return [registrar_extraccion(salida)
+                for salida in pool.map(extraer_sin_excepciones, archivos, [usar_cache] * len(archivos),
+                                       chunksize=chunksize)]
+
+def extraer_resultados_sin_cache(archivos, jobs=None):
+    """
+    Como extraer_resultados_en_paralelo, pero sin usar la caché para nada (--sin-cache):
+    tampoco se leen ni se guardan las disposiciones de hoja.
+    """
+    return extraer_resultados_en_paralelo(archivos, jobs, usar_cache=False)
+
+# Figura y ejes de los diagramas de sectores del proceso (ver lienzo_sectores)
+_lienzo_sectores = None
+
+def lienzo_sectores():
+    """
+    Devuelve la figura y los ejes de los diagramas de sectores, limpios y listos para dibujar.
+
+    La figura se crea una sola vez por proceso con la API orientada a objetos de
+    matplotlib (Figure con un lienzo Agg), sin pasar por pyplot: no queda registrada
+    como figura abierta, y cada diagrama solo borra y vuelve a dibujar sus elementos.
+    Así la memoria no crece con el número de actas.
+
+    Returns:
+        tuple: (figura, ejes)
+    """
+    global _lienzo_sectores
+    if _lienzo_sectores is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        figura = Figure(figsize=TAMANOS_GRAFICOS["sectores"])
+        FigureCanvasAgg(figura)
+        ejes = figura.add_subplot()
+        margenes = {nombre: getattr(figura.subplotpars, nombre)
+                    for nombre in ("left", "bottom", "right", "top", "wspace", "hspace")}
+        _lienzo_sectores = (figura, ejes, margenes)
+
+    figura, ejes, margenes = _lienzo_sectores
+    ejes.clear()
+    # tight_layout del diagrama anterior cambió los márgenes: se parte siempre de los iniciales
+    figura.subplots_adjust(**margenes)
+    return figura, ejes
 
 def generar_diagrama_sectores(resultados, titulo="Distribución de Resultados", mostrar=True, guardar_archivo=None):
     """
     Genera un diagrama de sectores a partir de los resultados.
     
+    Sin mostrar, el diagrama se dibuja en la figura reutilizable del proceso (ver
+    lienzo_sectores): la figura devuelta solo es válida hasta el siguiente diagrama.
+    
     Args:
         resultados (dict): Diccionario con las claves "NP", "SU", "AP", "NO", "EX", "MH"
         titulo (str): Título del gráfico
-        mostrar (bool): Si True, muestra el gráfico en pantalla
+        mostrar (bool): Si True, muestra el gráfico en pantalla (en una figura de pyplot)
         guardar_archivo (str): Si se proporciona, guarda el gráfico en este archivo
+        
+    Returns:
+        matplotlib.figure.Figure: Figura con el diagrama, o None si no hay datos
     """
     # Filtrar solo los resultados que tienen valores > 0
     resultados_filtrados = {k: v for k, v in resultados.items() if v > 0}
@@ -108,37 +451,42 @@ def generar_diagrama_sectores(resultados, titulo="Distribución de Resultados",
     valores = list(resultados_filtrados.values())
     colores_graf = [colores[k] for k in resultados_filtrados.keys()]
     
-    # Crear el gráfico
-    plt.figure(figsize=(10, 8))
+    # Figura: la reutilizable del proceso o, para mostrarla en pantalla, una de pyplot
+    if mostrar:
+        import matplotlib.pyplot as plt
+        figura = plt.figure(figsize=TAMANOS_GRAFICOS["sectores"])
+        ejes = figura.add_subplot()
+    else:
+        figura, ejes = lienzo_sectores()
     
     # Crear el diagrama de sectores
-    wedges, texts, autotexts = plt.pie(valores, labels=etiquetas, colors=colores_graf, 
-                                       autopct='%1.1f%%', startangle=90)
+    wedges, texts, autotexts = ejes.pie(valores, labels=etiquetas, colors=colores_graf, 
+                                        autopct='%1.1f%%', startangle=90)
     
     # Mejorar la apariencia
-    plt.title(titulo, fontsize=16, fontweight='bold', pad=20)
+    ejes.set_title(titulo, fontsize=16, fontweight='bold', pad=20)
     
     # Añadir leyenda con conteos
     leyenda_labels = [f"{etiquetas_completas[k]}: {v}" for k, v in resultados_filtrados.items()]
     total_matriculados = sum(resultados_filtrados.values())
-    plt.legend(wedges, leyenda_labels, title=f"{TEXTOS['leyenda_estudiantes']}: {total_matriculados}", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
+    ejes.legend(wedges, leyenda_labels, title=f"{TEXTOS['leyenda_estudiantes']}: {total_matriculados}", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
     
     # Asegurar que el gráfico sea circular
-    plt.axis('equal')
+    ejes.axis('equal')
     
     # Ajustar el layout para que quepa la leyenda
-    plt.tight_layout()
+    figura.tight_layout()
     
     # Guardar archivo si se especifica
     if guardar_archivo:
-        plt.savefig(guardar_archivo, dpi=300, bbox_inches='tight')
+        guardar_figura(figura, guardar_archivo)
         print(f"Gráfico guardado en: {guardar_archivo}")
     
     # Mostrar gráfico si se solicita
     if mostrar:
         plt.show()
     
-    return plt.gcf()  # Retornar la figura para uso posterior
+    return figura  # Retornar la figura para uso posterior
 
 def obtener_info_asignatura(filename):
     """
@@ -190,3 +538,66 @@ def generar_titulo_completo(filename):
     """
     codigo, nombre, grupo, convocatoria = obtener_info_asignatura(filename)
     return f"{codigo} - {nombre} - {TEXTOS['grupo']} {grupo} - {TEXTOS['convocatoria']} {convocatoria}"
+
+def main():
+    """
+    Modo solo extracción: muestra o serializa los conteos de una carpeta sin generar
+    gráficos ni LaTeX (no importa matplotlib).
+    """
+    parser = argparse.ArgumentParser(description="Extrae los conteos de calificaciones de archivos Excel")
+    parser.add_argument("rutas", nargs="*",
+                        help=f"Archivos, carpetas o zips a procesar (por defecto, las carpetas de {DIRECTORIO_EXCELS})")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Procesos para extraer los Excel en paralelo (0 = todos los núcleos)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No usar la caché de resultados: vuelve a leer todos los Excel")
+    parser.add_argument("--json", action="store_true", help="Escribir el resultado en formato JSON")
+    parser.add_argument("-o", "--salida", help="Archivo donde guardar el JSON (por defecto, la salida estándar)")
+    args = parser.parse_args()
+    
+    # Reunir los archivos a procesar
+    rutas = args.rutas or [os.path.join(DIRECTORIO_EXCELS, carpeta) for carpeta in TIPOS_CONVOCATORIAS]
+    archivos = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            archivos.extend(sorted(glob.glob(os.path.join(ruta, "**", "*.xls"), recursive=True)))
+        elif ruta.lower().endswith(".zip"):
+            # Entrega en un zip: se leen sus actas sin descomprimirlo
+            from ingesta_entregas import listar_entrega
+            actas, descartadas = listar_entrega(ruta, DIRECTORIO_EXCELS)
+            archivos.extend(acta["origen"] for acta in actas)
+            archivos.extend(origen for origen, _ in descartadas)
+        else:
+            archivos.append(ruta)
+    
+    if args.sin_cache:
+        extracciones = extraer_resultados_sin_cache(archivos, args.jobs)
+    else:
+        from cache_resultados import extraer_resultados_con_cache
+        extracciones = extraer_resultados_con_cache(archivos, args.jobs)
+    
+    if args.json:
+        registros = [
+            {"archivo": archivo, "resultados": resultados,
+             "error": str(error) if error is not None else None}
+            for archivo, resultados, error in extracciones
+        ]
+        contenido = json.dumps(registros, ensure_ascii=False, indent=2)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as f:
+                f.write(contenido + "\n")
+        else:
+            print(contenido)
+        return
+    
+    categorias = list(ETIQUETAS_RESULTADOS.keys())
+    print(f"{'Archivo':<40} " + " ".join(f"{c:>4}" for c in categorias) + f" {TEXTOS['tabla_total']:>6}")
+    for archivo, resultados, error in extracciones:
+        if error is not None:
+            print(f"{TEXTOS['error_procesando']} {archivo}: {error}")
+            continue
+        print(f"{archivo:<40} " + " ".join(f"{resultados[c]:>4}" for c in categorias)
+              + f" {sum(resultados.values()):>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Informe de Facultad por Fragmentos
+==================================
+
+Genera a la vez los informes de varias titulaciones o cursos (FRAGMENTOS de
+config.py):
+- Cada fragmento se genera en su propio proceso (generar_informes.py
+  --fragmento <fragmento>): extracción de sus Excel, gráficos y .tex en
+  output/fragmentos/<fragmento>/
+- Los fragmentos se generan en paralelo, y cada uno se puede volver a generar
+  y compilar por separado
+- Al terminar se escribe un índice por tipo de informe
+  (output/fragmentos/informe_barras.tex, ...) que reúne con \\include los cuerpos
+  de todos los fragmentos generados
+
+Uso:
+    python generar_fragmentos.py                            # Todos los fragmentos en paralelo
+    python generar_fragmentos.py --fragmentos 2o-curs -i    # Regenerar solo un fragmento
+    python generar_fragmentos.py -c                         # Y compilar fragmentos e índices
+    python generar_informe_barras.py --fragmento 2o-curs    # Un fragmento con un generador concreto
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from extraer_resultado_de_excel import resolver_num_procesos
+from escritura_latex import PlantillaLatex, EscritorLatex, escapar_latex, ruta_cuerpo
+from compilacion_latex import compilar_documentos, mostrar_resultados
+from preambulo_latex import preambulo_comun
+from config import (
+    FRAGMENTOS, DIRECTORIO_FRAGMENTOS, DIRECTORIO_OUTPUT, TITULO_FACULTAD, AUTOR_INFORME,
+    ARCHIVO_LATEX_SECTORES, ARCHIVO_LATEX_BARRAS, BACKEND_GRAFICOS, CURSO, TITULACIONES
+)
+
+# Documento que produce cada tipo de informe (mismo nombre en cada fragmento y en el índice)
+DOCUMENTOS = {
+    "sectores": ARCHIVO_LATEX_SECTORES,
+    "barras": ARCHIVO_LATEX_BARRAS,
+}
+
+ARCHIVO_REGISTRO = "generacion.log"
+
+PREAMBULO_INDICE = PlantillaLatex(r"""@@preambulo_comun
+\title{@@titulo}
+\author{@@autor}
+\date{\today}
+
+\begin{document}
+
+\maketitle
+\tableofcontents
+\clearpage
+
+""")
+
+FRAGMENTO_INDICE = PlantillaLatex(r"""\part{@@titulo}
+\graphicspath{{@@fragmento/}}
+\include{@@cuerpo}
+
+""")
+
+def directorio_fragmentos():
+    """
+    Carpeta de los fragmentos y de los índices.
+    """
+    return os.path.join(DIRECTORIO_OUTPUT, DIRECTORIO_FRAGMENTOS)
+
+def directorio_salida(fragmento=None):
+    """
+    Carpeta de los documentos y gráficos de un fragmento.
+
+    Args:
+        fragmento (str): Nombre del fragmento (None = informe completo, en DIRECTORIO_OUTPUT)
+    """
+    if fragmento is None:
+        return DIRECTORIO_OUTPUT
+    return os.path.join(directorio_fragmentos(), fragmento)
+
+def datos_fragmento(fragmento=None):
+    """
+    Datos de la portada de un fragmento (las claves que no indica, las de config.py).
+
+    Args:
+        fragmento (str): Nombre del fragmento (None = informe completo)
+
+    Returns:
+        dict: {"curso", "autor", "titulaciones"}
+    """
+    datos = FRAGMENTOS[fragmento] if fragmento is not None else {}
+    return {
+        "curso": datos.get("curso", CURSO),
+        "autor": datos.get("autor", AUTOR_INFORME),
+        "titulaciones": datos.get("titulaciones", TITULACIONES),
+    }
+
+def generar_fragmento(nombre, argumentos):
+    """
+    Genera un fragmento en un proceso aparte. La salida del proceso se guarda en
+    output/fragmentos/<fragmento>/generacion.log.
+
+    Args:
+        nombre (str): Nombre del fragmento (clave de FRAGMENTOS)
+        argumentos (list): Argumentos para generar_informes.py (además de --fragmento)
+
+    Returns:
+        dict: {"fragmento", "estado" ("generado" | "error"), "segundos", "mensaje"}
+    """
+    inicio = time.perf_counter()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generar_informes.py")
+    entorno = {**os.environ, "PYTHONIOENCODING": "utf-8"}
+    proceso = subprocess.run([sys.executable, script, "--fragmento", nombre, *argumentos], env=entorno,
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    salida = proceso.stdout.decode("utf-8", errors="replace")
+
+    directorio = directorio_salida(nombre)
+    os.makedirs(directorio, exist_ok=True)
+    with open(os.path.join(directorio, ARCHIVO_REGISTRO), "w", encoding="utf-8") as f:
+        f.write(salida)
+
+    estado = "generado" if proceso.returncode == 0 else "error"
+    mensaje = "" if estado == "generado" else "\n".join(salida.strip().splitlines()[-10:])
+    return {"fragmento": nombre, "estado": estado, "segundos": time.perf_counter() - inicio,
+            "mensaje": mensaje}
+
+def generar_fragmentos(nombres, argumentos, jobs=0):
+    """
+    Genera varios fragmentos a la vez.
+
+    Args:
+        nombres (list): Fragmentos a generar
+        argumentos (list): Argumentos para generar_informes.py (además de --fragmento)
+        jobs (int): Número máximo de fragmentos simultáneos
+                    (0 = todos los núcleos, None = NUM_PROCESOS de config.py)
+
+    Returns:
+        list: Resultados de generar_fragmento, en el mismo orden que `nombres`
+    """
+    nombres = list(nombres)
+    if not nombres:
+        return []
+    # Cada fragmento es un proceso independiente: basta con hilos para lanzarlos en paralelo
+    jobs = min(resolver_num_procesos(jobs), len(nombres))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lambda nombre: generar_fragmento(nombre, argumentos), nombres))
+
+def generar_indice(archivo_latex, backend=None):
+    """
+    Escribe el índice de un tipo de informe: un documento con una parte por
+    fragmento, que incluye con \\include el cuerpo de cada fragmento generado.
+
+    Args:
+        archivo_latex (str): Nombre del documento del informe (p.ej. "informe_barras.tex")
+        backend (str): Backend de gráficos de los fragmentos (None = BACKEND_GRAFICOS)
+
+    Returns:
+        tuple: (ruta del índice, número de fragmentos incluidos); ruta None si no hay ninguno
+    """
+    backend = backend or BACKEND_GRAFICOS
+    base = directorio_fragmentos()
+    incluidos = []
+    for nombre in FRAGMENTOS:
+        cuerpo = ruta_cuerpo(os.path.join(directorio_salida(nombre), archivo_latex))
+        if os.path.exists(cuerpo):
+            incluidos.append((nombre, os.path.splitext(os.path.relpath(cuerpo, base))[0]))
+    if not incluidos:
+        return None, 0
+
+    ruta = os.path.join(base, archivo_latex)
+    with EscritorLatex(ruta) as escritor:
+        escritor.escribir(PREAMBULO_INDICE.substitute(
+            preambulo_comun=preambulo_comun(backend),
+            titulo=escapar_latex(TITULO_FACULTAD),
+            autor=escapar_latex(AUTOR_INFORME)
+        ))
+        for nombre, cuerpo in incluidos:
+            escritor.escribir(FRAGMENTO_INDICE.substitute(
+                titulo=escapar_latex(datos_fragmento(nombre)["curso"]),
+                fragmento=nombre,
+                cuerpo=cuerpo.replace(os.sep, "/")
+            ))
+        escritor.escribir("\\end{document}\n")
+    return ruta, len(incluidos)
+
+def main():
+    """
+    Genera los fragmentos pedidos en paralelo y los índices del informe de facultad.
+    """
+    parser = argparse.ArgumentParser(description="Genera el informe de facultad por fragmentos (titulaciones o cursos)")
+    parser.add_argument("--fragmentos", nargs="+", choices=list(FRAGMENTOS), default=None,
+                        help="Fragmentos a generar (por defecto, todos los de FRAGMENTOS)")
+    parser.add_argument("--informes", nargs="+", choices=list(DOCUMENTOS), default=None,
+                        help="Informes a generar en cada fragmento (por defecto, todos)")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Fragmentos generados a la vez (0 = todos los núcleos)")
+    parser.add_argument("--jobs-fragmento", type=int, default=1,
+                        help="Procesos de cada fragmento para extraer y dibujar")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No usar la caché de resultados: vuelve a leer todos los Excel")
+    parser.add_argument("-g", "--graficos", choices=["matplotlib", "tikz"], default=None,
+                        help="Backend de gráficos (por defecto, BACKEND_GRAFICOS de config.py)")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="No borrar los fragmentos: regenerar solo lo que ha cambiado")
+    parser.add_argument("-c", "--compilar", action="store_true",
+                        help="Compilar los PDF de cada fragmento y de los índices")
+    args = parser.parse_args()
+
+    nombres = args.fragmentos or list(FRAGMENTOS)
+    informes = args.informes or list(DOCUMENTOS)
+
+    argumentos = ["--informes", *informes, "-j", str(args.jobs_fragmento)]
+    if args.sin_cache:
+        argumentos.append("--sin-cache")
+    if args.graficos:
+        argumentos += ["-g", args.graficos]
+    if args.incremental:
+        argumentos.append("-i")
+    if args.compilar:
+        argumentos.append("-c")
+
+    print(f"🚀 Generando {len(nombres)} fragmentos: {', '.join(nombres)}")
+    errores = 0
+    for resultado in generar_fragmentos(nombres, argumentos, args.jobs):
+        if resultado["estado"] == "generado":
+            print(f"  ✅ {resultado['fragmento']}: generado ({resultado['segundos']:.1f} s)")
+        else:
+            errores += 1
+            print(f"  ❌ {resultado['fragmento']}: error ({resultado['segundos']:.1f} s)")
+            for linea in resultado["mensaje"].splitlines():
+                print(f"      {linea}")
+
+    print("\n📑 Escribiendo los índices...")
+    indices = []
+    for informe in informes:
+        ruta, incluidos = generar_indice(DOCUMENTOS[informe], args.graficos)
+        if ruta is not None:
+            indices.append(ruta)
+            print(f"  ✓ {ruta}: {incluidos} fragmentos")
+
+    if args.compilar and indices:
+        print("\n📄 Compilando los índices...")
+        mostrar_resultados(compilar_documentos(indices, jobs=args.jobs))
+
+    if errores:
+        print(f"\n⚠️  {errores} fragmentos con errores (ver {ARCHIVO_REGISTRO} en su carpeta)")
+        sys.exit(1)
+    print(f"\n🎉 ¡Informe de facultad generado! Revisa la carpeta '{directorio_fragmentos()}'")
+
+if __name__ == "__main__":
+    main()
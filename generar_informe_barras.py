@@ -7,80 +7,115 @@ Este script genera un informe donde:
 - Por cada convocatoria (1Q1, 1Q2, etc.) hay una única tabla con todas las asignaturas
 - Un único gráfico de barras apiladas horizontales por convocatoria
 - Mucho más compacto que el informe con diagramas de sectores
+- Opcionalmente (--tendencias), un gráfico con la evolución de la tasa de aprobados
+  de cada asignatura en los cursos guardados en el archivo histórico
 
 Autor: Sergio López Ureña - Coordinació 2o curs
 """
 
 import os
-import glob
-import matplotlib.pyplot as plt
-import numpy as np
-from collections import defaultdict
-import shutil
+import argparse
 
-from extraer_resultado_de_excel import (
-    extraer_resultado_de_excel, 
-    obtener_info_asignatura
+from extraer_resultado_de_excel import obtener_info_asignatura
+import instrumentacion
+from conjunto_datos import extraer_conjunto_datos
+from cubo_resultados import CuboResultados, huella_resumen
+from renderizado_graficos import renderizar_graficos
+from construccion_incremental import (
+    ConstruccionIncremental, calcular_huella, huella_estilo, huella_plantillas, limpiar_outputs_anteriores
 )
+from compilacion_latex import compilar_documento, mostrar_resultados
+from graficos_tikz import generar_barras_tikz, generar_tendencias_tikz
+from salida_graficos import guardar_figura, extension_graficos, incluir_grafico
+from preambulo_latex import preambulo_comun
+from escritura_latex import PlantillaLatex, EscritorLatex, escapar_latex
+from generar_fragmentos import directorio_salida, datos_fragmento
 from config import (
     TIPOS_CONVOCATORIAS, ETIQUETAS_RESULTADOS, COLORES_RESULTADOS,
-    DIRECTORIO_EXCELS, DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS, 
-    ARCHIVO_LATEX_BARRAS, LATEX_CONFIG, TEXTOS, CURSO, AUTOR_INFORME, 
-    TITULACIONES, ASIGNATURAS
+    SUBDIRECTORIO_GRAFICOS, ARCHIVO_LATEX_BARRAS, TEXTOS, ASIGNATURAS, BACKEND_GRAFICOS,
+    ANYO_ACADEMICO, CATEGORIAS_APROBADO, TENDENCIAS_HISTORICAS, FRAGMENTOS,
+    TAMANOS_GRAFICOS
 )
 
-def limpiar_outputs_anteriores():
-    """
-    Elimina toda la carpeta output de ejecuciones anteriores.
-    """
-    print("🧹 Limpiando outputs de ejecuciones anteriores...")
-    
-    # Eliminar toda la carpeta output si existe
-    if os.path.exists(DIRECTORIO_OUTPUT):
-        shutil.rmtree(DIRECTORIO_OUTPUT)
-        print(f"  ✅ Eliminada carpeta completa: {DIRECTORIO_OUTPUT}")
-    
-    print("✅ Limpieza completada\n")
+# Plantillas del documento (compiladas una sola vez)
+PREAMBULO = PlantillaLatex(r"""@@preambulo_comun
+\title{@@titulo}
+\author{@@autor}
+\date{\today}
+
+\begin{document}
+
+\maketitle
+
+""")
 
-def obtener_datos_por_convocatoria():
+TABLA_CONVOCATORIA = PlantillaLatex(r"""
+\section{@@titulo}
+
+\begin{table}[H]
+\centering
+\small
+\begin{tabular}{|p{4cm}|c|c|c|c|c|c|c|}
+\hline
+\textbf{@@asignatura} & @@categorias & \textbf{@@total} \\
+\hline
+@@filas\hline
+\end{tabular}
+\caption{Resultats en percentatges}
+\end{table}
+
+""")
+
+FIGURA = PlantillaLatex(r"""
+\begin{figure}[H]
+\centering
+@@{grafico}\caption{@@titulo}
+\end{figure}
+""")
+
+FIN_SECCION = """
+\\clearpage
+
+"""
+
+FIN_DOCUMENTO = "\\end{document}"
+
+def obtener_datos_por_convocatoria(jobs=None, usar_cache=True, conjunto=None, canalizar=None, fragmento=None):
     """
     Obtiene todos los datos organizados por convocatoria.
     
+    Args:
+        jobs (int): Número de procesos para extraer los Excel (None = NUM_PROCESOS de config.py)
+        usar_cache (bool): Si True, reutiliza los resultados de la caché persistente
+        conjunto (dict): Conjunto de datos ya extraído (ver conjunto_datos). Si es None
+                         se extraen aquí los Excel
+        canalizar (bool): Si True, solapa la lectura y el análisis de los Excel
+                          (None = CANALIZACION de config.py)
+        fragmento (str): Si se extraen aquí los Excel, solo los de este fragmento
+    
     Returns:
-        dict: Diccionario con estructura:
-        {
-            "1Q1": {
-                "asignaturas": {
-                    "34154": {
-                        "nombre": "Programació matemàtica",
-                        "grupos": {
-                            "A": {"NP": 5, "SU": 3, ...},
-                            "B": {"NP": 2, "SU": 4, ...}
-                        }
-                    },
-                    ...
-                }
-            },
-            ...
-        }
+        CuboResultados: Conteos indexados por (convocatoria, asignatura, grupo, categoría).
+        El eje de convocatorias solo incluye las carpetas con archivos
     """
-    datos_convocatorias = {}
+    # Descubrir y extraer todos los archivos de una vez (salvo que ya se haya hecho)
+    if conjunto is None:
+        conjunto = extraer_conjunto_datos(jobs, usar_cache, canalizar=canalizar, fragmento=fragmento)
+    extracciones = conjunto["extracciones"]
+    
+    convocatorias = []
+    registros = []
     
     for carpeta, info_conv in TIPOS_CONVOCATORIAS.items():
         print(f"📂 Procesando convocatoria: {info_conv['nombre']}")
         
-        # Buscar archivos Excel en esta carpeta
-        patron = os.path.join(DIRECTORIO_EXCELS, carpeta, "*.xls")
-        archivos = glob.glob(patron)
+        archivos = conjunto["carpetas"][carpeta]["archivos"]
         
         if not archivos:
             print(f"  ⚠️  No se encontraron archivos en {carpeta}")
             continue
         
-        datos_convocatorias[carpeta] = {
-            "nombre": info_conv["nombre"],
-            "asignaturas": defaultdict(lambda: {"nombre": "", "grupos": {}})
-        }
+        convocatorias.append(carpeta)
+        asignaturas = set()
         
         for archivo in archivos:
             try:
@@ -91,67 +126,83 @@ def obtener_datos_por_convocatoria():
                     print(f"  ⚠️  Código {codigo} no encontrado en configuración")
                     continue
                 
-                # Extraer resultados
-                resultados = extraer_resultado_de_excel(archivo)
+                # Recuperar resultados extraídos
+                resultados, error = extracciones[archivo]
+                if error is not None:
+                    raise error
                 
                 # Almacenar datos
-                datos_convocatorias[carpeta]["asignaturas"][codigo]["nombre"] = ASIGNATURAS[codigo]
-                datos_convocatorias[carpeta]["asignaturas"][codigo]["grupos"][grupo] = resultados
+                registros.append((carpeta, codigo, grupo, resultados))
+                asignaturas.add(codigo)
                 
                 print(f"  ✓ {codigo}_{grupo}: {sum(resultados.values())} estudiantes")
                 
             except Exception as e:
                 print(f"  ❌ Error procesando {archivo}: {e}")
         
-        print(f"  📊 Total asignaturas en {carpeta}: {len(datos_convocatorias[carpeta]['asignaturas'])}\n")
+        print(f"  📊 Total asignaturas en {carpeta}: {len(asignaturas)}\n")
     
-    return datos_convocatorias
+    return CuboResultados.desde_registros(registros, convocatorias=convocatorias)
+
+def obtener_tendencias(cubo):
+    """
+    Obtiene del archivo histórico la evolución de la tasa de aprobados de cada
+    asignatura y convocatoria, sin volver a leer los Excel de cursos anteriores.
+    El punto del curso actual (ANYO_ACADEMICO) se calcula con el cubo, de modo
+    que no hace falta haberlo archivado antes.
+    
+    Args:
+        cubo (CuboResultados): Conteos del curso actual
+    
+    Returns:
+        dict: {carpeta: {codigo: [(anyo, tasa), ...]}}, solo con las asignaturas
+        que tienen datos de al menos dos cursos
+    """
+    from archivo_historico import tendencias
+    
+    # Una sola lectura del archivo para todas las asignaturas y convocatorias
+    historico = tendencias(cubo.asignaturas, convocatorias=cubo.convocatorias, por_convocatoria=True)
+    indices = [cubo.categorias.index(categoria) for categoria in CATEGORIAS_APROBADO]
+    
+    resultado = {}
+    for carpeta in cubo.convocatorias:
+        datos_conv = cubo.resumen(carpeta)
+        aprobados = datos_conv["porcentajes"][:, indices].sum(axis=1)
+        por_asignatura = {}
+        for codigo, tasa_actual in zip(datos_conv["codigos"], aprobados):
+            puntos = {punto["anyo"]: punto["tasa"] for punto in historico.get(codigo, [])
+                      if punto["convocatoria"] == carpeta}
+            puntos[ANYO_ACADEMICO] = float(tasa_actual)
+            if len(puntos) >= 2:
+                por_asignatura[codigo] = sorted(puntos.items())
+        if por_asignatura:
+            resultado[carpeta] = por_asignatura
+    return resultado
 
 def generar_grafico_barras_apiladas(datos_convocatoria, titulo, archivo_salida):
     """
     Genera un gráfico de barras apiladas horizontales para una convocatoria.
     
     Args:
-        datos_convocatoria (dict): Datos de asignaturas y grupos para una convocatoria
+        datos_convocatoria (dict): Resumen de la convocatoria (ver CuboResultados.resumen)
         titulo (str): Título del gráfico
         archivo_salida (str): Ruta donde guardar el gráfico
     """
-    if not datos_convocatoria["asignaturas"]:
+    if not datos_convocatoria["codigos"]:
         print(f"  ⚠️  No hay datos para generar gráfico: {titulo}")
         return
     
-    # Preparar datos
-    asignaturas_ordenadas = []
-    datos_grupos = defaultdict(list)  # {grupo: [valores_por_asignatura]}
+    # Etiquetas de las asignaturas (ya ordenadas por código); los porcentajes vienen calculados en el cubo
+    asignaturas_ordenadas = [f"{codigo}\n{nombre[:20]}..."
+                             for codigo, nombre in zip(datos_convocatoria["codigos"], datos_convocatoria["nombres"])]
+    porcentajes = datos_convocatoria["porcentajes"]
     
-    # Obtener todas las asignaturas ordenadas por código
-    codigos_ordenados = sorted(datos_convocatoria["asignaturas"].keys())
-    
-    for codigo in codigos_ordenados:
-        info_asignatura = datos_convocatoria["asignaturas"][codigo]
-        nombre_corto = f"{codigo}\n{info_asignatura['nombre'][:20]}..."
-        asignaturas_ordenadas.append(nombre_corto)
-        
-        # Agregar datos de cada grupo, combinando todos los grupos de la asignatura
-        totales_asignatura = {cat: 0 for cat in ETIQUETAS_RESULTADOS.keys()}
-        
-        for grupo, resultados in info_asignatura["grupos"].items():
-            for categoria, valor in resultados.items():
-                totales_asignatura[categoria] += valor
-        
-        # Convertir a porcentajes
-        total_estudiantes = sum(totales_asignatura.values())
-        if total_estudiantes > 0:
-            porcentajes_asignatura = {cat: (valor / total_estudiantes * 100) for cat, valor in totales_asignatura.items()}
-        else:
-            porcentajes_asignatura = {cat: 0 for cat in ETIQUETAS_RESULTADOS.keys()}
-        
-        # Agregar porcentajes a las listas
-        for categoria in ETIQUETAS_RESULTADOS.keys():
-            datos_grupos[categoria].append(porcentajes_asignatura[categoria])
+    # Las librerías de gráficos solo se cargan cuando realmente se dibuja
+    import matplotlib.pyplot as plt
+    import numpy as np
     
     # Crear el gráfico con altura fija y compacta
-    fig, ax = plt.subplots(figsize=(12, 2.5))  # Altura reducida a 2.5 pulgadas para mayor compactación
+    fig, ax = plt.subplots(figsize=TAMANOS_GRAFICOS["barras"])
 
     # Posiciones de las barras
     y_pos = np.arange(len(asignaturas_ordenadas))
@@ -160,16 +211,14 @@ def generar_grafico_barras_apiladas(datos_convocatoria, titulo, archivo_salida):
     left = np.zeros(len(asignaturas_ordenadas))
     
     # Usar las categorías en el mismo orden que las tablas (NP, SU, AP, NO, EX, MH)
-    categorias_ordenadas = list(ETIQUETAS_RESULTADOS.keys())
-    
-    for categoria in categorias_ordenadas:
-        valores = datos_grupos[categoria]
-        if any(v > 0 for v in valores):  # Solo mostrar si hay datos
+    for k, categoria in enumerate(datos_convocatoria["categorias"]):
+        valores = porcentajes[:, k]
+        if valores.any():  # Solo mostrar si hay datos
             ax.barh(y_pos, valores, left=left, 
                    label=ETIQUETAS_RESULTADOS[categoria],
                    color=COLORES_RESULTADOS[categoria],
                    alpha=0.8, edgecolor='white', linewidth=0.5)
-            left += np.array(valores)
+            left += valores
     
     # Configurar el gráfico
     ax.set_yticks(y_pos)
@@ -188,8 +237,45 @@ def generar_grafico_barras_apiladas(datos_convocatoria, titulo, archivo_salida):
     plt.tight_layout()
     
     # Guardar
-    plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-    plt.close()
+    guardar_figura(fig, archivo_salida)
+    plt.close(fig)
+    
+    print(f"  ✓ Gráfico guardado: {os.path.basename(archivo_salida)}")
+
+def generar_grafico_tendencias(tendencias_convocatoria, titulo, archivo_salida):
+    """
+    Genera un gráfico de líneas con la tasa de aprobados de cada asignatura por curso.
+    
+    Args:
+        tendencias_convocatoria (dict): {codigo: [(anyo, tasa), ...]} (ver obtener_tendencias)
+        titulo (str): Título del gráfico
+        archivo_salida (str): Ruta donde guardar el gráfico
+    """
+    from archivo_historico import etiqueta_curso
+    import matplotlib.pyplot as plt
+    
+    fig, ax = plt.subplots(figsize=TAMANOS_GRAFICOS["tendencias"])
+    
+    cursos = set()
+    for codigo, puntos in tendencias_convocatoria.items():
+        anyos = [anyo for anyo, _ in puntos]
+        cursos.update(anyos)
+        ax.plot(anyos, [tasa for _, tasa in puntos], marker='o', linewidth=1.5, markersize=4,
+                label=f"{codigo} {ASIGNATURAS.get(codigo, '')[:20]}")
+    
+    cursos = sorted(cursos)
+    ax.set_xticks(cursos)
+    ax.set_xticklabels([etiqueta_curso(anyo) for anyo in cursos], fontsize=8)
+    ax.set_xlabel(TEXTOS["eje_curso"], fontsize=10)
+    ax.set_ylabel('Aprovats (%)', fontsize=10)
+    ax.set_ylim(0, 100)
+    ax.grid(alpha=0.3)
+    ax.set_title(titulo, fontsize=12, fontweight='bold', pad=20)
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
+    
+    plt.tight_layout()
+    guardar_figura(fig, archivo_salida)
+    plt.close(fig)
     
     print(f"  ✓ Gráfico guardado: {os.path.basename(archivo_salida)}")
 
@@ -204,175 +290,283 @@ def generar_tabla_latex_convocatoria(datos_convocatoria, titulo):
     Returns:
         str: Código LaTeX de la tabla
     """
-    if not datos_convocatoria["asignaturas"]:
+    if not datos_convocatoria["codigos"]:
         return ""
     
-    latex = f"""
-\\section{{{titulo}}}
-
-\\begin{{table}}[H]
-\\centering
-\\small
-\\begin{{tabular}}{{|p{{4cm}}|c|c|c|c|c|c|c|}}
-\\hline
-\\textbf{{{TEXTOS["tabla_asignatura"]}}} & """ + " & ".join([f"\\textbf{{{categoria}}}" for categoria in ETIQUETAS_RESULTADOS.keys()]) + f""" & \\textbf{{{TEXTOS["tabla_total"]}}} \\\\
-\\hline
-"""
-    
-    # Ordenar asignaturas por código
-    codigos_ordenados = sorted(datos_convocatoria["asignaturas"].keys())
-    
-    totales_generales = {cat: 0 for cat in ETIQUETAS_RESULTADOS.keys()}
-    
-    for i, codigo in enumerate(codigos_ordenados):
-        info_asignatura = datos_convocatoria["asignaturas"][codigo]
-        nombre = info_asignatura["nombre"]
-        
-        # Sumar todos los grupos de esta asignatura
-        totales_asignatura = {cat: 0 for cat in ETIQUETAS_RESULTADOS.keys()}
-        grupos_str = ""
-        
-        for grupo, resultados in sorted(info_asignatura["grupos"].items()):
-            grupos_str += grupo
-            for categoria, valor in resultados.items():
-                totales_asignatura[categoria] += valor
-                totales_generales[categoria] += valor
-        
-        total_asignatura = sum(totales_asignatura.values())
-        
-        # Agregar fila a la tabla con porcentajes
+    # Las asignaturas ya vienen ordenadas por código, con los grupos sumados y los porcentajes calculados
+    filas = []
+    for codigo, nombre, grupos_str, porcentajes, total in zip(datos_convocatoria["codigos"],
+                                                              datos_convocatoria["nombres"],
+                                                              datos_convocatoria["grupos"],
+                                                              datos_convocatoria["porcentajes"],
+                                                              datos_convocatoria["totales"]):
+        # Fila de la tabla con porcentajes
         nombre_completo = f"{codigo} - {nombre}"
         if len(grupos_str) > 1:
             nombre_completo += f" ({grupos_str})"
         
-        latex += f"{nombre_completo} & "
+        filas.append(f"{escapar_latex(nombre_completo)} & "
+                     + " & ".join(f"{porcentaje:.1f}\\%" for porcentaje in porcentajes)
+                     + f" & {total} \\\\\n")
+    
+    return TABLA_CONVOCATORIA.substitute(
+        titulo=escapar_latex(titulo),
+        asignatura=escapar_latex(TEXTOS["tabla_asignatura"]),
+        categorias=" & ".join(f"\\textbf{{{escapar_latex(categoria)}}}"
+                              for categoria in datos_convocatoria["categorias"]),
+        total=escapar_latex(TEXTOS["tabla_total"]),
+        # Separador entre asignaturas (no después de la última)
+        filas="\\hline\n".join(filas)
+    )
+
+def generar_seccion_convocatoria(datos_conv, nombre_grafico, tendencias_conv=None, nombre_tendencias=None):
+    """
+    Genera el código LaTeX de la sección de una convocatoria (tabla y gráfico).
+    
+    Args:
+        datos_conv (dict): Datos de la convocatoria
+        nombre_grafico (str): Nombre del archivo del gráfico de barras
+                              (None = gráfico TikZ/pgfplots dentro del .tex)
+        tendencias_conv (dict): Evolución por curso de las asignaturas (None = sin gráfico de tendencias)
+        nombre_tendencias (str): Nombre del archivo del gráfico de tendencias
+                                 (None = gráfico TikZ/pgfplots dentro del .tex)
         
-        # Calcular porcentajes y formatear
-        if total_asignatura > 0:
-            porcentajes = [f"{(totales_asignatura[cat] / total_asignatura * 100):.1f}\\%" for cat in ETIQUETAS_RESULTADOS.keys()]
+    Returns:
+        str: Código LaTeX de la sección
+    """
+    # Generar tabla LaTeX
+    latex = generar_tabla_latex_convocatoria(datos_conv, datos_conv["nombre"])
+    
+    # Agregar gráfico al LaTeX
+    if nombre_grafico is None:
+        grafico = generar_barras_tikz(datos_conv)
+    else:
+        grafico = incluir_grafico(f"{SUBDIRECTORIO_GRAFICOS}/{nombre_grafico}", "0.9\\textwidth")
+    latex += FIGURA.substitute(grafico=grafico,
+                               titulo=f"Distribució de resultats - {escapar_latex(datos_conv['nombre'])}")
+    
+    # Agregar la evolución por curso, si se ha pedido y hay al menos dos cursos
+    if tendencias_conv:
+        if nombre_tendencias is None:
+            grafico = generar_tendencias_tikz(tendencias_conv)
         else:
-            porcentajes = ["0.0\\%" for cat in ETIQUETAS_RESULTADOS.keys()]
-        
-        latex += " & ".join(porcentajes)
-        latex += f" & {total_asignatura} \\\\\n"
-        
-        # Agregar separador entre asignaturas (excepto después de la última)
-        if i < len(codigos_ordenados) - 1:
-            latex += "\\hline\n"
-    
-    latex += """\\hline
-\\end{tabular}
-\\caption{Resultats en percentatges}
-\\end{table}
-
-"""
+            grafico = incluir_grafico(f"{SUBDIRECTORIO_GRAFICOS}/{nombre_tendencias}", "0.9\\textwidth")
+        latex += FIGURA.substitute(
+            grafico=grafico,
+            titulo=f"{escapar_latex(TEXTOS['tendencia_aprobados'])} - {escapar_latex(datos_conv['nombre'])}"
+        )
     
-    return latex
+    return latex + FIN_SECCION
 
-def generar_latex_completo(datos_convocatorias):
+def generar_latex_completo(cubo, incremental=False, jobs=None, backend=None, tendencias=None, fragmento=None):
     """
     Genera el documento LaTeX completo con todas las convocatorias.
     
     Args:
-        datos_convocatorias (dict): Todos los datos organizados por convocatoria
+        cubo (CuboResultados): Conteos de todas las convocatorias (ver obtener_datos_por_convocatoria)
+        incremental (bool): Si True, solo regenera los gráficos y secciones que han cambiado
+        jobs (int): Número de procesos para dibujar los gráficos (None = NUM_PROCESOS de config.py)
+        backend (str): Backend de gráficos, "matplotlib" o "tikz" (None = BACKEND_GRAFICOS)
+        tendencias (dict): Evolución por curso (ver obtener_tendencias; None = sin gráficos de tendencias)
+        fragmento (str): Fragmento del informe de facultad (clave de FRAGMENTOS): en su carpeta,
+                         con su portada y con el cuerpo en un archivo aparte
     """
+    if backend is None:
+        backend = BACKEND_GRAFICOS
+    directorio = directorio_salida(fragmento)
+    portada = datos_fragmento(fragmento)
+
     print("📝 Generando documento LaTeX...")
+    construccion = ConstruccionIncremental("barras", incremental=incremental, directorio=directorio)
+    trabajos = []
     
     # Crear directorio de gráficos si no existe
-    graficos_dir = os.path.join(DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS)
-    if not os.path.exists(graficos_dir):
+    graficos_dir = os.path.join(directorio, SUBDIRECTORIO_GRAFICOS)
+    if backend != "tikz" and not os.path.exists(graficos_dir):
         os.makedirs(graficos_dir)
     
-    # Preámbulo LaTeX
-    latex_content = f"""\\documentclass[{LATEX_CONFIG["fontsize"]},{LATEX_CONFIG["papersize"]}]{{{LATEX_CONFIG["documentclass"]}}}
-\\usepackage[utf8]{{inputenc}}
-\\usepackage[catalan]{{babel}}
-\\usepackage[margin={LATEX_CONFIG["margins"]}]{{geometry}}
-\\usepackage{{graphicx}}
-\\usepackage{{float}}
-\\usepackage{{booktabs}}
-\\usepackage{{array}}
-\\usepackage{{longtable}}
-
-\\title{{{TEXTOS["titulo_informe"]} \\\\ {CURSO} \\\\
-"""
-    
-    # Agregar titulaciones al título
-    for i, titulacion in enumerate(TITULACIONES):
-        latex_content += f"\\small {titulacion}"
-        if i < len(TITULACIONES) - 1:
-            latex_content += " \\\\\n"
-        else:
-            latex_content += "}\n"
-    
-    latex_content += f"""\\author{{{AUTOR_INFORME}}}
-\\date{{\\today}}
-
-\\begin{{document}}
-
-\\maketitle
-
-"""
-    
-    # Procesar cada convocatoria
-    for carpeta, datos_conv in datos_convocatorias.items():
-        if not datos_conv["asignaturas"]:
-            continue
+    # El documento se escribe a medida que se genera cada sección
+    archivo_latex = os.path.join(directorio, ARCHIVO_LATEX_BARRAS)
+    with instrumentacion.etapa("latex_barras"), EscritorLatex(archivo_latex, construccion) as escritor:
+        # Preámbulo LaTeX, con las titulaciones en el título
+        titulo = " \\\\\n".join(
+            [f"{escapar_latex(TEXTOS['titulo_informe'])} \\\\ {escapar_latex(portada['curso'])}"] +
+            [f"\\small {escapar_latex(titulacion)}" for titulacion in portada["titulaciones"]]
+        )
+        # Paquetes en el preámbulo común (ver preambulo_latex)
+        escritor.escribir(PREAMBULO.substitute(
+            preambulo_comun=preambulo_comun(backend),
+            titulo=titulo,
+            autor=escapar_latex(portada["autor"])
+        ))
+        # En un fragmento del informe de facultad, las secciones van a su propio archivo
+        if fragmento is not None:
+            escritor.separar_cuerpo()
         
-        print(f"  📊 Generando contenido para {carpeta}...")
+        # Procesar cada convocatoria
+        plantillas = huella_plantillas(TABLA_CONVOCATORIA, FIGURA)
+        for carpeta in cubo.convocatorias:
+            datos_conv = cubo.resumen(carpeta)
+            if not datos_conv["codigos"]:
+                continue
+            
+            print(f"  📊 Generando contenido para {carpeta}...")
+            
+            # Huella de todo aquello de lo que dependen el gráfico y la sección
+            tendencias_conv = (tendencias or {}).get(carpeta)
+            partes = [huella_resumen(datos_conv), huella_estilo(), backend]
+            if tendencias_conv:
+                partes.append(tendencias_conv)
+            huella = calcular_huella(*partes)
+            
+            # Generar gráfico de barras apiladas (salvo que siga siendo válido o se use TikZ)
+            nombre_grafico = f"barras_{carpeta}{extension_graficos()}" if backend != "tikz" else None
+            archivo_grafico = os.path.join(graficos_dir, nombre_grafico) if nombre_grafico else None
+            if archivo_grafico is not None and not construccion.vigente(archivo_grafico, huella):
+                trabajos.append({
+                    "tipo": "barras",
+                    "datos": datos_conv,
+                    "titulo": datos_conv["nombre"],
+                    "ruta": archivo_grafico,
+                    "origen": carpeta
+                })
+            
+            # Gráfico de tendencias (solo si se ha pedido y hay datos de varios cursos)
+            nombre_tendencias = f"tendencias_{carpeta}{extension_graficos()}" if tendencias_conv and backend != "tikz" else None
+            if nombre_tendencias is not None:
+                archivo_tendencias = os.path.join(graficos_dir, nombre_tendencias)
+                if not construccion.vigente(archivo_tendencias, huella):
+                    trabajos.append({
+                        "tipo": "tendencias",
+                        "datos": tendencias_conv,
+                        "titulo": f"{TEXTOS['tendencia_aprobados']} - {datos_conv['nombre']}",
+                        "ruta": archivo_tendencias,
+                        "origen": f"tendencias de {carpeta}"
+                    })
+            
+            # Generar tabla y figura LaTeX (también dependen de los textos y las plantillas)
+            escritor.escribir(construccion.seccion(
+                carpeta, calcular_huella(huella, plantillas),
+                lambda: generar_seccion_convocatoria(datos_conv, nombre_grafico, tendencias_conv, nombre_tendencias)
+            ))
         
-        # Generar gráfico de barras apiladas
-        nombre_grafico = f"barras_{carpeta}.png"
-        archivo_grafico = os.path.join(graficos_dir, nombre_grafico)
-        generar_grafico_barras_apiladas(datos_conv, datos_conv["nombre"], archivo_grafico)
-        
-        # Generar tabla LaTeX
-        tabla_latex = generar_tabla_latex_convocatoria(datos_conv, datos_conv["nombre"])
-        latex_content += tabla_latex
-        
-        # Agregar gráfico al LaTeX
-        latex_content += f"""
-\\begin{{figure}}[H]
-\\centering
-\\includegraphics[width=0.9\\textwidth]{{{SUBDIRECTORIO_GRAFICOS}/{nombre_grafico}}}
-\\caption{{Distribució de resultats - {datos_conv["nombre"]}}}
-\\end{{figure}}
+        escritor.cerrar_cuerpo()
+        escritor.escribir(FIN_DOCUMENTO)
+    
+    # Renderizar los gráficos pendientes (en paralelo si jobs > 1)
+    with instrumentacion.etapa("graficos_barras"):
+        for trabajo, (_, error) in zip(trabajos, renderizar_graficos(trabajos, jobs)):
+            if error is not None:
+                print(f"  ❌ Error generando gráfico de {trabajo['origen']}: {error}")
+    
+    # El documento ya se ha instalado (solo si ha cambiado); eliminar artefactos huérfanos
+    with instrumentacion.etapa("escritura_barras"):
+        if escritor.escrito:
+            instrumentacion.contar(archivos=1, bytes=escritor.bytes)
+        for eliminado in construccion.finalizar():
+            print(f"  🗑️  Eliminado artefacto huérfano: {eliminado}")
+    
+    if incremental:
+        print(f"♻️  Artefactos reutilizados: {construccion.reutilizados}, regenerados: {construccion.regenerados}")
+    print(f"✅ {TEXTOS['archivo_generado']}: {archivo_latex}")
+    print(f"📄 {TEXTOS['comando_compilar_barras']}")
 
-\\clearpage
+def cargar_tendencias(cubo, tendencias=None):
+    """
+    Carga las tendencias del archivo histórico si se han pedido.
+    
+    Args:
+        cubo (CuboResultados): Conteos del curso actual
+        tendencias (bool): Si True, se cargan (None = TENDENCIAS_HISTORICAS)
+    
+    Returns:
+        dict: Tendencias (ver obtener_tendencias), o None si no se han pedido
+    """
+    if not (TENDENCIAS_HISTORICAS if tendencias is None else tendencias):
+        return None
+    with instrumentacion.etapa("tendencias"):
+        datos = obtener_tendencias(cubo)
+    if not datos:
+        print("  ⚠️  El archivo histórico no tiene cursos anteriores de estas asignaturas")
+    return datos
 
-"""
+def generar_informe(conjunto, jobs=None, incremental=False, backend=None, tendencias=None, fragmento=None):
+    """
+    Genera el informe con barras apiladas a partir de un conjunto de datos compartido.
     
-    latex_content += "\\end{document}"
+    Args:
+        conjunto (dict): Conjunto de datos (ver conjunto_datos.extraer_conjunto_datos)
+        jobs (int): Número de procesos para dibujar los gráficos
+        incremental (bool): Si True, solo regenera lo que ha cambiado
+        backend (str): Backend de gráficos, "matplotlib" o "tikz"
+        tendencias (bool): Si True, añade la evolución por curso (None = TENDENCIAS_HISTORICAS)
+        fragmento (str): Fragmento del informe de facultad (ver generar_latex_completo)
+    """
+    with instrumentacion.etapa("agregacion_barras"):
+        cubo = obtener_datos_por_convocatoria(conjunto=conjunto)
     
-    # Guardar archivo LaTeX
-    archivo_latex = os.path.join(DIRECTORIO_OUTPUT, ARCHIVO_LATEX_BARRAS)
-    with open(archivo_latex, 'w', encoding='utf-8') as f:
-        f.write(latex_content)
+    if not cubo.convocatorias:
+        print("❌ No se encontraron datos para procesar")
+        return
     
-    print(f"✅ {TEXTOS['archivo_generado']}: {archivo_latex}")
-    print(f"📄 {TEXTOS['comando_compilar_barras']}")
+    generar_latex_completo(cubo, incremental=incremental, jobs=jobs, backend=backend,
+                           tendencias=cargar_tendencias(cubo, tendencias), fragmento=fragmento)
 
 def main():
     """
     Función principal del generador de informe con barras apiladas.
     """
-    print("🚀 Iniciando generación de informe con barras apiladas...\n")
+    parser = argparse.ArgumentParser(description="Genera el informe compacto con barras apiladas")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Procesos para extraer los Excel y dibujar los gráficos en paralelo "
+                             "(0 = todos los núcleos)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No usar la caché de resultados: vuelve a leer todos los Excel")
+    parser.add_argument("-g", "--graficos", choices=["matplotlib", "tikz"], default=None,
+                        help="Backend de gráficos (por defecto, BACKEND_GRAFICOS de config.py)")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="No borrar output: regenerar solo los gráficos y secciones obsoletos")
+    parser.add_argument("-c", "--compilar", action="store_true",
+                        help="Compilar el PDF al terminar (se omite si el .tex y los gráficos no cambian)")
+    parser.add_argument("--tendencias", action="store_true", default=None,
+                        help="Añadir la evolución de la tasa de aprobados en los cursos del archivo histórico")
+    parser.add_argument("--sin-canalizacion", action="store_true",
+                        help="Extraer todos los Excel por lotes (sin solapar lectura y análisis)")
+    parser.add_argument("--fragmento", choices=list(FRAGMENTOS), default=None,
+                        help="Generar solo un fragmento del informe de facultad (ver generar_fragmentos.py)")
+    instrumentacion.agregar_opciones(parser)
+    args = parser.parse_args()
+    directorio = directorio_salida(args.fragmento)
     
-    # Limpiar outputs anteriores
-    limpiar_outputs_anteriores()
-    
-    # Obtener datos organizados por convocatoria
-    datos_convocatorias = obtener_datos_por_convocatoria()
-    
-    if not datos_convocatorias:
-        print("❌ No se encontraron datos para procesar")
-        return
+    print("🚀 Iniciando generación de informe con barras apiladas...\n")
     
-    # Generar documento LaTeX completo
-    generar_latex_completo(datos_convocatorias)
+    with instrumentacion.sesion(args, "barras", jobs=args.jobs, backend=args.graficos,
+                                incremental=args.incremental, cache=not args.sin_cache,
+                                canalizacion=not args.sin_canalizacion):
+        # Limpiar outputs anteriores (en modo incremental se conservan)
+        if not args.incremental:
+            limpiar_outputs_anteriores(directorio)
+        
+        # Obtener datos organizados por convocatoria
+        cubo = obtener_datos_por_convocatoria(jobs=args.jobs, usar_cache=not args.sin_cache,
+                                              canalizar=False if args.sin_canalizacion else None,
+                                              fragmento=args.fragmento)
+        
+        if not cubo.convocatorias:
+            print("❌ No se encontraron datos para procesar")
+            return
+        
+        # Generar documento LaTeX completo
+        generar_latex_completo(cubo, incremental=args.incremental, jobs=args.jobs,
+                               backend=args.graficos, tendencias=cargar_tendencias(cubo, args.tendencias),
+                               fragmento=args.fragmento)
+        
+        if args.compilar:
+            with instrumentacion.etapa("compilacion"):
+                mostrar_resultados([compilar_documento(os.path.join(directorio, ARCHIVO_LATEX_BARRAS))])
     
     print("\n🎉 ¡Informe con barras apiladas generado exitosamente!")
-    print(f"📁 Revisa la carpeta '{DIRECTORIO_OUTPUT}' para ver los resultados")
+    print(f"📁 Revisa la carpeta '{directorio}' para ver los resultados")
 
 if __name__ == "__main__":
     main()
@@ -13,32 +13,80 @@ Autor: Sergio López Ureña - Coordinació 2o curs
 """
 
 import os
-import glob
-import shutil
+import argparse
 from extraer_resultado_de_excel import (
     extraer_resultado_de_excel, 
-    generar_diagrama_sectores, 
     generar_titulo_completo,
     obtener_info_asignatura
 )
+import instrumentacion
+from conjunto_datos import descubrir_archivos, extraer_conjunto_datos
+from renderizado_graficos import renderizar_graficos, renderizar_grafico, instalar_del_almacen
+from construccion_incremental import (
+    ConstruccionIncremental, calcular_huella, huella_estilo, huella_plantillas, limpiar_outputs_anteriores
+)
+from compilacion_latex import compilar_documento, mostrar_resultados
+from graficos_tikz import generar_sectores_tikz
+from salida_graficos import extension_graficos, incluir_grafico
+from preambulo_latex import preambulo_comun
+from escritura_latex import PlantillaLatex, EscritorLatex, escapar_latex
+from generar_fragmentos import directorio_salida, datos_fragmento
 from config import (
-    TIPOS_CONVOCATORIAS, ETIQUETAS_RESULTADOS, DIRECTORIO_EXCELS,
-    DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS, ARCHIVO_LATEX_SECTORES,
-    LATEX_CONFIG, TEXTOS, CURSO, AUTOR_INFORME, TITULACIONES
+    ETIQUETAS_RESULTADOS, DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS, ARCHIVO_LATEX_SECTORES,
+    TEXTOS, BACKEND_GRAFICOS, FRAGMENTOS
 )
 
-def limpiar_outputs_anteriores():
-    """
-    Elimina toda la carpeta output de ejecuciones anteriores.
-    """
-    print("🧹 Limpiando outputs de ejecuciones anteriores...")
-    
-    # Eliminar toda la carpeta output si existe
-    if os.path.exists(DIRECTORIO_OUTPUT):
-        shutil.rmtree(DIRECTORIO_OUTPUT)
-        print(f"  ✅ Eliminada carpeta completa: {DIRECTORIO_OUTPUT}")
-    
-    print("✅ Limpieza completada\n")
+# Plantillas del documento (compiladas una sola vez)
+PREAMBULO = PlantillaLatex(r"""@@preambulo_comun
+\title{@@titulo}
+\author{@@autor}
+\date{\today}
+
+\begin{document}
+
+\maketitle
+\tableofcontents
+\newpage
+
+""")
+
+SECCION_CONVOCATORIA = PlantillaLatex(r"""
+\section{@@nombre}
+
+""")
+
+SUBSECCION_ASIGNATURA = PlantillaLatex(r"""
+\subsection{@@codigo - @@nombre - @@grupo_texto @@grupo}
+
+""")
+
+TABLA_RESULTADOS = PlantillaLatex(r"""
+\begin{table}[H]
+\centering
+\caption{@@titulo}
+\begin{tabular}{|l|c|c|}
+\hline
+\textbf{@@resultado} & \textbf{@@estudiantes} & \textbf{@@porcentaje} \\
+\hline
+@@filas
+\hline
+\end{tabular}
+\end{table}
+""")
+
+FIGURA = PlantillaLatex(r"""
+\begin{figure}[H]
+\centering
+@@{grafico}\caption{@@titulo}
+\end{figure}
+
+\newpage
+
+""")
+
+FIN_DOCUMENTO = """
+\\end{document}
+"""
 
 def obtener_archivos_por_carpeta():
     """
@@ -47,54 +95,62 @@ def obtener_archivos_por_carpeta():
     Returns:
         dict: Diccionario con las carpetas como claves y listas de archivos como valores
     """
-    carpetas = {}
-    
-    for carpeta, info in TIPOS_CONVOCATORIAS.items():
-        carpetas[carpeta] = {
-            "nombre": info["nombre"],
-            "archivos": []
-        }
-    
-    for carpeta in carpetas.keys():
-        patron = f"{DIRECTORIO_EXCELS}/{carpeta}/*.xls"
-        archivos = glob.glob(patron)
-        carpetas[carpeta]["archivos"] = sorted(archivos)
-    
-    return carpetas
+    return descubrir_archivos()
 
-def generar_graficos_para_archivo(filename, output_dir=None):
+def generar_graficos_para_archivo(filename, output_dir=None, resultados=None, construccion=None,
+                                  trabajos=None, backend=None):
     """
     Genera los gráficos para un archivo específico y retorna la información.
     
     Args:
         filename (str): Ruta del archivo Excel
         output_dir (str): Directorio donde guardar los gráficos
+        resultados (dict): Resultados ya extraídos del archivo (si es None se extraen aquí)
+        construccion (ConstruccionIncremental): Si se indica, el gráfico solo se
+                                                regenera cuando ha quedado obsoleto
+        trabajos (list): Si se indica, el gráfico no se dibuja aquí sino que se añade
+                         a esta lista de trabajos para renderizarlo después (ver renderizado_graficos)
+        backend (str): "matplotlib" o "tikz" (None = BACKEND_GRAFICOS de config.py). Con "tikz"
+                       no se genera ninguna imagen: el gráfico se escribe en el propio .tex
         
     Returns:
-        dict: Información del archivo con resultados y ruta del gráfico
+        dict: Información del archivo con resultados y ruta del gráfico (None con "tikz")
     """
+    if backend is None:
+        backend = BACKEND_GRAFICOS
+    
     if output_dir is None:
         output_dir = os.path.join(DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS)
     
-    if not os.path.exists(output_dir):
+    if backend != "tikz" and not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
     # Extraer resultados
-    resultados = extraer_resultado_de_excel(filename)
+    if resultados is None:
+        resultados = extraer_resultado_de_excel(filename)
     codigo, nombre, grupo, convocatoria = obtener_info_asignatura(filename)
     titulo = generar_titulo_completo(filename)
     
     # Generar nombre del archivo de gráfico
     base_name = os.path.basename(filename).replace('.xls', '')
-    grafico_path = os.path.join(output_dir, f"{base_name}.png")
+    grafico_path = os.path.join(output_dir, f"{base_name}{extension_graficos()}") if backend != "tikz" else None
     
-    # Generar gráfico
-    generar_diagrama_sectores(
-        resultados, 
-        titulo=titulo, 
-        mostrar=False,  # No mostrar en pantalla
-        guardar_archivo=grafico_path
-    )
+    # Generar gráfico (salvo que el de la ejecución anterior siga siendo válido)
+    huella = calcular_huella(filename, resultados, titulo, huella_estilo())
+    if grafico_path is None:
+        pass  # El gráfico TikZ se genera junto con la sección LaTeX
+    elif construccion is None or not construccion.vigente(grafico_path, huella):
+        trabajo = {
+            "tipo": "sectores",
+            "datos": resultados,
+            "titulo": titulo,
+            "ruta": grafico_path,
+            "origen": filename
+        }
+        if trabajos is not None:
+            trabajos.append(trabajo)
+        elif instalar_del_almacen(trabajo) is None:
+            renderizar_grafico(trabajo)
     
     return {
         "filename": filename,
@@ -108,6 +164,32 @@ def generar_graficos_para_archivo(filename, output_dir=None):
         "total_matriculados": sum(resultados.values())
     }
 
+def preparar_graficos(construccion, backend=None):
+    """
+    Prepara los diagramas de sectores de cada acta a medida que se extrae, para
+    dibujarlos a la vez que se leen las demás (ver canalizacion).
+
+    Args:
+        construccion (ConstruccionIncremental): Registro del informe, el mismo que se pasa
+                                                después a generar_latex_completo; en modo
+                                                incremental no se preparan los gráficos vigentes
+        backend (str): Backend de gráficos (None = BACKEND_GRAFICOS); con "tikz" no hay imágenes
+
+    Returns:
+        callable: Función (archivo, resultados) -> trabajos de gráfico, o None con "tikz"
+    """
+    if (backend or BACKEND_GRAFICOS) == "tikz":
+        return None
+
+    def preparar(archivo, resultados):
+        trabajos = []
+        generar_graficos_para_archivo(archivo, os.path.join(construccion.directorio, SUBDIRECTORIO_GRAFICOS),
+                                      resultados=resultados, construccion=construccion,
+                                      trabajos=trabajos, backend="matplotlib")
+        return trabajos
+
+    return preparar
+
 def generar_tabla_latex(info):
     """
     Genera el código LaTeX para una tabla de resultados.
@@ -129,39 +211,93 @@ def generar_tabla_latex(info):
         count = resultados[key]
         if count > 0:  # Solo mostrar categorías con valores > 0
             porcentaje = (count / info["total_matriculados"]) * 100 if info["total_matriculados"] > 0 else 0
-            filas.append(f"{label} & {count} & {porcentaje:.1f}\\% \\\\")
+            filas.append(f"{escapar_latex(label)} & {count} & {porcentaje:.1f}\\% \\\\")
     
     # Fila total
     filas.append(f"\\hline")
-    filas.append(f"\\textbf{{{TEXTOS['tabla_total']}}} & \\textbf{{{info['total_matriculados']}}} & \\textbf{{100.0\\%}} \\\\")
+    filas.append(f"\\textbf{{{escapar_latex(TEXTOS['tabla_total'])}}} & \\textbf{{{info['total_matriculados']}}} & \\textbf{{100.0\\%}} \\\\")
     
-    tabla_latex = f"""
-\\begin{{table}}[H]
-\\centering
-\\caption{{{info['titulo']}}}
-\\begin{{tabular}}{{|l|c|c|}}
-\\hline
-\\textbf{{{TEXTOS['tabla_resultado']}}} & \\textbf{{{TEXTOS['tabla_estudiantes']}}} & \\textbf{{{TEXTOS['tabla_porcentaje']}}} \\\\
-\\hline
-{chr(10).join(filas)}
-\\hline
-\\end{{tabular}}
-\\end{{table}}
-"""
-    return tabla_latex
+    return TABLA_RESULTADOS.substitute(
+        titulo=escapar_latex(info['titulo']),
+        resultado=escapar_latex(TEXTOS['tabla_resultado']),
+        estudiantes=escapar_latex(TEXTOS['tabla_estudiantes']),
+        porcentaje=escapar_latex(TEXTOS['tabla_porcentaje']),
+        filas="\n".join(filas)
+    )
 
-def generar_latex_completo():
+def generar_seccion_asignatura(asignatura, directorio=None):
+    """
+    Genera el código LaTeX de la subsección de una asignatura-grupo (tabla y gráfico).
+    
+    Args:
+        asignatura (dict): Información devuelta por generar_graficos_para_archivo
+        directorio (str): Carpeta del documento (None = DIRECTORIO_OUTPUT)
+        
+    Returns:
+        str: Código LaTeX de la subsección
+    """
+    latex = SUBSECCION_ASIGNATURA.substitute(
+        codigo=escapar_latex(asignatura['codigo']),
+        nombre=escapar_latex(asignatura['nombre']),
+        grupo_texto=escapar_latex(TEXTOS['grupo']),
+        grupo=escapar_latex(asignatura['grupo'])
+    )
+    
+    # Añadir tabla
+    latex += generar_tabla_latex(asignatura)
+    
+    # Añadir gráfico: imagen generada con matplotlib o código TikZ si no hay imagen
+    if asignatura['grafico_path'] is None:
+        grafico = generar_sectores_tikz(asignatura['resultados'])
+    else:
+        # Convertir ruta absoluta a relativa desde la carpeta del documento
+        grafico_relativo = os.path.relpath(asignatura['grafico_path'],
+                                           directorio or DIRECTORIO_OUTPUT).replace('\\', '/')
+        grafico = incluir_grafico(grafico_relativo, "0.8\\textwidth")
+    latex += FIGURA.substitute(grafico=grafico, titulo=escapar_latex(asignatura['titulo']))
+    return latex
+
+def generar_latex_completo(jobs=None, usar_cache=True, incremental=False, backend=None, conjunto=None,
+                           canalizar=None, construccion=None, fragmento=None):
     """
     Genera el archivo LaTeX completo con todas las asignaturas.
+    
+    Args:
+        jobs (int): Número de procesos para extraer los Excel y dibujar los gráficos
+                    (None = NUM_PROCESOS de config.py)
+        usar_cache (bool): Si True, reutiliza los resultados de la caché persistente
+        incremental (bool): Si True, no borra output y solo regenera lo que ha cambiado
+        backend (str): Backend de gráficos, "matplotlib" o "tikz" (None = BACKEND_GRAFICOS)
+        conjunto (dict): Conjunto de datos ya extraído (ver conjunto_datos). Si es None,
+                         se limpia output (salvo en modo incremental) y se extraen los Excel aquí
+        canalizar (bool): Si True, los gráficos se dibujan mientras se extraen los Excel
+                          (None = CANALIZACION de config.py)
+        construccion (ConstruccionIncremental): Registro del informe, si ya se ha usado para
+                                                preparar los gráficos (ver preparar_graficos)
+        fragmento (str): Fragmento del informe de facultad (clave de FRAGMENTOS): solo sus
+                         asignaturas, en su carpeta y con el cuerpo en un archivo aparte
     """
-    # Limpiar outputs de ejecuciones anteriores
-    limpiar_outputs_anteriores()
+    if backend is None:
+        backend = BACKEND_GRAFICOS
+    directorio = directorio_salida(fragmento)
+
+    if conjunto is None:
+        # Limpiar outputs de ejecuciones anteriores (en modo incremental se conservan)
+        if not incremental:
+            limpiar_outputs_anteriores(directorio)
+        construccion = ConstruccionIncremental("sectores", incremental=incremental, directorio=directorio)
+        conjunto = extraer_conjunto_datos(jobs, usar_cache, canalizar=canalizar,
+                                          preparar_graficos=preparar_graficos(construccion, backend),
+                                          fragmento=fragmento)
+    elif construccion is None:
+        construccion = ConstruccionIncremental("sectores", incremental=incremental, directorio=directorio)
     
-    # Obtener archivos organizados por carpetas
-    carpetas = obtener_archivos_por_carpeta()
+    carpetas = conjunto["carpetas"]
+    extracciones = conjunto["extracciones"]
     
-    # Generar gráficos y recopilar información
+    # Recopilar información y preparar los trabajos de gráfico
     todas_las_asignaturas = {}
+    trabajos = []
     
     for carpeta, info_carpeta in carpetas.items():
         todas_las_asignaturas[carpeta] = {
@@ -171,88 +307,88 @@ def generar_latex_completo():
         
         for archivo in info_carpeta["archivos"]:
             try:
-                info_asignatura = generar_graficos_para_archivo(archivo)
+                resultados, error = extracciones[archivo]
+                if error is not None:
+                    raise error
+                info_asignatura = generar_graficos_para_archivo(archivo,
+                                                                os.path.join(directorio, SUBDIRECTORIO_GRAFICOS),
+                                                                resultados=resultados,
+                                                                construccion=construccion,
+                                                                trabajos=trabajos,
+                                                                backend=backend)
                 todas_las_asignaturas[carpeta]["asignaturas"].append(info_asignatura)
                 print(f"{TEXTOS['procesado']}: {archivo}")
             except Exception as e:
                 print(f"{TEXTOS['error_procesando']} {archivo}: {e}")
     
-    # Generar contenido LaTeX
-    # Crear título dinámico con todas las titulaciones en tamaño \small
-    titulo_completo = f"{TEXTOS['titulo_informe']}\\\\\n"
-    for titulacion in TITULACIONES:
-        titulo_completo += f"\\small {titulacion}\\\\\n"
-    titulo_completo = titulo_completo.rstrip("\\\\\n")  # Remover última línea
+    # Renderizar todos los gráficos pendientes (en paralelo si jobs > 1). Los que ya se
+    # dibujaron durante la extracción (ver canalizacion) solo se aprovechan una vez: en
+    # las regeneraciones del modo vigilancia los resultados pueden haber cambiado
+    with instrumentacion.etapa("graficos_sectores"):
+        dibujados = conjunto.pop("graficos", {})
+        pendientes = [trabajo for trabajo in trabajos if trabajo["ruta"] not in dibujados]
+        errores = {trabajo["ruta"]: dibujados[trabajo["ruta"]]
+                   for trabajo in trabajos if trabajo["ruta"] in dibujados}
+        for ruta, error in renderizar_graficos(pendientes, jobs):
+            errores[ruta] = error
+        fallidos = set()
+        for trabajo in trabajos:
+            if errores[trabajo["ruta"]] is not None:
+                print(f"{TEXTOS['error_procesando']} {trabajo['origen']}: {errores[trabajo['ruta']]}")
+                fallidos.add(trabajo["origen"])
+        for info in todas_las_asignaturas.values():
+            info["asignaturas"] = [a for a in info["asignaturas"] if a["filename"] not in fallidos]
     
-    latex_content = f"""\\documentclass[{LATEX_CONFIG['fontsize']},{LATEX_CONFIG['papersize']}]{{{LATEX_CONFIG['documentclass']}}}
-\\usepackage[{LATEX_CONFIG['encoding']}]{{inputenc}}
-\\usepackage[{LATEX_CONFIG['language']}]{{babel}}
-\\usepackage{{geometry}}
-\\usepackage{{graphicx}}
-\\usepackage{{float}}
-\\usepackage{{array}}
-\\usepackage{{booktabs}}
-\\usepackage{{longtable}}
-
-\\geometry{{margin={LATEX_CONFIG['margins']}}}
-
-\\title{{{titulo_completo}}}
-\\author{{{AUTOR_INFORME}}}
-\\date{{\\today}}
-
-\\begin{{document}}
-
-\\maketitle
-\\tableofcontents
-\\newpage
-
-"""
-    
-    # Generar secciones por carpeta
-    for carpeta, info in todas_las_asignaturas.items():
-        if info["asignaturas"]:  # Solo si hay asignaturas
-            latex_content += f"""
-\\section{{{info['nombre']}}}
-
-"""
-            
-            for asignatura in info["asignaturas"]:
-                latex_content += f"""
-\\subsection{{{asignatura['codigo']} - {asignatura['nombre']} - {TEXTOS['grupo']} {asignatura['grupo']}}}
-
-"""
-                
-                # Añadir tabla
-                latex_content += generar_tabla_latex(asignatura)
+    # Generar contenido LaTeX, escribiéndolo a medida que se genera cada sección
+    archivo_completo = os.path.join(directorio, ARCHIVO_LATEX_SECTORES)
+    portada = datos_fragmento(fragmento)
+    with instrumentacion.etapa("latex_sectores"), EscritorLatex(archivo_completo, construccion) as escritor:
+        # Título con todas las titulaciones en tamaño \small
+        titulo_completo = "\\\\\n".join(
+            [escapar_latex(TEXTOS['titulo_informe'])] +
+            [f"\\small {escapar_latex(titulacion)}" for titulacion in portada["titulaciones"]]
+        )
+        
+        # Paquetes en el preámbulo común (ver preambulo_latex)
+        escritor.escribir(PREAMBULO.substitute(
+            preambulo_comun=preambulo_comun(backend),
+            titulo=titulo_completo,
+            autor=escapar_latex(portada["autor"])
+        ))
+        # En un fragmento del informe de facultad, las secciones van a su propio archivo
+        if fragmento is not None:
+            escritor.separar_cuerpo()
+        
+        # Generar secciones por carpeta
+        plantillas = huella_plantillas(SUBSECCION_ASIGNATURA, TABLA_RESULTADOS, FIGURA)
+        for carpeta, info in todas_las_asignaturas.items():
+            if info["asignaturas"]:  # Solo si hay asignaturas
+                escritor.escribir(SECCION_CONVOCATORIA.substitute(nombre=escapar_latex(info['nombre'])))
                 
-                # Añadir gráfico
-                # Convertir ruta absoluta a relativa desde la carpeta output
-                grafico_relativo = os.path.relpath(asignatura['grafico_path'], DIRECTORIO_OUTPUT).replace('\\', '/')
-                latex_content += f"""
-\\begin{{figure}}[H]
-\\centering
-\\includegraphics[width=0.8\\textwidth]{{{grafico_relativo}}}
-\\caption{{{asignatura['titulo']}}}
-\\end{{figure}}
-
-\\newpage
-
-"""
-    
-    # Cerrar documento
-    latex_content += """
-\\end{document}
-"""
-    
-    # Crear directorio output si no existe
-    if not os.path.exists(DIRECTORIO_OUTPUT):
-        os.makedirs(DIRECTORIO_OUTPUT)
+                for asignatura in info["asignaturas"]:
+                    # La sección solo se regenera si cambian sus datos, gráfico, textos o plantillas
+                    huella_seccion = calcular_huella(asignatura["resultados"], asignatura["titulo"],
+                                                     asignatura["codigo"], asignatura["nombre"],
+                                                     asignatura["grupo"], asignatura["grafico_path"],
+                                                     huella_estilo(), plantillas)
+                    escritor.escribir(construccion.seccion(
+                        asignatura["filename"], huella_seccion,
+                        lambda: generar_seccion_asignatura(asignatura, directorio)
+                    ))
+        
+        escritor.cerrar_cuerpo()
+        # Cerrar documento
+        escritor.escribir(FIN_DOCUMENTO)
     
-    # Guardar archivo LaTeX
-    archivo_completo = os.path.join(DIRECTORIO_OUTPUT, ARCHIVO_LATEX_SECTORES)
-    with open(archivo_completo, "w", encoding="utf-8") as f:
-        f.write(latex_content)
+    # El documento ya se ha instalado (solo si ha cambiado); eliminar artefactos huérfanos
+    with instrumentacion.etapa("escritura_sectores"):
+        if escritor.escrito:
+            instrumentacion.contar(archivos=1, bytes=escritor.bytes)
+        for eliminado in construccion.finalizar():
+            print(f"  🗑️  Eliminado artefacto huérfano: {eliminado}")
     
+    if incremental:
+        print(f"♻️  Artefactos reutilizados: {construccion.reutilizados}, regenerados: {construccion.regenerados}")
     print(f"{TEXTOS['archivo_generado']}: {archivo_completo}")
     print(f"{TEXTOS['comando_compilar']}")
     
@@ -263,5 +399,56 @@ def generar_latex_completo():
         for asignatura in info['asignaturas']:
             print(f"  - {asignatura['codigo']} - {TEXTOS['grupo']} {asignatura['grupo']}: {asignatura['total_matriculados']} {TEXTOS['estudiants']}")
 
+def generar_informe(conjunto, jobs=None, incremental=False, backend=None, construccion=None, fragmento=None):
+    """
+    Genera el informe con diagramas de sectores a partir de un conjunto de datos compartido.
+    
+    Args:
+        conjunto (dict): Conjunto de datos (ver conjunto_datos.extraer_conjunto_datos)
+        jobs (int): Número de procesos para dibujar los gráficos
+        incremental (bool): Si True, solo regenera lo que ha cambiado
+        backend (str): Backend de gráficos, "matplotlib" o "tikz"
+        construccion (ConstruccionIncremental): Registro con el que se prepararon los gráficos
+                                                durante la extracción (None = uno nuevo)
+        fragmento (str): Fragmento del informe de facultad (ver generar_latex_completo)
+    """
+    generar_latex_completo(jobs=jobs, incremental=incremental, backend=backend, conjunto=conjunto,
+                           construccion=construccion, fragmento=fragmento)
+
+def main():
+    """
+    Función principal del generador de informe con diagramas de sectores.
+    """
+    parser = argparse.ArgumentParser(description="Genera el informe con diagramas de sectores")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Procesos para extraer los Excel y dibujar los gráficos en paralelo "
+                             "(0 = todos los núcleos)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No usar la caché de resultados: vuelve a leer todos los Excel")
+    parser.add_argument("-g", "--graficos", choices=["matplotlib", "tikz"], default=None,
+                        help="Backend de gráficos (por defecto, BACKEND_GRAFICOS de config.py)")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="No borrar output: regenerar solo los gráficos y secciones obsoletos")
+    parser.add_argument("-c", "--compilar", action="store_true",
+                        help="Compilar el PDF al terminar (se omite si el .tex y los gráficos no cambian)")
+    parser.add_argument("--sin-canalizacion", action="store_true",
+                        help="Extraer todos los Excel antes de empezar a dibujar (sin solapar las etapas)")
+    parser.add_argument("--fragmento", choices=list(FRAGMENTOS), default=None,
+                        help="Generar solo un fragmento del informe de facultad (ver generar_fragmentos.py)")
+    instrumentacion.agregar_opciones(parser)
+    args = parser.parse_args()
+    
+    with instrumentacion.sesion(args, "sectores", jobs=args.jobs, backend=args.graficos,
+                                incremental=args.incremental, cache=not args.sin_cache,
+                                canalizacion=not args.sin_canalizacion):
+        generar_latex_completo(jobs=args.jobs, usar_cache=not args.sin_cache, incremental=args.incremental,
+                               backend=args.graficos, canalizar=False if args.sin_canalizacion else None,
+                               fragmento=args.fragmento)
+        
+        if args.compilar:
+            with instrumentacion.etapa("compilacion"):
+                mostrar_resultados([compilar_documento(os.path.join(directorio_salida(args.fragmento),
+                                                                    ARCHIVO_LATEX_SECTORES))])
+
 if __name__ == "__main__":
-    generar_latex_completo()
+    main()
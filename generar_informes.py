@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Generador Unificado de Informes
+===============================
+
+Punto de entrada único que:
+- Descubre y extrae los archivos Excel una sola vez (conjunto de datos compartido)
+- Ejecuta sobre ese conjunto todos los informes pedidos en el mismo proceso
+- Limpia la carpeta output una sola vez, de modo que los informes pueden convivir
+
+Para añadir un nuevo tipo de informe basta con registrar en RENDERIZADORES una
+función con la firma generar_informe(conjunto, jobs=None, incremental=False, backend=None,
+fragmento=None).
+
+Uso:
+    python generar_informes.py                      # Todos los informes
+    python generar_informes.py --informes barras    # Solo algunos
+    python generar_informes.py -j 0 -i              # En paralelo e incremental
+    python generar_informes.py --archivar --tendencias  # Archivar el curso y añadir su evolución
+    python generar_informes.py --vigilar            # Regenerar al llegar actas nuevas
+    python generar_informes.py --fragmento 2o-curs  # Un fragmento del informe de facultad
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import argparse
+
+import instrumentacion
+import generar_informe_sectores
+import generar_informe_barras
+from conjunto_datos import extraer_conjunto_datos
+from construccion_incremental import ConstruccionIncremental, limpiar_outputs_anteriores
+from archivo_historico import archivar_conjunto, etiqueta_curso
+from vigilancia_excels import vigilar
+from compilacion_latex import compilar_documentos, mostrar_resultados
+from generar_fragmentos import directorio_salida
+from config import ARCHIVO_LATEX_SECTORES, ARCHIVO_LATEX_BARRAS, ANYO_ACADEMICO, FRAGMENTOS
+
+# Informes disponibles: nombre -> función generar_informe(conjunto, jobs, incremental, backend, fragmento)
+RENDERIZADORES = {
+    "sectores": generar_informe_sectores.generar_informe,
+    "barras": generar_informe_barras.generar_informe,
+}
+
+# Informes que dibujan gráficos de cada acta: nombre -> preparar_graficos(construccion, backend)
+# (los gráficos se dibujan mientras se extraen los Excel, ver canalizacion). El mismo
+# registro de la construcción incremental se pasa después a su generar_informe
+PREPARADORES = {
+    "sectores": generar_informe_sectores.preparar_graficos,
+}
+
+# Documento LaTeX principal que produce cada informe, en la carpeta de salida (para la compilación)
+DOCUMENTOS = {
+    "sectores": ARCHIVO_LATEX_SECTORES,
+    "barras": ARCHIVO_LATEX_BARRAS,
+}
+
+def generar_informes(informes=None, jobs=None, usar_cache=True, incremental=False, backend=None,
+                     archivar=False, tendencias=None, canalizar=None, fragmento=None):
+    """
+    Genera varios informes a partir de una única extracción de los Excel.
+
+    Args:
+        informes (list): Nombres de los informes a generar (None = todos los de RENDERIZADORES)
+        jobs (int): Número de procesos para extraer y dibujar (None = NUM_PROCESOS de config.py)
+        usar_cache (bool): Si True, reutiliza los resultados de la caché persistente
+        incremental (bool): Si True, no borra output y solo regenera lo que ha cambiado
+        backend (str): Backend de gráficos, "matplotlib" o "tikz" (None = BACKEND_GRAFICOS)
+        archivar (bool): Si True, guarda los conteos en el archivo histórico como curso ANYO_ACADEMICO
+        tendencias (bool): Si True, el informe de barras añade la evolución por curso
+                           (None = TENDENCIAS_HISTORICAS de config.py)
+        canalizar (bool): Si True, solapa la extracción de los Excel con el dibujo de los
+                          gráficos de cada acta (None = CANALIZACION de config.py)
+        fragmento (str): Si se indica (clave de FRAGMENTOS), solo las asignaturas de ese
+                         fragmento del informe de facultad, en su propia carpeta
+
+    Returns:
+        dict: Conjunto de datos utilizado
+    """
+    if informes is None:
+        informes = list(RENDERIZADORES)
+
+    desconocidos = [nombre for nombre in informes if nombre not in RENDERIZADORES]
+    if desconocidos:
+        raise ValueError(f"Informes desconocidos: {', '.join(desconocidos)}. "
+                         f"Disponibles: {', '.join(RENDERIZADORES)}")
+
+    # Limpiar una sola vez para que ningún informe borre los artefactos de otro
+    directorio = directorio_salida(fragmento)
+    if not incremental:
+        limpiar_outputs_anteriores(directorio)
+
+    print("📂 Extrayendo resultados de todos los archivos Excel...")
+    construcciones = {nombre: ConstruccionIncremental(nombre, incremental=incremental, directorio=directorio)
+                      for nombre in informes if nombre in PREPARADORES}
+    preparadores = [PREPARADORES[nombre](construccion, backend) for nombre, construccion in construcciones.items()]
+    preparadores = [preparar for preparar in preparadores if preparar is not None]
+
+    def preparar_graficos(archivo, resultados):
+        return [trabajo for preparar in preparadores for trabajo in preparar(archivo, resultados)]
+
+    conjunto = extraer_conjunto_datos(jobs, usar_cache, canalizar=canalizar,
+                                      preparar_graficos=preparar_graficos if preparadores else None,
+                                      fragmento=fragmento)
+    print(f"  ✓ {len(conjunto['extracciones'])} archivos extraídos\n")
+
+    if archivar:
+        with instrumentacion.etapa("archivo_historico"):
+            archivadas = archivar_conjunto(conjunto)
+        print(f"🗄️  {sum(archivadas.values())} actas guardadas en el archivo histórico "
+              f"(curso {etiqueta_curso(ANYO_ACADEMICO)})\n")
+
+    renderizar_informes(conjunto, informes, jobs=jobs, incremental=incremental, backend=backend,
+                        tendencias=tendencias, construcciones=construcciones, fragmento=fragmento)
+
+    return conjunto
+
+def renderizar_informes(conjunto, informes, jobs=None, incremental=False, backend=None, tendencias=None,
+                        construcciones=None, fragmento=None):
+    """
+    Genera los informes pedidos a partir de un conjunto de datos ya extraído.
+
+    Args:
+        conjunto (dict): Conjunto de datos (ver conjunto_datos)
+        informes (list): Nombres de los informes a generar
+        jobs (int), incremental (bool), backend (str), tendencias (bool), fragmento (str): Ver generar_informes
+        construcciones (dict): Registros de la construcción incremental ya usados para preparar
+                               los gráficos durante la extracción: {nombre: ConstruccionIncremental}
+    """
+    construcciones = construcciones or {}
+    for nombre in informes:
+        print(f"🚀 Generando informe: {nombre}")
+        opciones = {"tendencias": tendencias} if nombre == "barras" else {}
+        if nombre in construcciones:
+            opciones["construccion"] = construcciones[nombre]
+        RENDERIZADORES[nombre](conjunto, jobs=jobs, incremental=incremental, backend=backend,
+                               fragmento=fragmento, **opciones)
+        print()
+
+def compilar_informes(informes, jobs=None, fragmento=None):
+    """
+    Compila los documentos LaTeX de los informes (en paralelo, omitiendo los que no cambian).
+    """
+    print("📄 Compilando documentos LaTeX...")
+    documentos = [os.path.join(directorio_salida(fragmento), DOCUMENTOS[nombre])
+                  for nombre in informes if nombre in DOCUMENTOS]
+    with instrumentacion.etapa("compilacion"):
+        mostrar_resultados(compilar_documentos(documentos, jobs=jobs if jobs is not None else 0))
+    print()
+
+def main():
+    """
+    Función principal del generador unificado.
+    """
+    parser = argparse.ArgumentParser(description="Genera todos los informes con una sola extracción de los Excel")
+    parser.add_argument("--informes", nargs="+", choices=list(RENDERIZADORES), default=None,
+                        help="Informes a generar (por defecto, todos)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Procesos para extraer los Excel y dibujar los gráficos en paralelo "
+                             "(0 = todos los núcleos)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No usar la caché de resultados: vuelve a leer todos los Excel")
+    parser.add_argument("-g", "--graficos", choices=["matplotlib", "tikz"], default=None,
+                        help="Backend de gráficos (por defecto, BACKEND_GRAFICOS de config.py)")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="No borrar output: regenerar solo los gráficos y secciones obsoletos")
+    parser.add_argument("-c", "--compilar", action="store_true",
+                        help="Compilar los PDF al terminar (todos a la vez, omitiendo los que no cambian)")
+    parser.add_argument("--sin-canalizacion", action="store_true",
+                        help="Extraer todos los Excel antes de empezar a dibujar (sin solapar las etapas)")
+    parser.add_argument("--vigilar", action="store_true",
+                        help="Seguir vigilando la carpeta de los Excel y regenerar solo lo afectado por cada cambio")
+    parser.add_argument("--archivar", action="store_true",
+                        help="Guardar los conteos en el archivo histórico (Parquet) como curso ANYO_ACADEMICO")
+    parser.add_argument("--tendencias", action="store_true", default=None,
+                        help="Añadir al informe de barras la evolución en los cursos del archivo histórico")
+    parser.add_argument("--fragmento", choices=list(FRAGMENTOS), default=None,
+                        help="Generar solo un fragmento del informe de facultad (ver generar_fragmentos.py)")
+    instrumentacion.agregar_opciones(parser)
+    args = parser.parse_args()
+
+    informes = args.informes or list(RENDERIZADORES)
+    with instrumentacion.sesion(args, "informes", informes=informes, jobs=args.jobs, backend=args.graficos,
+                                incremental=args.incremental, cache=not args.sin_cache,
+                                archivar=args.archivar, tendencias=args.tendencias,
+                                canalizacion=not args.sin_canalizacion):
+        conjunto = generar_informes(informes=informes, jobs=args.jobs, usar_cache=not args.sin_cache,
+                                    incremental=args.incremental, backend=args.graficos,
+                                    archivar=args.archivar, tendencias=args.tendencias,
+                                    canalizar=False if args.sin_canalizacion else None,
+                                    fragmento=args.fragmento)
+
+        if args.compilar:
+            compilar_informes(informes, args.jobs, args.fragmento)
+
+    print("🎉 ¡Informes generados exitosamente!")
+    print(f"📁 Revisa la carpeta '{directorio_salida(args.fragmento)}' para ver los resultados")
+
+    if args.vigilar:
+        print()
+
+        def regenerar(conjunto):
+            renderizar_informes(conjunto, informes, jobs=args.jobs, incremental=True,
+                                backend=args.graficos, tendencias=args.tendencias, fragmento=args.fragmento)
+            if args.compilar:
+                compilar_informes(informes, args.jobs, args.fragmento)
+
+        vigilar(conjunto, regenerar, jobs=args.jobs, usar_cache=not args.sin_cache, fragmento=args.fragmento)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Gráficos Vectoriales con TikZ/pgfplots
+======================================
+
+Backend alternativo de gráficos: en lugar de renderizar PNG con matplotlib,
+genera directamente el código TikZ/pgfplots de cada gráfico a partir de los
+conteos. Los gráficos quedan como vectores dentro del propio .tex, de modo que
+el informe completo se puede producir sin importar matplotlib.
+
+- Diagrama de sectores: sectores dibujados con arcos TikZ y leyenda con conteos
+- Barras apiladas horizontales: eje pgfplots "xbar stacked" en porcentajes
+- Tendencias: líneas pgfplots con la tasa de aprobados de cada asignatura por curso
+
+Los colores se toman de COLORES_RESULTADOS (ver preambulo_tikz). Todos los textos
+(nombres de asignaturas, etiquetas, TEXTOS) se escapan con escapar_latex.
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+from escritura_latex import escapar_latex
+from config import ETIQUETAS_RESULTADOS, COLORES_RESULTADOS, TEXTOS
+
+def nombre_color(categoria):
+    """
+    Nombre del color LaTeX definido para una categoría (p.ej. "NP" -> "resultadoNP").
+    """
+    return f"resultado{categoria}"
+
+def preambulo_tikz():
+    """
+    Genera las líneas de preámbulo necesarias para los gráficos TikZ.
+
+    Returns:
+        str: Código LaTeX con los paquetes y la definición de colores
+    """
+    lineas = [
+        "\\usepackage{xcolor}",
+        "\\usepackage{pgfplots}",
+        "\\pgfplotsset{compat=1.16}",
+    ]
+    for categoria, color in COLORES_RESULTADOS.items():
+        lineas.append(f"\\definecolor{{{nombre_color(categoria)}}}{{HTML}}{{{color.lstrip('#').upper()}}}")
+    return "\n".join(lineas) + "\n"
+
+def generar_sectores_tikz(resultados, radio=3.0):
+    """
+    Genera un diagrama de sectores en TikZ a partir de los resultados.
+
+    Args:
+        resultados (dict): Diccionario con las claves "NP", "SU", "AP", "NO", "EX", "MH"
+        radio (float): Radio del círculo en centímetros
+
+    Returns:
+        str: Código LaTeX (entorno tikzpicture), o cadena vacía si no hay datos
+    """
+    resultados_filtrados = {k: v for k, v in resultados.items() if v > 0}
+    if not resultados_filtrados:
+        return ""
+
+    total = sum(resultados_filtrados.values())
+    lineas = ["\\begin{tikzpicture}"]
+
+    # Mismo criterio que matplotlib: empezar arriba (90º) y avanzar en sentido antihorario
+    angulo = 90.0
+    for categoria, valor in resultados_filtrados.items():
+        amplitud = 360.0 * valor / total
+        fin = angulo + amplitud
+        medio = angulo + amplitud / 2
+        lineas.append(
+            f"\\fill[{nombre_color(categoria)}, draw=white] (0,0) -- ({angulo:.2f}:{radio}cm) "
+            f"arc[start angle={angulo:.2f}, end angle={fin:.2f}, radius={radio}cm] -- cycle;"
+        )
+        lineas.append(f"\\node[font=\\small] at ({medio:.2f}:{radio * 0.65:.2f}cm) "
+                      f"{{{valor / total * 100:.1f}\\%}};")
+        angulo = fin
+
+    # Leyenda con conteos a la derecha del círculo
+    filas = [f"\\multicolumn{{2}}{{@{{}}l}}{{\\textbf{{{escapar_latex(TEXTOS['leyenda_estudiantes'])}: {total}}}}} \\\\"]
+    for categoria, valor in resultados_filtrados.items():
+        filas.append(f"\\textcolor{{{nombre_color(categoria)}}}{{\\rule{{2.5mm}}{{2.5mm}}}} & "
+                     f"{escapar_latex(ETIQUETAS_RESULTADOS[categoria])}: {valor} \\\\")
+    lineas.append(f"\\node[anchor=west, font=\\small] at ({radio + 0.8:.1f}cm, 0) {{%")
+    lineas.append("\\begin{tabular}{@{}ll@{}}")
+    lineas.extend(filas)
+    lineas.append("\\end{tabular}};")
+
+    lineas.append("\\end{tikzpicture}")
+    return "\n".join(lineas) + "\n"
+
+def generar_barras_tikz(datos_convocatoria):
+    """
+    Genera un gráfico pgfplots de barras apiladas horizontales para una convocatoria.
+
+    Args:
+        datos_convocatoria (dict): Resumen de la convocatoria (ver CuboResultados.resumen)
+
+    Returns:
+        str: Código LaTeX (entorno tikzpicture), o cadena vacía si no hay datos
+    """
+    if not datos_convocatoria["codigos"]:
+        return ""
+
+    # Porcentajes por asignatura (grupos ya sumados en el cubo)
+    etiquetas = [escapar_latex(f"{codigo} {nombre[:20]}...")
+                 for codigo, nombre in zip(datos_convocatoria["codigos"], datos_convocatoria["nombres"])]
+    porcentajes = datos_convocatoria["porcentajes"]
+
+    n = len(etiquetas)
+    lineas = [
+        "\\begin{tikzpicture}",
+        "\\begin{axis}[",
+        "    xbar stacked,",
+        "    width=0.7\\textwidth,",
+        f"    height={max(3.0, 0.9 * n + 1.5):.1f}cm,",
+        "    bar width=0.5cm,",
+        "    xmin=0, xmax=100,",
+        "    xtick={0,20,...,100},",
+        "    ytick={" + ",".join(str(i) for i in range(n)) + "},",
+        "    yticklabels={" + ",".join(f"{{{e}}}" for e in etiquetas) + "},",
+        "    yticklabel style={font=\\scriptsize},",
+        "    enlarge y limits={abs=0.6},",
+        "    xlabel={Percentatge d'estudiants (\\%)},",
+        "    legend style={at={(1.02,1)}, anchor=north west, font=\\scriptsize},",
+        "]",
+    ]
+    for k, categoria in enumerate(datos_convocatoria["categorias"]):
+        valores = porcentajes[:, k]
+        if not valores.any():  # Solo mostrar si hay datos
+            continue
+        coordenadas = " ".join(f"({v:.2f},{i})" for i, v in enumerate(valores))
+        lineas.append(f"\\addplot[fill={nombre_color(categoria)}, draw=white] coordinates {{{coordenadas}}};")
+        lineas.append(f"\\addlegendentry{{{escapar_latex(ETIQUETAS_RESULTADOS[categoria])}}}")
+    lineas.append("\\end{axis}")
+    lineas.append("\\end{tikzpicture}")
+    return "\n".join(lineas) + "\n"
+
+def generar_tendencias_tikz(tendencias_convocatoria):
+    """
+    Genera un gráfico pgfplots de líneas con la tasa de aprobados de cada asignatura por curso.
+
+    Args:
+        tendencias_convocatoria (dict): {codigo: [(anyo, tasa), ...]} (ver obtener_tendencias)
+
+    Returns:
+        str: Código LaTeX (entorno tikzpicture), o cadena vacía si no hay datos
+    """
+    if not tendencias_convocatoria:
+        return ""
+
+    from archivo_historico import etiqueta_curso
+
+    cursos = sorted({anyo for puntos in tendencias_convocatoria.values() for anyo, _ in puntos})
+    etiquetas = [escapar_latex(etiqueta_curso(anyo)) for anyo in cursos]
+    lineas = [
+        "\\begin{tikzpicture}",
+        "\\begin{axis}[",
+        "    width=0.7\\textwidth,",
+        "    height=5cm,",
+        "    ymin=0, ymax=100,",
+        "    xtick={" + ",".join(str(anyo) for anyo in cursos) + "},",
+        "    xticklabels={" + ",".join(etiquetas) + "},",
+        "    ticklabel style={font=\\scriptsize},",
+        f"    xlabel={{{escapar_latex(TEXTOS['eje_curso'])}}},",
+        "    ylabel={Aprovats (\\%)},",
+        "    ymajorgrids,",
+        "    legend style={at={(1.02,1)}, anchor=north west, font=\\scriptsize},",
+        "]",
+    ]
+    for codigo, puntos in tendencias_convocatoria.items():
+        coordenadas = " ".join(f"({anyo},{tasa:.2f})" for anyo, tasa in puntos)
+        lineas.append(f"\\addplot+[mark=*] coordinates {{{coordenadas}}};")
+        lineas.append(f"\\addlegendentry{{{escapar_latex(codigo)}}}")
+    lineas.append("\\end{axis}")
+    lineas.append("\\end{tikzpicture}")
+    return "\n".join(lineas) + "\n"
@@ -0,0 +1,261 @@
+"""
+Ingesta de Entregas de Actas
+============================
+
+La secretaría entrega a veces las actas como un único zip, o como un libro
+Excel con una hoja por asignatura y grupo. Este módulo las lee directamente,
+sin descomprimirlas en disco ni repartirlas a mano por las carpetas de
+convocatoria:
+- Zip: cada archivo .xls/.xlsx del zip es un acta
+- Libro con varias hojas: cada hoja es un acta
+
+Cada acta recibe una ruta lógica dentro de la carpeta de los Excel, la misma
+que tendría si se hubiera descomprimido (excels/1Q1/34154_A_1Q1.xls). Así los
+patrones PATRON_* de config.py, los títulos y los nombres de los gráficos
+funcionan igual. La carpeta de convocatoria se toma de las carpetas del zip o,
+si no hay, del nombre del archivo o de la hoja (p.ej. "34154_A_1Q1").
+
+El contenido de cada acta se indica con una ruta de origen:
+    entrega.zip::1Q1/34154_A_1Q1.xls       # Archivo dentro de un zip
+    actas.xlsx#34154_A_1Q1                  # Hoja de un libro
+    entrega.zip::actas.xlsx#34154_A_1Q1     # Hoja de un libro dentro de un zip
+Los miembros del zip se leen en memoria y cada proceso abre el zip una sola vez.
+
+Las entregas se buscan en la raíz de la carpeta de los Excel (ver conjunto_datos).
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import io
+import os
+import re
+import glob
+import zipfile
+import hashlib
+import threading
+
+from lector_columna_m import rutas_hojas
+from config import TIPOS_CONVOCATORIAS, PATRON_CODIGO_ASIGNATURA
+
+SEPARADOR_MIEMBRO = "::"
+SEPARADOR_HOJA = "#"
+
+EXTENSIONES_ACTAS = (".xls", ".xlsx")
+
+# Zips abiertos por este proceso: {ruta: (mtime_ns, tamaño, ZipFile)}
+_contenedores = {}
+_cerrojo_contenedores = threading.Lock()  # Varios hilos pueden leer actas a la vez (ver canalizacion)
+
+def ruta_origen(contenedor, miembro=None, hoja=None):
+    """
+    Compone la ruta de origen de un acta (ver la documentación del módulo).
+    """
+    origen = contenedor
+    if miembro is not None:
+        origen += SEPARADOR_MIEMBRO + miembro
+    if hoja is not None:
+        origen += SEPARADOR_HOJA + hoja
+    return origen
+
+def separar_origen(origen):
+    """
+    Separa una ruta de origen en sus partes.
+
+    Returns:
+        tuple: (contenedor, miembro, hoja); miembro y hoja son None si no se indican
+    """
+    if (SEPARADOR_MIEMBRO not in origen and SEPARADOR_HOJA not in origen) or os.path.exists(origen):
+        return origen, None, None
+    hoja = None
+    libro = origen
+    if SEPARADOR_HOJA in os.path.basename(origen):
+        libro, hoja = origen.rsplit(SEPARADOR_HOJA, 1)
+    contenedor, _, miembro = libro.partition(SEPARADOR_MIEMBRO)
+    return contenedor, miembro or None, hoja
+
+def _abrir_contenedor(ruta):
+    """
+    Devuelve el zip abierto de una entrega, reutilizándolo mientras no cambie en disco.
+    """
+    estado = os.stat(ruta)
+    with _cerrojo_contenedores:
+        abierto = _contenedores.get(ruta)
+        if abierto is not None and abierto[:2] == (estado.st_mtime_ns, estado.st_size):
+            return abierto[2]
+        if abierto is not None:
+            abierto[2].close()
+        zf = zipfile.ZipFile(ruta)
+        _contenedores[ruta] = (estado.st_mtime_ns, estado.st_size, zf)
+        return zf
+
+def abrir_origen(origen):
+    """
+    Prepara la lectura de un acta.
+
+    Args:
+        origen (str): Ruta de un archivo o ruta de origen de una entrega
+
+    Returns:
+        tuple: (fuente, hoja) donde fuente es una ruta o un objeto tipo archivo en
+               memoria con el libro, y hoja el nombre de la hoja (None = la primera)
+    """
+    contenedor, miembro, hoja = separar_origen(origen)
+    if miembro is None:
+        return contenedor, hoja
+    return io.BytesIO(_abrir_contenedor(contenedor).read(miembro)), hoja
+
+def existe_origen(origen):
+    """
+    Comprueba si existe el archivo (o el miembro del zip) de un acta.
+    """
+    contenedor, miembro, _ = separar_origen(origen)
+    if miembro is None:
+        return os.path.exists(contenedor)
+    try:
+        _abrir_contenedor(contenedor).getinfo(miembro)
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return False
+    return True
+
+def tamano_origen(origen):
+    """
+    Tamaño en bytes del libro de un acta (0 si no existe).
+    """
+    contenedor, miembro, _ = separar_origen(origen)
+    try:
+        if miembro is None:
+            return os.path.getsize(contenedor)
+        return _abrir_contenedor(contenedor).getinfo(miembro).file_size
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return 0
+
+def hash_origen(origen, tam_bloque=1 << 20):
+    """
+    Calcula el hash SHA-256 del contenido de un acta: el del archivo o miembro del
+    zip y, si el acta es una hoja de un libro, también el nombre de la hoja.
+
+    Returns:
+        str: Hash en hexadecimal
+    """
+    contenedor, miembro, hoja = separar_origen(origen)
+    h = hashlib.sha256()
+    if miembro is None:
+        with open(contenedor, "rb") as f:
+            for bloque in iter(lambda: f.read(tam_bloque), b""):
+                h.update(bloque)
+    else:
+        with _abrir_contenedor(contenedor).open(miembro) as f:
+            for bloque in iter(lambda: f.read(tam_bloque), b""):
+                h.update(bloque)
+    if hoja is not None:
+        h.update(f"{SEPARADOR_HOJA}{hoja}".encode("utf-8"))
+    return h.hexdigest()
+
+def _es_libro(zf):
+    """
+    Un paquete xlsx es un zip con xl/workbook.xml; cualquier otro zip es una entrega.
+    """
+    try:
+        zf.getinfo("xl/workbook.xml")
+    except KeyError:
+        return False
+    return True
+
+def carpeta_convocatoria(partes):
+    """
+    Busca la carpeta de convocatoria de un acta entre las carpetas de su ruta y
+    las palabras de su nombre (la última que coincida con TIPOS_CONVOCATORIAS).
+
+    Args:
+        partes (list): Carpetas y nombre (de archivo o de hoja) del acta
+
+    Returns:
+        str: Clave de TIPOS_CONVOCATORIAS, o None si no se reconoce
+    """
+    carpetas = [parte for parte in partes[:-1] if parte in TIPOS_CONVOCATORIAS]
+    if carpetas:
+        return carpetas[-1]
+    palabras = re.split(r"[\s_.\-]+", os.path.splitext(partes[-1])[0])
+    palabras = [palabra for palabra in palabras if palabra in TIPOS_CONVOCATORIAS]
+    return palabras[-1] if palabras else None
+
+def _hojas(fuente):
+    """
+    Nombres de las hojas de un libro xlsx (ruta u objeto tipo archivo).
+    """
+    with zipfile.ZipFile(fuente) as zf:
+        return [nombre for nombre, _ in rutas_hojas(zf)]
+
+def listar_entrega(ruta, directorio):
+    """
+    Enumera las actas de una entrega.
+
+    Args:
+        ruta (str): Ruta del zip o del libro de la entrega
+        directorio (str): Carpeta de los Excel en la que se colocan las rutas lógicas
+
+    Returns:
+        tuple: (actas, descartadas) donde actas es una lista de diccionarios
+               {"carpeta", "archivo" (ruta lógica), "origen"} y descartadas una lista
+               de (origen, motivo) de las que no se han podido asignar
+    """
+    actas = []
+    descartadas = []
+
+    def anotar(partes, nombre, origen):
+        carpeta = carpeta_convocatoria(partes)
+        if carpeta is None:
+            descartadas.append((origen, "no se reconoce la convocatoria"))
+        elif not re.search(PATRON_CODIGO_ASIGNATURA, nombre):
+            descartadas.append((origen, "no se reconoce el código de asignatura"))
+        else:
+            actas.append({"carpeta": carpeta, "archivo": f"{directorio}/{carpeta}/{nombre}",
+                          "origen": origen})
+
+    zf = _abrir_contenedor(ruta)
+    if _es_libro(zf):
+        # Libro con una hoja por asignatura y grupo (con una sola hoja, el acta es el libro)
+        hojas = [nombre for nombre, _ in rutas_hojas(zf)]
+        partes = os.path.normpath(os.path.relpath(ruta, directorio)).split(os.sep)
+        if len(hojas) == 1:
+            anotar(partes, os.path.basename(ruta), ruta)
+        else:
+            for hoja in hojas:
+                anotar(partes[:-1] + [hoja], f"{hoja}.xls", ruta_origen(ruta, hoja=hoja))
+        return actas, descartadas
+
+    for info in zf.infolist():
+        miembro = info.filename
+        partes = [parte for parte in miembro.split("/") if parte]
+        if (info.is_dir() or not miembro.lower().endswith(EXTENSIONES_ACTAS)
+                or "__MACOSX" in partes or partes[-1].startswith(".")):
+            continue
+        # Las actas sueltas llevan el código de asignatura en el nombre; solo se abren
+        # (en memoria) los demás libros, por si tienen una hoja por asignatura y grupo
+        hojas = []
+        if not re.search(PATRON_CODIGO_ASIGNATURA, partes[-1]):
+            try:
+                hojas = _hojas(io.BytesIO(zf.read(miembro)))
+            except (zipfile.BadZipFile, KeyError):
+                pass  # .xls binario: no se puede dividir en hojas
+        if len(hojas) <= 1:
+            anotar(partes, partes[-1], ruta_origen(ruta, miembro))
+        else:
+            for hoja in hojas:
+                anotar(partes[:-1] + [hoja], f"{hoja}.xls", ruta_origen(ruta, miembro, hoja))
+    return actas, descartadas
+
+def buscar_entregas(directorio):
+    """
+    Busca las entregas en la raíz de la carpeta de los Excel: zips y libros sueltos
+    (las actas ya repartidas por carpetas de convocatoria no son entregas).
+
+    Returns:
+        list: Rutas de las entregas, ordenadas
+    """
+    entregas = []
+    for ruta in sorted(glob.glob(os.path.join(directorio, "*"))):
+        if os.path.isfile(ruta) and ruta.lower().endswith((".zip",) + EXTENSIONES_ACTAS) \
+                and zipfile.is_zipfile(ruta):
+            entregas.append(ruta)
+    return entregas
@@ -0,0 +1,278 @@
+"""
+Instrumentación de las Ejecuciones
+==================================
+
+Mide cada etapa de la generación de informes (descubrimiento de archivos,
+extracción de los Excel, gráficos, construcción y escritura del LaTeX, ...) y
+cada archivo procesado:
+- Tiempo real y tiempo de CPU
+- Bytes leídos, filas recorridas e imágenes escritas
+
+Las medidas se guardan en un informe de ejecución en JSON y, opcionalmente, se
+muestran en una tabla resumen. También se puede perfilar con cProfile toda la
+ejecución o solo algunas etapas.
+
+Si no hay ningún informe activo (ver iniciar), las funciones de este módulo no
+hacen nada, de modo que la instrumentación no cuesta nada cuando no se usa.
+
+Estructura del informe:
+    {
+        "version": 1,
+        "nombre": "informes",
+        "inicio": "2024-06-01T10:00:00",
+        "segundos": 12.3, "cpu_segundos": 11.9,
+        "parametros": {"jobs": 4, ...},
+        "etapas": [{"nombre": "extraccion", "segundos": ..., "cpu_segundos": ...,
+                    "archivos": ..., "bytes": ..., "filas": ..., "imagenes": ..., ...}, ...],
+        "archivos": [{"etapa": "extraccion", "archivo": "excels/...", "segundos": ...,
+                      "cpu_segundos": ..., "bytes": ..., "filas": ..., "imagenes": ...}, ...]
+    }
+
+El tiempo de CPU de una etapa es el del proceso principal; con varios procesos
+(--jobs > 1) el de los procesos auxiliares aparece en las medidas por archivo.
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+VERSION_INFORME = 1
+
+# Contadores que se acumulan por etapa y por archivo
+CONTADORES = ("archivos", "bytes", "filas", "imagenes")
+
+# Informe activo del proceso (None = instrumentación desactivada)
+_informe = None
+
+class InformeEjecucion:
+    """
+    Acumula las medidas de una ejecución.
+
+    Args:
+        nombre (str): Nombre de la ejecución (p.ej. "sectores", "informes")
+        parametros (dict): Parámetros de la ejecución que se guardan en el informe
+        perfil (cProfile.Profile): Perfilador opcional
+        etapas_perfil (set): Etapas en las que se activa el perfilador (None = toda la ejecución)
+    """
+
+    def __init__(self, nombre, parametros=None, perfil=None, etapas_perfil=None):
+        self.nombre = nombre
+        self.parametros = parametros or {}
+        self.perfil = perfil
+        self.etapas_perfil = etapas_perfil
+        self.etapas = []
+        self.archivos = []
+        self.inicio = datetime.now()
+        self._reloj = time.perf_counter()
+        self._reloj_cpu = time.process_time()
+        self._abiertas = []
+        self.segundos = None
+        self.cpu_segundos = None
+
+    @contextmanager
+    def etapa(self, nombre):
+        """
+        Mide una etapa. Dentro del bloque, contar() suma a los contadores de esta etapa.
+        """
+        medida = {"nombre": nombre, **{contador: 0 for contador in CONTADORES}}
+        perfilar = self.perfil is not None and self.etapas_perfil is not None and nombre in self.etapas_perfil
+        self._abiertas.append(medida)
+        if perfilar:
+            self.perfil.enable()
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield medida
+        finally:
+            medida["segundos"] = time.perf_counter() - inicio
+            medida["cpu_segundos"] = time.process_time() - inicio_cpu
+            if perfilar:
+                self.perfil.disable()
+            self._abiertas.pop()
+            self.etapas.append(medida)
+
+    def contar(self, **valores):
+        """
+        Suma valores a los contadores de la etapa en curso (si la hay).
+        """
+        if self._abiertas:
+            medida = self._abiertas[-1]
+            for clave, valor in valores.items():
+                medida[clave] = medida.get(clave, 0) + valor
+
+    def registrar_archivo(self, etapa, archivo, segundos, cpu_segundos, **contadores):
+        """
+        Registra la medida de un archivo y la suma a la etapa en curso.
+        """
+        self.archivos.append({"etapa": etapa, "archivo": archivo, "segundos": segundos,
+                              "cpu_segundos": cpu_segundos, **contadores})
+        self.contar(archivos=1, **contadores)
+
+    def cerrar(self):
+        """
+        Fija la duración total de la ejecución.
+        """
+        self.segundos = time.perf_counter() - self._reloj
+        self.cpu_segundos = time.process_time() - self._reloj_cpu
+
+    def como_dict(self):
+        """
+        Devuelve el informe como diccionario serializable en JSON.
+        """
+        return {
+            "version": VERSION_INFORME,
+            "nombre": self.nombre,
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "segundos": self.segundos,
+            "cpu_segundos": self.cpu_segundos,
+            "parametros": self.parametros,
+            "etapas": self.etapas,
+            "archivos": self.archivos,
+        }
+
+    def guardar(self, ruta):
+        """
+        Guarda el informe en JSON.
+        """
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, ensure_ascii=False, indent=2, default=str)
+
+    def mostrar_resumen(self, mas_lentos=5):
+        """
+        Muestra una tabla con las medidas de cada etapa y los archivos más lentos.
+
+        Args:
+            mas_lentos (int): Número de archivos más lentos a mostrar
+        """
+        cabecera = (f"{'Etapa':<24}{'Tiempo (s)':>11}{'CPU (s)':>9}{'Archivos':>10}"
+                    f"{'MB':>8}{'Filas':>9}{'Imágenes':>10}{'Arch./s':>9}")
+        print(f"\n⏱️  Tiempos de la ejecución\n{cabecera}\n{'-' * len(cabecera)}")
+        for medida in self.etapas:
+            ritmo = medida["archivos"] / medida["segundos"] if medida["archivos"] and medida["segundos"] else 0
+            print(f"{medida['nombre']:<24}{medida['segundos']:>11.3f}{medida['cpu_segundos']:>9.3f}"
+                  f"{medida['archivos']:>10}{medida['bytes'] / 2**20:>8.2f}{medida['filas']:>9}"
+                  f"{medida['imagenes']:>10}{ritmo:>9.1f}")
+        if self.segundos is not None:
+            print(f"{'Total':<24}{self.segundos:>11.3f}{self.cpu_segundos:>9.3f}")
+
+        if self.archivos and mas_lentos:
+            print("\nArchivos más lentos:")
+            for medida in sorted(self.archivos, key=lambda m: m["segundos"], reverse=True)[:mas_lentos]:
+                print(f"  {medida['segundos'] * 1000:8.1f} ms  {medida['etapa']:<12} {medida['archivo']}")
+
+def iniciar(nombre, parametros=None, perfil=False, etapas_perfil=None):
+    """
+    Activa la instrumentación en el proceso actual.
+
+    Args:
+        nombre (str): Nombre de la ejecución
+        parametros (dict): Parámetros que se guardan en el informe
+        perfil (bool): Si True, perfila con cProfile
+        etapas_perfil (list): Etapas a perfilar (None = toda la ejecución)
+
+    Returns:
+        InformeEjecucion: Informe activo
+    """
+    global _informe
+    perfilador = None
+    if perfil:
+        import cProfile
+        perfilador = cProfile.Profile()
+    _informe = InformeEjecucion(nombre, parametros, perfilador,
+                                set(etapas_perfil) if etapas_perfil else None)
+    if perfilador is not None and _informe.etapas_perfil is None:
+        perfilador.enable()
+    return _informe
+
+def finalizar():
+    """
+    Desactiva la instrumentación y devuelve el informe (None si no estaba activa).
+    """
+    global _informe
+    informe, _informe = _informe, None
+    if informe is not None:
+        if informe.perfil is not None and informe.etapas_perfil is None:
+            informe.perfil.disable()
+        informe.cerrar()
+    return informe
+
+def activa():
+    """
+    Indica si hay un informe de ejecución activo.
+    """
+    return _informe is not None
+
+@contextmanager
+def etapa(nombre):
+    """
+    Mide una etapa en el informe activo. Sin informe activo no hace nada.
+
+    Uso:
+        with etapa("extraccion"):
+            ...
+    """
+    if _informe is None:
+        yield None
+        return
+    with _informe.etapa(nombre) as medida:
+        yield medida
+
+def contar(**valores):
+    """
+    Suma valores (bytes, filas, imagenes, ...) a la etapa en curso del informe activo.
+    """
+    if _informe is not None:
+        _informe.contar(**valores)
+
+def registrar_archivo(etapa, archivo, segundos, cpu_segundos, **contadores):
+    """
+    Registra en el informe activo la medida de un archivo (ver InformeEjecucion.registrar_archivo).
+    """
+    if _informe is not None:
+        _informe.registrar_archivo(etapa, archivo, segundos, cpu_segundos, **contadores)
+
+def agregar_opciones(parser):
+    """
+    Añade a un ArgumentParser las opciones de instrumentación comunes a los generadores.
+    """
+    parser.add_argument("--informe-ejecucion", metavar="JSON", default=None,
+                        help="Guardar las medidas de la ejecución (tiempos, bytes, filas, imágenes) en JSON")
+    parser.add_argument("--tiempos", action="store_true",
+                        help="Mostrar al final una tabla con los tiempos de cada etapa")
+    parser.add_argument("--perfil", metavar="PROF", default=None,
+                        help="Perfilar con cProfile y guardar las estadísticas en este archivo")
+    parser.add_argument("--perfil-etapas", nargs="+", metavar="ETAPA", default=None,
+                        help="Perfilar solo estas etapas (p.ej. extraccion graficos_sectores)")
+
+@contextmanager
+def sesion(args, nombre, **parametros):
+    """
+    Ejecuta un bloque con la instrumentación pedida en las opciones de agregar_opciones.
+    Si no se pidió ninguna, no activa nada.
+
+    Args:
+        args (argparse.Namespace): Opciones de la línea de comandos
+        nombre (str): Nombre de la ejecución
+        **parametros: Parámetros que se guardan en el informe
+    """
+    if not (args.informe_ejecucion or args.tiempos or args.perfil):
+        yield None
+        return
+
+    informe = iniciar(nombre, parametros, perfil=bool(args.perfil), etapas_perfil=args.perfil_etapas)
+    try:
+        yield informe
+    finally:
+        finalizar()
+        if args.tiempos:
+            informe.mostrar_resumen()
+        if args.informe_ejecucion:
+            informe.guardar(args.informe_ejecucion)
+            print(f"📊 Informe de ejecución guardado en {args.informe_ejecucion}")
+        if informe.perfil is not None:
+            import pstats
+            informe.perfil.dump_stats(args.perfil)
+            print(f"\n🔬 Perfil guardado en {args.perfil} (funciones con más tiempo acumulado):")
+            pstats.Stats(informe.perfil).sort_stats("cumulative").print_stats(15)
@@ -0,0 +1,278 @@
+"""
+Lector en Streaming de la Columna M
+===================================
+
+Los archivos .xls exportados por el sistema de actas son en realidad paquetes
+xlsx (un zip con XML). Este módulo lee directamente el XML de la hoja y se
+queda solo con las celdas de una columna (la M por defecto), sin construir
+un DataFrame con toda la hoja.
+
+- La hoja se recorre con iterparse y cada fila se descarta nada más leerla
+- De la tabla de cadenas compartidas solo se conservan las que aparecen en la columna
+- En la misma pasada se puede obtener la cabecera de la hoja (primera fila y número de
+  columnas), que identifica la disposición de la exportación (ver localizador_cabecera)
+- Si el archivo no es un paquete xlsx válido se lanza FormatoNoCompatible, para
+  que el llamador pueda recurrir a pandas
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_PATRON_REFERENCIA = re.compile(r"([A-Z]+)(\d+)")
+
+class FormatoNoCompatible(Exception):
+    """
+    El archivo no se puede leer en streaming (no es un paquete xlsx o le faltan partes).
+    """
+
+def indice_columna(letras):
+    """
+    Convierte una letra de columna de Excel en un índice empezando en 0 ("A" -> 0, "M" -> 12).
+    """
+    indice = 0
+    for letra in letras.upper():
+        indice = indice * 26 + (ord(letra) - ord("A") + 1)
+    return indice - 1
+
+def letra_columna(indice):
+    """
+    Convierte un índice de columna empezando en 0 en su letra de Excel (0 -> "A", 12 -> "M").
+    """
+    letras = ""
+    indice += 1
+    while indice > 0:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(ord("A") + resto) + letras
+    return letras
+
+def _texto_inline(celda):
+    """
+    Concatena el texto de una celda de tipo inlineStr (puede tener varios fragmentos <r><t>).
+    """
+    return "".join(t.text or "" for t in celda.iter(f"{NS_MAIN}t"))
+
+def rutas_hojas(zf):
+    """
+    Obtiene las hojas del libro en orden, resolviendo sus rutas dentro del zip.
+
+    Args:
+        zf (zipfile.ZipFile): Paquete xlsx abierto
+
+    Returns:
+        list: Tuplas (nombre_hoja, ruta_en_zip)
+    """
+    try:
+        with zf.open("xl/_rels/workbook.xml.rels") as f:
+            relaciones = {
+                rel.get("Id"): rel.get("Target")
+                for rel in ET.parse(f).getroot().iter(f"{NS_PKG_REL}Relationship")
+            }
+        with zf.open("xl/workbook.xml") as f:
+            hojas = [
+                (hoja.get("name"), relaciones.get(hoja.get(f"{NS_REL}id")))
+                for hoja in ET.parse(f).getroot().iter(f"{NS_MAIN}sheet")
+            ]
+    except KeyError:
+        return [("Sheet1", "xl/worksheets/sheet1.xml")]
+
+    rutas = []
+    for nombre, destino in hojas:
+        if not destino:
+            continue
+        # Los destinos pueden ser absolutos ("/xl/worksheets/sheet1.xml") o relativos a xl/
+        if destino.startswith("/"):
+            ruta = destino.lstrip("/")
+        else:
+            ruta = posixpath.normpath(posixpath.join("xl", destino))
+        rutas.append((nombre, ruta))
+    return rutas or [("Sheet1", "xl/worksheets/sheet1.xml")]
+
+def _valor_celda(elem):
+    """
+    Valor de una celda como (texto, es_compartida), o None si está vacía.
+    """
+    tipo = elem.get("t")
+    if tipo == "inlineStr":
+        texto = _texto_inline(elem)
+        return (texto, False) if texto else None
+    v = elem.find(f"{NS_MAIN}v")
+    if v is not None and v.text is not None:
+        return v.text, tipo == "s"
+    return None
+
+def _recorrer_columna(f, columna, con_cabecera=False):
+    """
+    Recorre el XML de una hoja y devuelve las celdas de una columna.
+
+    Args:
+        f (file): XML de la hoja
+        columna (int): Índice de la columna
+        con_cabecera (bool): Si True, guarda también todas las celdas de la primera fila
+
+    Returns:
+        tuple: (celdas, max_columna, cabecera, primera_fila) donde celdas es una lista de
+               (fila, valor, es_compartida), max_columna el mayor índice de columna visto,
+               cabecera una lista de (columna, valor, es_compartida) de la primera fila y
+               primera_fila su número (atributo r, puede ser mayor que 1)
+    """
+    celdas = []
+    cabecera = []
+    max_columna = -1
+    fila_actual = 0
+    primera_fila = None
+    columna_actual = -1
+    contenedor = None
+
+    for evento, elem in ET.iterparse(f, events=("start", "end")):
+        etiqueta = elem.tag
+        if evento == "start":
+            if etiqueta == f"{NS_MAIN}sheetData":
+                contenedor = elem
+            elif etiqueta == f"{NS_MAIN}row":
+                r = elem.get("r")
+                fila_actual = int(r) if r else fila_actual + 1
+                if primera_fila is None:
+                    primera_fila = fila_actual
+                columna_actual = -1
+            continue
+
+        if etiqueta == f"{NS_MAIN}c":
+            ref = elem.get("r")
+            coincidencia = _PATRON_REFERENCIA.match(ref) if ref else None
+            columna_actual = indice_columna(coincidencia.group(1)) if coincidencia else columna_actual + 1
+            if columna_actual > max_columna:
+                max_columna = columna_actual
+
+            if columna_actual == columna:
+                valor = _valor_celda(elem)
+                if valor is not None:
+                    celdas.append((fila_actual, *valor))
+            if con_cabecera and fila_actual == primera_fila:
+                valor = _valor_celda(elem)
+                if valor is not None:
+                    cabecera.append((columna_actual, *valor))
+        elif etiqueta == f"{NS_MAIN}row":
+            # Descartar la fila ya procesada para que la memoria no crezca con la hoja
+            if contenedor is not None:
+                contenedor.remove(elem)
+            else:
+                elem.clear()
+
+    return celdas, max_columna, cabecera, primera_fila or 1
+
+def _resolver_cadenas_compartidas(zf, indices):
+    """
+    Lee de sharedStrings.xml solo las cadenas cuyos índices se necesitan.
+
+    Returns:
+        dict: {indice: texto}
+    """
+    if not indices:
+        return {}
+    try:
+        f = zf.open("xl/sharedStrings.xml")
+    except KeyError:
+        raise FormatoNoCompatible("Faltan las cadenas compartidas (xl/sharedStrings.xml)")
+
+    cadenas = {}
+    pendientes = len(indices)
+    contenedor = None
+    with f:
+        indice = 0
+        for evento, elem in ET.iterparse(f, events=("start", "end")):
+            if evento == "start":
+                if elem.tag == f"{NS_MAIN}sst":
+                    contenedor = elem
+                continue
+            if elem.tag != f"{NS_MAIN}si":
+                continue
+            if indice in indices:
+                cadenas[indice] = _texto_inline(elem)
+                pendientes -= 1
+            # Descartar la cadena ya procesada, como las filas de la hoja
+            if contenedor is not None:
+                contenedor.remove(elem)
+            else:
+                elem.clear()
+            indice += 1
+            if pendientes == 0:
+                break
+    return cadenas
+
+def leer_columna(origen, columna="M", hoja=None):
+    """
+    Lee en streaming los valores de una columna de un paquete xlsx.
+
+    Args:
+        origen (str | file): Ruta del archivo o un objeto tipo archivo con el zip
+        columna (str): Letra de la columna a leer
+        hoja (str): Nombre de la hoja (None = primera hoja del libro)
+
+    Returns:
+        list: Valores de la columna indexados por fila (posición 0 = fila 1).
+              Las celdas vacías son None; todos los valores se devuelven como texto.
+
+    Raises:
+        FormatoNoCompatible: Si el archivo no se puede leer como xlsx
+        ValueError: Si la hoja no llega a tener la columna pedida
+    """
+    return _leer(origen, columna, hoja, False)[0]
+
+def leer_columna_con_cabecera(origen, columna="M", hoja=None):
+    """
+    Como leer_columna, pero devuelve también la cabecera de la hoja, leída en la misma pasada.
+
+    Returns:
+        tuple: (valores, cabecera) donde cabecera es {"columnas": número de columnas
+               de la hoja, "fila": valores de la primera fila, uno por columna,
+               "posicion": posición de esa fila en los valores (0 = fila 1)}
+    """
+    return _leer(origen, columna, hoja, True)
+
+def _leer(origen, columna, hoja, con_cabecera):
+    """
+    Lectura común de leer_columna y leer_columna_con_cabecera.
+    """
+    indice = indice_columna(columna)
+    try:
+        with zipfile.ZipFile(origen) as zf:
+            hojas = rutas_hojas(zf)
+            if hoja is None:
+                ruta_hoja = hojas[0][1]
+            else:
+                rutas = dict(hojas)
+                if hoja not in rutas:
+                    raise FormatoNoCompatible(f"No existe la hoja '{hoja}'")
+                ruta_hoja = rutas[hoja]
+
+            with zf.open(ruta_hoja) as f:
+                celdas, max_columna, celdas_cabecera, primera_fila = _recorrer_columna(f, indice, con_cabecera)
+
+            compartidas = {int(valor) for _, valor, es_compartida in celdas + celdas_cabecera
+                           if es_compartida}
+            cadenas = _resolver_cadenas_compartidas(zf, compartidas)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError, ValueError) as e:
+        raise FormatoNoCompatible(str(e)) from e
+
+    if max_columna < indice:
+        raise ValueError(f"La hoja no tiene suficientes columnas (necesita al menos columna {columna})")
+
+    num_filas = max((fila for fila, _, _ in celdas), default=0)
+    valores = [None] * num_filas
+    for fila, valor, es_compartida in celdas:
+        valores[fila - 1] = cadenas.get(int(valor)) if es_compartida else valor
+    if not con_cabecera:
+        return valores, None
+
+    fila_cabecera = [None] * (max_columna + 1)
+    for columna_celda, valor, es_compartida in celdas_cabecera:
+        fila_cabecera[columna_celda] = cadenas.get(int(valor)) if es_compartida else valor
+    return valores, {"columnas": max_columna + 1, "fila": fila_cabecera, "posicion": primera_fila - 1}
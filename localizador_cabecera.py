@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Localizador de la Cabecera de las Actas
+=======================================
+
+Las calificaciones de un acta empiezan en la fila siguiente al marcador
+DSP_NOMID1 (MARCADOR_CALIFICACIONES). Todas las actas exportadas por el mismo
+sistema tienen la misma disposición, así que basta con buscar el marcador una
+vez por disposición:
+- La huella de la disposición combina el número de columnas de la hoja, los
+  textos de su primera fila (los nombres de campo de la exportación) y la
+  posición de esa fila (las filas vacías iniciales no aparecen en el XML)
+- La fila y la columna del marcador se recuerdan por huella, en memoria y en la
+  tabla "disposiciones" de la caché SQLite, de modo que los archivos siguientes
+  (también en otras ejecuciones y en los procesos auxiliares) van directos a la
+  columna de las calificaciones: solo se comprueba que el marcador sigue allí.
+  Sin caché (--sin-cache) solo se recuerdan en memoria
+- Cuando la disposición es nueva, o el marcador no está donde se esperaba, se
+  busca en la primera fila y en la columna leída
+
+Uso desde la línea de comandos:
+    python localizador_cabecera.py info       # Disposiciones conocidas
+    python localizador_cabecera.py olvidar    # Volver a buscar el marcador en todas
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+
+from config import DIRECTORIO_CACHE, ARCHIVO_CACHE_RESULTADOS, MARCADOR_CALIFICACIONES
+
+def huella_disposicion(cabecera):
+    """
+    Calcula la huella de la disposición de una hoja.
+
+    Args:
+        cabecera (dict): {"columnas": número de columnas, "fila": valores de la primera fila,
+                          "posicion": posición de esa fila, 0 = fila 1}
+
+    Returns:
+        str: Hash de la disposición
+    """
+    fila = ["" if valor is None or valor != valor else str(valor).strip() for valor in cabecera["fila"]]
+    contenido = json.dumps({"columnas": cabecera["columnas"], "fila": fila,
+                            "posicion": cabecera.get("posicion", 0)}, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def buscar_marcador(valores, marcador=None):
+    """
+    Busca el marcador en una lista de valores (una columna o una fila).
+
+    Args:
+        valores (list): Valores de las celdas (texto, números, None o NaN)
+        marcador (str): Texto a buscar (por defecto MARCADOR_CALIFICACIONES)
+
+    Returns:
+        int: Posición de la primera celda cuyo texto, sin espacios, es el marcador; None si no está
+    """
+    marcador = marcador or MARCADOR_CALIFICACIONES
+    return next((i for i, valor in enumerate(valores)
+                 if isinstance(valor, str) and valor.strip() == marcador), None)
+
+def es_marcador(valores, fila, marcador=None):
+    """
+    Comprueba si la celda `fila` de una columna contiene el marcador.
+    """
+    marcador = marcador or MARCADOR_CALIFICACIONES
+    return 0 <= fila < len(valores) and isinstance(valores[fila], str) and valores[fila].strip() == marcador
+
+class LocalizadorCabecera:
+    """
+    Posiciones del marcador por disposición de hoja, guardadas en la caché SQLite.
+
+    Si la base de datos no se puede abrir o escribir (p.ej. carpeta de solo
+    lectura) las disposiciones se recuerdan solo durante la ejecución.
+
+    Args:
+        ruta (str): Ruta de la base de datos (None = la de la caché de resultados)
+        persistente (bool): Si False, no se lee ni se escribe la base de datos
+    """
+
+    def __init__(self, ruta=None, persistente=True):
+        self.ruta = ruta or os.path.join(DIRECTORIO_CACHE, ARCHIVO_CACHE_RESULTADOS)
+        self.persistente = persistente
+        self._disposiciones = None
+
+    def _conectar(self):
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        # Varios procesos auxiliares pueden anotar disposiciones a la vez
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        conexion.execute("""
+            CREATE TABLE IF NOT EXISTS disposiciones (
+                huella TEXT PRIMARY KEY,
+                fila INTEGER NOT NULL,
+                columna TEXT NOT NULL,
+                archivo TEXT NOT NULL,
+                creado REAL NOT NULL
+            )
+        """)
+        return conexion
+
+    def _cargar(self):
+        """
+        Lee las disposiciones conocidas la primera vez que se necesitan.
+        """
+        if self._disposiciones is None:
+            self._disposiciones = {}
+            if not self.persistente:
+                return self._disposiciones
+            try:
+                conexion = self._conectar()
+                try:
+                    for huella, fila, columna in conexion.execute(
+                            "SELECT huella, fila, columna FROM disposiciones"):
+                        self._disposiciones[huella] = (fila, columna)
+                finally:
+                    conexion.close()
+            except (sqlite3.Error, OSError):
+                pass
+        return self._disposiciones
+
+    def consultar(self, huella):
+        """
+        Devuelve la posición del marcador para una disposición.
+
+        Returns:
+            tuple: (fila, columna) con la fila empezando en 0 y la letra de la columna,
+                   o None si la disposición no se conoce
+        """
+        return self._cargar().get(huella)
+
+    def recordar(self, huella, fila, columna, archivo=""):
+        """
+        Anota la posición del marcador de una disposición.
+
+        Args:
+            huella (str): Huella de la disposición (ver huella_disposicion)
+            fila (int): Fila del marcador, empezando en 0
+            columna (str): Letra de la columna del marcador
+            archivo (str): Archivo en el que se ha encontrado (solo informativo)
+        """
+        disposiciones = self._cargar()
+        if disposiciones.get(huella) == (fila, columna):
+            return
+        disposiciones[huella] = (fila, columna)
+        if not self.persistente:
+            return
+        try:
+            conexion = self._conectar()
+            try:
+                conexion.execute(
+                    "INSERT OR REPLACE INTO disposiciones (huella, fila, columna, archivo, creado) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (huella, fila, columna, archivo, time.time())
+                )
+                conexion.commit()
+            finally:
+                conexion.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def olvidar(self, huella=None):
+        """
+        Olvida una disposición (o todas si huella es None).
+
+        Returns:
+            int: Número de disposiciones eliminadas de la base de datos
+        """
+        disposiciones = self._cargar()
+        if huella is None:
+            disposiciones.clear()
+        else:
+            disposiciones.pop(huella, None)
+        if not self.persistente:
+            return 0
+        try:
+            conexion = self._conectar()
+            try:
+                if huella is None:
+                    cursor = conexion.execute("DELETE FROM disposiciones")
+                else:
+                    cursor = conexion.execute("DELETE FROM disposiciones WHERE huella = ?", (huella,))
+                conexion.commit()
+                return cursor.rowcount
+            finally:
+                conexion.close()
+        except (sqlite3.Error, OSError):
+            return 0
+
+    def listar(self):
+        """
+        Devuelve las disposiciones guardadas en la base de datos.
+
+        Returns:
+            list: Diccionarios {"huella", "fila", "columna", "archivo", "creado"}
+        """
+        conexion = self._conectar()
+        try:
+            filas = conexion.execute(
+                "SELECT huella, fila, columna, archivo, creado FROM disposiciones ORDER BY creado"
+            ).fetchall()
+        finally:
+            conexion.close()
+        return [dict(zip(("huella", "fila", "columna", "archivo", "creado"), fila)) for fila in filas]
+
+# Localizadores del proceso (con y sin caché): cada proceso auxiliar carga las
+# disposiciones una sola vez
+_localizadores = {}
+
+def obtener_localizador(persistente=True):
+    """
+    Devuelve el localizador compartido por todas las extracciones del proceso.
+
+    Args:
+        persistente (bool): Si False, el localizador no usa la caché SQLite (--sin-cache)
+    """
+    if persistente not in _localizadores:
+        _localizadores[persistente] = LocalizadorCabecera(persistente=persistente)
+    return _localizadores[persistente]
+
+def main():
+    """
+    Punto de entrada para consultar u olvidar las disposiciones desde la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Gestiona las disposiciones de actas conocidas")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    subparsers.add_parser("info", help="Muestra las disposiciones conocidas")
+    subparsers.add_parser("olvidar", help="Olvida todas las disposiciones")
+    args = parser.parse_args()
+
+    localizador = LocalizadorCabecera()
+    if args.comando == "info":
+        disposiciones = localizador.listar()
+        print(f"📐 Disposiciones conocidas: {len(disposiciones)} ({localizador.ruta})")
+        for disposicion in disposiciones:
+            print(f"  {disposicion['huella'][:12]}  marcador en {disposicion['columna']}{disposicion['fila'] + 1}"
+                  f"  (visto en {disposicion['archivo']})")
+    elif args.comando == "olvidar":
+        eliminadas = localizador.olvidar()
+        print(f"🧹 Olvidadas {eliminadas} disposiciones")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Preámbulo Común de los Informes LaTeX
+=====================================
+
+Todos los documentos (informe de sectores, de barras e índices del informe de
+facultad) cargan los mismos paquetes. Cada documento empieza con el preámbulo
+común completo, con la disposición que documenta el paquete mylatexformat:
+
+    % preambulo: matplotlib
+    \\documentclass[12pt,a4paper]{article}
+    \\usepackage[utf8]{inputenc}
+    ...
+    \\csname endofdump\\endcsname
+    \\title{...}                  <- parte propia de cada documento
+
+Compilado tal cual (p.ej. a mano con pdflatex), \\csname endofdump\\endcsname no
+hace nada. compilacion_latex vuelca además ese preámbulo a un formato
+precompilado (pdflatex -ini "&pdflatex" mylatexformat.ltx documento.tex) y
+compila los documentos con -fmt: los paquetes ya están cargados y todo lo
+anterior a \\endofdump se salta. Como el preámbulo es idéntico en todos los
+documentos y fragmentos con el mismo backend, el formato se construye una sola
+vez para todos (ver la primera línea, que indica el backend).
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import re
+
+from escritura_latex import PlantillaLatex
+from graficos_tikz import preambulo_tikz
+from salida_graficos import preambulo_imagenes
+from config import LATEX_CONFIG, ARCHIVO_PREAMBULO, DIRECTORIO_CACHE
+
+# Paquetes comunes; el formato precompilado se vuelca en \endofdump
+PREAMBULO_COMUN = PlantillaLatex(r"""% @@marca: @@backend
+\documentclass[@@fontsize,@@papersize]{@@documentclass}
+\usepackage[@@encoding]{inputenc}
+\usepackage[@@language]{babel}
+\usepackage[margin=@@margins]{geometry}
+\usepackage{graphicx}
+\usepackage{float}
+\usepackage{array}
+\usepackage{booktabs}
+\usepackage{longtable}
+@@preambulo_graficos
+""")
+
+FIN_PREAMBULO = "\\csname endofdump\\endcsname\n"
+
+_PATRON_MARCA = re.compile(rf"\A% {re.escape(ARCHIVO_PREAMBULO)}: \w+\n")
+
+# Bytes máximos que se leen de un documento para buscar su preámbulo
+_MAX_PREAMBULO = 1 << 16
+
+def preambulo_comun(backend):
+    """
+    Genera el preámbulo común, para el principio de cada documento.
+
+    Args:
+        backend (str): Backend de gráficos, "matplotlib" o "tikz"
+
+    Returns:
+        str: Código LaTeX hasta \\csname endofdump\\endcsname incluido
+    """
+    return PREAMBULO_COMUN.substitute(
+        marca=ARCHIVO_PREAMBULO,
+        backend=backend,
+        fontsize=LATEX_CONFIG["fontsize"],
+        papersize=LATEX_CONFIG["papersize"],
+        documentclass=LATEX_CONFIG["documentclass"],
+        encoding=LATEX_CONFIG["encoding"],
+        language=LATEX_CONFIG["language"],
+        margins=LATEX_CONFIG["margins"],
+        preambulo_graficos=preambulo_tikz() if backend == "tikz" else preambulo_imagenes()
+    ) + FIN_PREAMBULO
+
+def preambulo_documento(ruta_tex):
+    """
+    Busca el preámbulo común con el que empieza un documento.
+
+    Args:
+        ruta_tex (str): Ruta del documento .tex
+
+    Returns:
+        str: Texto del preámbulo, o None si el documento no empieza con él
+    """
+    with open(ruta_tex, encoding="utf-8") as f:
+        inicio = f.read(_MAX_PREAMBULO)
+    marca = _PATRON_MARCA.match(inicio)
+    fin = inicio.find(FIN_PREAMBULO)
+    if marca is None or fin < 0:
+        return None
+    return inicio[:fin + len(FIN_PREAMBULO)]
+
+def directorio_formatos():
+    """
+    Carpeta de los formatos precompilados del preámbulo común.
+    """
+    return os.path.join(DIRECTORIO_CACHE, "latex", "formatos")
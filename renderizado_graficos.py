@@ -0,0 +1,164 @@
+"""
+Renderizado de Gráficos en Paralelo
+===================================
+
+Etapa de renderizado compartida por los dos generadores de informes. Recibe una
+lista de trabajos de gráfico y los dibuja en procesos separados, siempre con el
+backend no interactivo Agg de matplotlib. Cada gráfico se guarda según
+CONFIG_GRAFICOS (formato, resolución y paleta indexada, ver salida_graficos).
+
+Cada trabajo es un diccionario:
+    {
+        "tipo": "sectores" | "barras" | "tendencias",
+        "datos": resultados (sectores), datos de la convocatoria (barras) o
+                 evolución por curso de sus asignaturas (tendencias),
+        "titulo": "Título del gráfico",
+        "ruta": "output/graficos/archivo.png",
+        "origen": identificador para los mensajes de error (opcional)
+    }
+
+Los gráficos ya dibujados con los mismos datos se toman del almacén de gráficos
+(ver almacen_graficos) sin lanzar ningún proceso.
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import instrumentacion
+from almacen_graficos import obtener_almacen, clave_grafico, limitar_almacen
+from extraer_resultado_de_excel import resolver_num_procesos
+
+def configurar_backend():
+    """
+    Fuerza el backend Agg (sin ventanas) en el proceso actual.
+    """
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+def renderizar_grafico(trabajo):
+    """
+    Dibuja un único gráfico y lo guarda en disco (y en el almacén de gráficos).
+
+    Args:
+        trabajo (dict): Trabajo de gráfico (ver la documentación del módulo)
+    """
+    # El destino puede ser un enlace a una imagen del almacén: nunca se escribe a través de él
+    if os.path.lexists(trabajo["ruta"]):
+        os.remove(trabajo["ruta"])
+
+    if trabajo["tipo"] == "sectores":
+        from extraer_resultado_de_excel import generar_diagrama_sectores
+        generar_diagrama_sectores(trabajo["datos"], titulo=trabajo["titulo"],
+                                  mostrar=False, guardar_archivo=trabajo["ruta"])
+    elif trabajo["tipo"] == "barras":
+        from generar_informe_barras import generar_grafico_barras_apiladas
+        generar_grafico_barras_apiladas(trabajo["datos"], trabajo["titulo"], trabajo["ruta"])
+    elif trabajo["tipo"] == "tendencias":
+        from generar_informe_barras import generar_grafico_tendencias
+        generar_grafico_tendencias(trabajo["datos"], trabajo["titulo"], trabajo["ruta"])
+    else:
+        raise ValueError(f"Tipo de gráfico desconocido: {trabajo['tipo']}")
+
+    almacen = obtener_almacen()
+    if almacen is not None and os.path.exists(trabajo["ruta"]):
+        try:
+            almacen.guardar(clave_grafico(trabajo), trabajo["ruta"])
+        except OSError:
+            pass  # El gráfico ya está dibujado; solo se pierde la copia en el almacén
+
+def instalar_del_almacen(trabajo):
+    """
+    Enlaza o copia el gráfico desde el almacén si ya se dibujó con los mismos datos.
+
+    Args:
+        trabajo (dict): Trabajo de gráfico
+
+    Returns:
+        tuple: (ruta, None, medida) como renderizar_sin_excepciones, o None si hay que dibujarlo
+    """
+    almacen = obtener_almacen()
+    if almacen is None:
+        return None
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        if not almacen.instalar(clave_grafico(trabajo), trabajo["ruta"]):
+            return None
+    except OSError:
+        return None  # Si el almacén falla, se dibuja
+    medida = {
+        "segundos": time.perf_counter() - inicio,
+        "cpu_segundos": time.process_time() - inicio_cpu,
+        "bytes": os.path.getsize(trabajo["ruta"]),
+        "imagenes": 0,
+        "reutilizadas": 1,
+    }
+    return trabajo["ruta"], None, medida
+
+def renderizar_sin_excepciones(trabajo):
+    """
+    Envoltorio para los procesos del pool: devuelve el error en lugar de lanzarlo,
+    junto con las medidas del gráfico para el informe de ejecución.
+    """
+    salida = instalar_del_almacen(trabajo)
+    if salida is not None:
+        return salida
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        renderizar_grafico(trabajo)
+        error = None
+    except Exception as e:
+        error = e
+    escrito = error is None and os.path.exists(trabajo["ruta"])
+    medida = {
+        "segundos": time.perf_counter() - inicio,
+        "cpu_segundos": time.process_time() - inicio_cpu,
+        "bytes": os.path.getsize(trabajo["ruta"]) if escrito else 0,
+        "imagenes": int(escrito),
+        "reutilizadas": 0,
+    }
+    return trabajo["ruta"], error, medida
+
+def registrar_grafico(salida):
+    """
+    Pasa al informe de ejecución la medida de un gráfico y devuelve (ruta, error).
+    """
+    ruta, error, medida = salida
+    instrumentacion.registrar_archivo("graficos", ruta, **medida)
+    return ruta, error
+
+def renderizar_graficos(trabajos, jobs=None):
+    """
+    Renderiza una lista de gráficos, en paralelo si jobs > 1.
+
+    Args:
+        trabajos (list): Trabajos de gráfico
+        jobs (int): Número de procesos (None = NUM_PROCESOS de config.py, 0 = todos los núcleos)
+
+    Returns:
+        list: Tuplas (ruta, error) en el mismo orden que `trabajos`; error es None si todo fue bien
+    """
+    trabajos = list(trabajos)
+    if not trabajos:
+        return []
+
+    # Los gráficos que ya están en el almacén se instalan aquí mismo; solo se dibujan los demás
+    salidas = [instalar_del_almacen(trabajo) for trabajo in trabajos]
+    pendientes = [trabajo for trabajo, salida in zip(trabajos, salidas) if salida is None]
+    if len(pendientes) < len(trabajos):
+        print(f"  ♻️  {len(trabajos) - len(pendientes)} gráficos tomados del almacén de gráficos")
+    jobs = min(resolver_num_procesos(jobs), len(pendientes))
+
+    if not pendientes:
+        dibujados = iter([])
+    elif jobs <= 1:
+        configurar_backend()
+        dibujados = iter([renderizar_sin_excepciones(trabajo) for trabajo in pendientes])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=configurar_backend) as pool:
+            dibujados = iter(list(pool.map(renderizar_sin_excepciones, pendientes)))
+    if pendientes:
+        limitar_almacen()
+    return [registrar_grafico(salida if salida is not None else next(dibujados)) for salida in salidas]
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Salida de los Gráficos
+======================
+
+Guarda las figuras de matplotlib según CONFIG_GRAFICOS (config.py):
+- Formato: "png", "svg" o "pdf" (los vectoriales no dependen de la resolución)
+- Resolución y nivel de compresión de los PNG
+- Optimización opcional de los PNG: los gráficos solo usan los colores planos de
+  COLORES_RESULTADOS y el texto, así que se guardan con una paleta indexada. La
+  figura se vuelca sin comprimir (TIFF en memoria), se cuantiza con Pillow y se
+  comprime una sola vez: codificar el PNG a color completo que escribe matplotlib
+  cuesta más que dibujar la figura. La optimización forma parte de cada trabajo
+  de renderizado (ver renderizado_graficos), así que se reparte entre los mismos
+  procesos que dibujan los gráficos
+
+También genera el código LaTeX para incluir los gráficos en el formato elegido
+(los SVG se incluyen con el paquete svg, que necesita Inkscape y -shell-escape).
+
+Uso desde la línea de comandos (optimizar imágenes ya dibujadas):
+    python salida_graficos.py optimizar                     # output/graficos
+    python salida_graficos.py optimizar carpeta -j 4
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import io
+import os
+import glob
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from config import CONFIG_GRAFICOS, DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS
+
+FORMATOS_GRAFICOS = ("png", "svg", "pdf")
+
+def formato_graficos():
+    """
+    Devuelve el formato de los gráficos configurado en CONFIG_GRAFICOS.
+
+    Raises:
+        ValueError: Si el formato no es uno de FORMATOS_GRAFICOS
+    """
+    formato = CONFIG_GRAFICOS["formato"].lower()
+    if formato not in FORMATOS_GRAFICOS:
+        raise ValueError(f"Formato de gráficos desconocido: {formato} "
+                         f"(opciones: {', '.join(FORMATOS_GRAFICOS)})")
+    return formato
+
+def extension_graficos():
+    """
+    Extensión de los archivos de los gráficos (p.ej. ".png").
+    """
+    return f".{formato_graficos()}"
+
+def preambulo_imagenes():
+    """
+    Líneas de preámbulo necesarias para incluir los gráficos en el formato configurado.
+    """
+    return "\\usepackage{svg}\n" if formato_graficos() == "svg" else ""
+
+def incluir_grafico(ruta, ancho):
+    """
+    Genera el código LaTeX que incluye un gráfico.
+
+    Args:
+        ruta (str): Ruta del gráfico relativa al documento
+        ancho (str): Ancho en LaTeX (p.ej. "0.8\\textwidth")
+
+    Returns:
+        str: Línea LaTeX con \\includegraphics (o \\includesvg para los SVG)
+    """
+    comando = "includesvg" if ruta.lower().endswith(".svg") else "includegraphics"
+    return f"\\{comando}[width={ancho}]{{{ruta}}}\n"
+
+def _cuantizar(imagen, colores):
+    """
+    Convierte una imagen a paleta indexada de `colores` colores como máximo.
+
+    Los gráficos son opacos (fondo blanco), así que se descarta el canal alfa
+    antes de cuantizar; sin difuminado, para que los colores planos no se manchen.
+    """
+    from PIL import Image
+
+    if imagen.mode == "RGBA" and imagen.getchannel("A").getextrema() == (255, 255):
+        imagen = imagen.convert("RGB")
+    return imagen.quantize(colors=colores, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+def guardar_figura(figura, ruta):
+    """
+    Guarda una figura de matplotlib con la configuración de CONFIG_GRAFICOS.
+
+    El formato se deduce de la extensión de `ruta`. Las fechas de los PDF y SVG
+    se omiten para que el mismo gráfico produzca siempre el mismo archivo.
+
+    Args:
+        figura (matplotlib.figure.Figure): Figura a guardar
+        ruta (str): Archivo de destino
+    """
+    formato = os.path.splitext(ruta)[1].lower().lstrip(".")
+    dpi = CONFIG_GRAFICOS["dpi"]
+    if formato == "png" and CONFIG_GRAFICOS["optimizar"] and CONFIG_GRAFICOS["paleta"]:
+        from PIL import Image
+
+        volcado = io.BytesIO()
+        figura.savefig(volcado, format="tiff", dpi=dpi, bbox_inches="tight")
+        with Image.open(volcado) as imagen:
+            imagen = _cuantizar(imagen, CONFIG_GRAFICOS["paleta"])
+        imagen.save(ruta, format="PNG", dpi=(dpi, dpi), compress_level=CONFIG_GRAFICOS["compresion"])
+        return
+
+    opciones = {"dpi": dpi, "bbox_inches": "tight"}
+    if formato == "png":
+        opciones["pil_kwargs"] = {"compress_level": CONFIG_GRAFICOS["compresion"]}
+    elif formato == "pdf":
+        opciones["metadata"] = {"CreationDate": None}
+    elif formato == "svg":
+        opciones["metadata"] = {"Date": None}
+    figura.savefig(ruta, **opciones)
+
+def optimizar_png(ruta, colores=None):
+    """
+    Convierte un PNG ya guardado a paleta indexada y lo vuelve a comprimir al máximo.
+    Si el resultado no es más pequeño, se deja el archivo original.
+
+    Args:
+        ruta (str): Archivo PNG
+        colores (int): Colores máximos de la paleta (None = CONFIG_GRAFICOS["paleta"];
+                       0 = mantener el color completo y solo recomprimir)
+
+    Returns:
+        tuple: (bytes antes, bytes después)
+    """
+    from PIL import Image
+
+    colores = CONFIG_GRAFICOS["paleta"] if colores is None else colores
+    antes = os.path.getsize(ruta)
+    with Image.open(ruta) as imagen:
+        imagen.load()
+    if colores and imagen.mode != "P":
+        imagen = _cuantizar(imagen, colores)
+
+    # Se escribe en un temporal: `ruta` puede ser un enlace a una imagen del almacén de gráficos
+    directorio = os.path.dirname(ruta) or "."
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, prefix=f".{os.path.basename(ruta)}.", suffix=".png")
+    os.close(descriptor)
+    try:
+        imagen.save(temporal, format="PNG", optimize=True)
+        despues = os.path.getsize(temporal)
+        if despues >= antes:
+            return antes, antes
+        os.chmod(temporal, os.stat(ruta).st_mode & 0o777)  # mkstemp lo crea solo legible por el usuario
+        os.replace(temporal, ruta)
+        return antes, despues
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+def _optimizar_sin_excepciones(ruta):
+    """
+    Envoltorio para los procesos del pool: devuelve el error en lugar de lanzarlo.
+    """
+    try:
+        return ruta, optimizar_png(ruta), None
+    except Exception as e:
+        return ruta, None, e
+
+def optimizar_imagenes(rutas, jobs=None):
+    """
+    Optimiza una lista de PNG, en paralelo si jobs > 1.
+
+    Args:
+        rutas (list): Archivos PNG
+        jobs (int): Número de procesos (None = NUM_PROCESOS de config.py, 0 = todos los núcleos)
+
+    Returns:
+        list: Tuplas (ruta, (bytes antes, bytes después), error) en el mismo orden que `rutas`
+    """
+    from extraer_resultado_de_excel import resolver_num_procesos
+
+    rutas = list(rutas)
+    jobs = min(resolver_num_procesos(jobs), len(rutas))
+    if jobs <= 1:
+        return [_optimizar_sin_excepciones(ruta) for ruta in rutas]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_optimizar_sin_excepciones, rutas))
+
+def main():
+    """
+    Punto de entrada para optimizar imágenes desde la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Optimiza los gráficos PNG ya dibujados")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    p_optimizar = subparsers.add_parser("optimizar", help="Paleta indexada y compresión máxima")
+    p_optimizar.add_argument("carpeta", nargs="?", default=os.path.join(DIRECTORIO_OUTPUT, SUBDIRECTORIO_GRAFICOS))
+    p_optimizar.add_argument("-j", "--jobs", type=int, default=None,
+                             help="Procesos en paralelo (0 = todos los núcleos)")
+    args = parser.parse_args()
+
+    rutas = sorted(glob.glob(os.path.join(args.carpeta, "*.png")))
+    total_antes = total_despues = 0
+    for ruta, tamanos, error in optimizar_imagenes(rutas, args.jobs):
+        if error is not None:
+            print(f"  ❌ {os.path.basename(ruta)}: {error}")
+            continue
+        total_antes += tamanos[0]
+        total_despues += tamanos[1]
+    print(f"🗜️  {len(rutas)} imágenes: {total_antes / 2**20:.1f} MB -> {total_despues / 2**20:.1f} MB")
+
+if __name__ == "__main__":
+    main()
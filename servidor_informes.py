@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Servicio Local de Informes
+==========================
+
+Pequeño servidor HTTP (asyncio, sin dependencias externas) para consultar
+una asignatura o una convocatoria sin generar el informe completo:
+
+    GET /                                       Índice de actas y convocatorias (JSON)
+    GET /acta/<carpeta>/<codigo>/<grupo>.<fmt>  Acta de una asignatura y grupo en una convocatoria
+    GET /convocatoria/<carpeta>.<fmt>           Todas las asignaturas de una convocatoria
+    GET /asignatura/<codigo>.json               Una asignatura en todas las convocatorias y grupos
+
+Formatos (<fmt>): json (conteos y porcentajes), png y svg (gráfico de sectores
+o de barras), tex (fragmento LaTeX, con el gráfico en TikZ) y html (tabla y gráfico).
+
+Todo se genera con las mismas funciones que los informes. Los resultados
+extraídos y las respuestas se guardan en una caché LRU en memoria, asociados a
+la huella del contenido de los Excel de los que dependen: si un Excel cambia
+(fecha de modificación o tamaño y, entonces, hash del contenido) sus entradas
+dejan de valer. Las peticiones repetidas se sirven desde la caché en milisegundos.
+
+Uso:
+    python servidor_informes.py                 # http://127.0.0.1:8765/
+    python servidor_informes.py --puerto 9000 --sin-cache
+    curl http://127.0.0.1:8765/acta/1Q1/34154/A.json
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import io
+import os
+import re
+import glob
+import html
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import threading
+from string import Template
+from collections import OrderedDict
+from urllib.parse import urlsplit, unquote
+from concurrent.futures import ThreadPoolExecutor
+
+from conjunto_datos import descubrir_archivos
+from ingesta_entregas import separar_origen, hash_origen
+from cubo_resultados import CuboResultados
+from renderizado_graficos import configurar_backend
+from extraer_resultado_de_excel import (
+    extraer_resultados_sin_cache, obtener_info_asignatura, generar_titulo_completo
+)
+from config import (
+    ETIQUETAS_RESULTADOS, TIPOS_CONVOCATORIAS, ASIGNATURAS, TEXTOS, DIRECTORIO_EXCELS,
+    HOST_SERVIDOR, PUERTO_SERVIDOR, CACHE_SERVIDOR_ENTRADAS, DPI_SERVIDOR
+)
+
+TIPOS_CONTENIDO = {
+    "json": "application/json; charset=utf-8",
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "tex": "application/x-tex; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+}
+
+RUTA_ACTA = re.compile(r"^/acta/([^/]+)/([^/]+)/([^/.]+)\.(json|png|svg|tex|html)$")
+RUTA_CONVOCATORIA = re.compile(r"^/convocatoria/([^/.]+)\.(json|png|svg|tex|html)$")
+RUTA_ASIGNATURA = re.compile(r"^/asignatura/([^/.]+)\.json$")
+
+FRAGMENTO_HTML = Template("""<section>
+<h2>$titulo</h2>
+<table>
+<thead><tr>$cabecera</tr></thead>
+<tbody>
+$filas
+</tbody>
+</table>
+<img src="$grafico" alt="$titulo">
+</section>
+""")
+
+ESTADOS = {200: "OK", 304: "Not Modified", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+class NoEncontrado(Exception):
+    """
+    El recurso pedido no existe (respuesta 404).
+    """
+
+class CacheLRU:
+    """
+    Caché en memoria con expulsión de las entradas menos usadas recientemente.
+    Cada entrada guarda la huella de los datos de los que depende; si al
+    consultarla la huella ha cambiado, la entrada se descarta.
+
+    Args:
+        max_entradas (int): Número máximo de entradas
+    """
+
+    def __init__(self, max_entradas=CACHE_SERVIDOR_ENTRADAS):
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._cerrojo = threading.Lock()
+
+    def obtener(self, clave, huella):
+        """
+        Devuelve el valor guardado para la clave si su huella coincide; si no, None.
+        """
+        with self._cerrojo:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] != huella:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, huella, valor):
+        """
+        Guarda un valor, expulsando las entradas más antiguas si se supera el máximo.
+        """
+        with self._cerrojo:
+            self._entradas[clave] = (huella, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entradas)
+
+class ServicioInformes:
+    """
+    Genera bajo demanda las respuestas del servicio (ver la documentación del módulo).
+
+    Args:
+        directorio (str): Directorio base de los Excel (None = DIRECTORIO_EXCELS)
+        usar_cache (bool): Si True, usa también la caché persistente de resultados
+        max_entradas (int): Tamaño de la caché LRU en memoria
+    """
+
+    def __init__(self, directorio=None, usar_cache=True, max_entradas=CACHE_SERVIDOR_ENTRADAS):
+        self.directorio = directorio or DIRECTORIO_EXCELS
+        self.usar_cache = usar_cache
+        self.cache = CacheLRU(max_entradas)
+        self._huellas = {}
+        self._indice = None
+        self._en_curso = {}
+        # matplotlib no admite dibujar desde varios hilos: todo el trabajo pesado va a un único hilo
+        self._trabajo = ThreadPoolExecutor(max_workers=1, initializer=configurar_backend)
+
+    # Huellas de los datos (se ejecutan en el hilo de trabajo: recorren la carpeta y leen las actas)
+
+    def _firma_directorio(self):
+        """
+        Fecha de modificación de la carpeta de los Excel, de sus subcarpetas y de
+        las entregas de su raíz: cambia cuando se añaden o eliminan archivos.
+        """
+        rutas = [self.directorio] + sorted(glob.glob(os.path.join(self.directorio, "*")))
+        firma = []
+        for ruta in rutas:
+            try:
+                estado = os.stat(ruta)
+            except OSError:
+                continue
+            firma.append((ruta, estado.st_mtime_ns, estado.st_size))
+        return tuple(firma)
+
+    def indice(self):
+        """
+        Actas disponibles, vueltas a descubrir solo cuando cambia la carpeta.
+
+        Returns:
+            dict: {"firma", "carpetas" (ver descubrir_archivos),
+                   "actas": {(carpeta, codigo, grupo): (archivo, origen)}}
+        """
+        firma = self._firma_directorio()
+        if self._indice is None or self._indice["firma"] != firma:
+            carpetas = descubrir_archivos(self.directorio)
+            actas = {}
+            for carpeta, info in carpetas.items():
+                origenes = info.get("origenes", {})
+                for archivo in info["archivos"]:
+                    try:
+                        codigo, _, grupo, _ = obtener_info_asignatura(archivo)
+                    except ValueError:
+                        continue
+                    # Si hay varias actas del mismo grupo, prevalece la última (como en el informe)
+                    actas[(carpeta, codigo, grupo)] = (archivo, origenes.get(archivo, archivo))
+            self._indice = {"firma": firma, "carpetas": carpetas, "actas": actas}
+        return self._indice
+
+    def huella(self, origen):
+        """
+        Huella del contenido de un acta. El hash solo se vuelve a calcular si cambia
+        la fecha de modificación o el tamaño del archivo (o del zip que la contiene).
+        """
+        estado = os.stat(separar_origen(origen)[0])
+        firma = (estado.st_mtime_ns, estado.st_size)
+        guardada = self._huellas.get(origen)
+        if guardada is None or guardada[0] != firma:
+            guardada = (firma, hash_origen(origen))
+            self._huellas[origen] = guardada
+        return guardada[1]
+
+    # Datos (se ejecutan en el hilo de trabajo)
+
+    def resultados(self, origen, huella):
+        """
+        Resultados de un acta, desde la caché en memoria si su contenido no ha cambiado.
+        """
+        clave = ("resultados", origen)
+        resultados = self.cache.obtener(clave, huella)
+        if resultados is None:
+            if self.usar_cache:
+                from cache_resultados import extraer_resultados_con_cache
+                _, resultados, error = extraer_resultados_con_cache([origen], 1)[0]
+            else:
+                _, resultados, error = extraer_resultados_sin_cache([origen], 1)[0]
+            if error is not None:
+                raise error
+            self.cache.guardar(clave, huella, resultados)
+        return resultados
+
+    def _datos_acta(self, archivo, origen, huella):
+        resultados = self.resultados(origen, huella)
+        codigo, nombre, grupo, convocatoria = obtener_info_asignatura(archivo)
+        total = sum(resultados.values())
+        return {
+            "archivo": archivo,
+            "codigo": codigo,
+            "nombre": nombre,
+            "grupo": grupo,
+            "convocatoria": convocatoria,
+            "titulo": generar_titulo_completo(archivo),
+            "resultados": resultados,
+            "porcentajes": {k: (v / total * 100 if total else 0.0) for k, v in resultados.items()},
+            "total_matriculados": total,
+        }
+
+    def _datos_convocatoria(self, carpeta, actas):
+        registros = []
+        for (_, codigo, grupo), (archivo, origen, huella) in sorted(actas.items()):
+            if codigo in ASIGNATURAS:
+                registros.append((carpeta, codigo, grupo, self.resultados(origen, huella)))
+        if not registros:
+            raise NoEncontrado(f"No hay actas en la convocatoria {carpeta}")
+        return CuboResultados.desde_registros(registros, convocatorias=[carpeta]).resumen(carpeta)
+
+    # Formatos
+
+    def _figura(self, figura, formato):
+        # La figura es la reutilizable de generar_diagrama_sectores (no hay que cerrarla);
+        # todas las respuestas se generan en el mismo hilo de trabajo
+        salida = io.BytesIO()
+        figura.savefig(salida, format=formato, dpi=DPI_SERVIDOR, bbox_inches="tight")
+        return salida.getvalue()
+
+    def generar_acta(self, archivo, origen, huella, formato, url):
+        """
+        Respuesta de un acta en el formato pedido.
+        """
+        datos = self._datos_acta(archivo, origen, huella)
+        if formato == "json":
+            return json.dumps(datos, ensure_ascii=False, indent=2).encode("utf-8")
+        if formato in ("png", "svg"):
+            from extraer_resultado_de_excel import generar_diagrama_sectores
+            figura = generar_diagrama_sectores(datos["resultados"], titulo=datos["titulo"], mostrar=False)
+            if figura is None:
+                raise NoEncontrado(f"El acta {archivo} no tiene calificaciones")
+            return self._figura(figura, formato)
+        if formato == "tex":
+            from generar_informe_sectores import generar_seccion_asignatura
+            return generar_seccion_asignatura({**datos, "grafico_path": None}).encode("utf-8")
+        filas = [
+            f"<tr><td>{html.escape(etiqueta)}</td><td>{datos['resultados'][k]}</td>"
+            f"<td>{datos['porcentajes'][k]:.1f}%</td></tr>"
+            for k, etiqueta in ETIQUETAS_RESULTADOS.items() if datos["resultados"][k] > 0
+        ]
+        filas.append(f"<tr><th>{html.escape(TEXTOS['tabla_total'])}</th>"
+                     f"<th>{datos['total_matriculados']}</th><th>100.0%</th></tr>")
+        return FRAGMENTO_HTML.substitute(
+            titulo=html.escape(datos["titulo"]),
+            cabecera="".join(f"<th>{html.escape(TEXTOS[c])}</th>"
+                             for c in ("tabla_resultado", "tabla_estudiantes", "tabla_porcentaje")),
+            filas="\n".join(filas),
+            grafico=html.escape(url[:-len("html")] + "svg")
+        ).encode("utf-8")
+
+    def generar_convocatoria(self, carpeta, actas, formato, url):
+        """
+        Respuesta de una convocatoria en el formato pedido.
+        """
+        datos = self._datos_convocatoria(carpeta, actas)
+        if formato == "json":
+            return json.dumps({
+                "carpeta": carpeta,
+                "nombre": datos["nombre"],
+                "asignaturas": [
+                    {"codigo": codigo, "nombre": nombre, "grupos": grupos, "total": int(total),
+                     "resultados": dict(zip(datos["categorias"], map(int, conteos))),
+                     "porcentajes": dict(zip(datos["categorias"], map(float, porcentajes)))}
+                    for codigo, nombre, grupos, conteos, total, porcentajes in zip(
+                        datos["codigos"], datos["nombres"], datos["grupos"], datos["conteos"],
+                        datos["totales"], datos["porcentajes"])
+                ],
+            }, ensure_ascii=False, indent=2).encode("utf-8")
+        if formato in ("png", "svg"):
+            from generar_informe_barras import generar_grafico_barras_apiladas
+            # La función guarda en una ruta (el formato sale de la extensión): se usa un temporal
+            with tempfile.TemporaryDirectory() as directorio:
+                ruta = os.path.join(directorio, f"barras_{carpeta}.{formato}")
+                generar_grafico_barras_apiladas(datos, datos["nombre"], ruta)
+                with open(ruta, "rb") as f:
+                    return f.read()
+        if formato == "tex":
+            from generar_informe_barras import generar_seccion_convocatoria
+            return generar_seccion_convocatoria(datos, None).encode("utf-8")
+        filas = [
+            f"<tr><td>{html.escape(f'{codigo} - {nombre}')}</td>"
+            + "".join(f"<td>{porcentaje:.1f}%</td>" for porcentaje in porcentajes)
+            + f"<td>{total}</td></tr>"
+            for codigo, nombre, porcentajes, total in zip(
+                datos["codigos"], datos["nombres"], datos["porcentajes"], datos["totales"])
+        ]
+        return FRAGMENTO_HTML.substitute(
+            titulo=html.escape(datos["nombre"]),
+            cabecera="".join(f"<th>{html.escape(c)}</th>"
+                             for c in [TEXTOS["tabla_asignatura"], *datos["categorias"], TEXTOS["tabla_total"]]),
+            filas="\n".join(filas),
+            grafico=html.escape(url[:-len("html")] + "svg")
+        ).encode("utf-8")
+
+    def generar_asignatura(self, codigo, actas):
+        """
+        Conteos de una asignatura en todas sus convocatorias y grupos (JSON).
+        """
+        convocatorias = {}
+        for (carpeta, _, grupo), (archivo, origen, huella) in sorted(actas.items()):
+            datos = self._datos_acta(archivo, origen, huella)
+            convocatorias.setdefault(carpeta, {
+                "nombre": TIPOS_CONVOCATORIAS.get(carpeta, {}).get("nombre", carpeta), "grupos": {}
+            })["grupos"][grupo] = {k: datos[k] for k in ("resultados", "porcentajes", "total_matriculados")}
+        return json.dumps({"codigo": codigo, "nombre": ASIGNATURAS.get(codigo, "Asignatura desconocida"),
+                           "convocatorias": convocatorias}, ensure_ascii=False, indent=2).encode("utf-8")
+
+    def generar_indice(self, indice):
+        """
+        Índice de las actas y convocatorias disponibles (JSON).
+        """
+        actas = [
+            {"carpeta": carpeta, "codigo": codigo, "grupo": grupo, "archivo": archivo,
+             "nombre": ASIGNATURAS.get(codigo, "Asignatura desconocida"),
+             "url": f"/acta/{carpeta}/{codigo}/{grupo}.json"}
+            for (carpeta, codigo, grupo), (archivo, _) in sorted(indice["actas"].items())
+        ]
+        convocatorias = [
+            {"carpeta": carpeta, "nombre": info["nombre"], "url": f"/convocatoria/{carpeta}.json"}
+            for carpeta, info in indice["carpetas"].items() if info["archivos"]
+        ]
+        return json.dumps({"actas": actas, "convocatorias": convocatorias,
+                           "formatos": list(TIPOS_CONTENIDO)}, ensure_ascii=False, indent=2).encode("utf-8")
+
+    # Peticiones
+
+    async def _en_trabajo(self, funcion, *argumentos):
+        """
+        Ejecuta una función en el hilo de trabajo sin bloquear el bucle de eventos.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._trabajo, funcion, *argumentos)
+
+    async def _generar(self, clave, huella, funcion, *argumentos):
+        """
+        Devuelve la respuesta guardada o la genera en el hilo de trabajo. Las peticiones
+        simultáneas de la misma respuesta esperan a una única generación.
+        """
+        cuerpo = self.cache.obtener(clave, huella)
+        if cuerpo is not None:
+            return cuerpo
+        futuro = self._en_curso.get((clave, huella))
+        if futuro is None:
+            futuro = asyncio.get_running_loop().run_in_executor(self._trabajo, funcion, *argumentos)
+            self._en_curso[(clave, huella)] = futuro
+            try:
+                cuerpo = await futuro
+            finally:
+                del self._en_curso[(clave, huella)]
+            self.cache.guardar(clave, huella, cuerpo)
+            return cuerpo
+        return await futuro
+
+    async def responder(self, url):
+        """
+        Genera la respuesta a una petición GET.
+
+        Args:
+            url (str): Ruta pedida (p.ej. "/acta/1Q1/34154/A.json")
+
+        Returns:
+            tuple: (tipo de contenido, cuerpo en bytes)
+
+        Raises:
+            NoEncontrado: Si el recurso no existe
+        """
+        indice = await self._en_trabajo(self.indice)
+        if url in ("/", "/index.json"):
+            return TIPOS_CONTENIDO["json"], await self._generar(
+                ("indice",), indice["firma"], self.generar_indice, indice)
+
+        coincidencia = RUTA_ACTA.match(url)
+        if coincidencia:
+            carpeta, codigo, grupo, formato = coincidencia.groups()
+            if (carpeta, codigo, grupo) not in indice["actas"]:
+                raise NoEncontrado(f"No hay acta de {codigo} grupo {grupo} en {carpeta}")
+            archivo, origen = indice["actas"][(carpeta, codigo, grupo)]
+            huella = await self._en_trabajo(self.huella, origen)
+            return TIPOS_CONTENIDO[formato], await self._generar(
+                (url,), (archivo, huella), self.generar_acta, archivo, origen, huella, formato, url)
+
+        coincidencia = RUTA_CONVOCATORIA.match(url) or RUTA_ASIGNATURA.match(url)
+        if coincidencia:
+            if coincidencia.re is RUTA_CONVOCATORIA:
+                clave, formato = coincidencia.groups()
+                actas = {acta: valor for acta, valor in indice["actas"].items() if acta[0] == clave}
+                funcion = lambda actas: self.generar_convocatoria(clave, actas, formato, url)
+            else:
+                clave, formato = coincidencia.group(1), "json"
+                actas = {acta: valor for acta, valor in indice["actas"].items() if acta[1] == clave}
+                funcion = lambda actas: self.generar_asignatura(clave, actas)
+            if not actas:
+                raise NoEncontrado(f"No hay actas de {clave}")
+            actas = await self._en_trabajo(
+                lambda: {acta: (archivo, origen, self.huella(origen)) for acta, (archivo, origen) in actas.items()})
+            huella = tuple(sorted((acta, valor[0], valor[2]) for acta, valor in actas.items()))
+            return TIPOS_CONTENIDO[formato], await self._generar((url,), huella, funcion, actas)
+
+        raise NoEncontrado(f"Ruta desconocida: {url}")
+
+    async def atender(self, lector, escritor):
+        """
+        Atiende una conexión HTTP/1.1 (una petición por conexión).
+        """
+        inicio = time.perf_counter()
+        metodo, url, estado = "-", "-", 500
+        try:
+            linea = await lector.readline()
+            metodo, url, _ = linea.decode("latin-1").split(" ", 2)
+            cabeceras = {}
+            while True:
+                linea = await lector.readline()
+                if linea in (b"\r\n", b"\n", b""):
+                    break
+                nombre, _, valor = linea.decode("latin-1").partition(":")
+                cabeceras[nombre.strip().lower()] = valor.strip()
+
+            url = unquote(urlsplit(url).path)
+            if metodo not in ("GET", "HEAD"):
+                estado, tipo, cuerpo = 405, TIPOS_CONTENIDO["json"], b'{"error": "Solo GET y HEAD"}'
+            else:
+                try:
+                    tipo, cuerpo = await self.responder(url)
+                    estado = 200
+                except NoEncontrado as e:
+                    estado, tipo = 404, TIPOS_CONTENIDO["json"]
+                    cuerpo = json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8")
+                except Exception as e:
+                    estado, tipo = 500, TIPOS_CONTENIDO["json"]
+                    cuerpo = json.dumps({"error": f"{type(e).__name__}: {e}"}, ensure_ascii=False).encode("utf-8")
+
+            etiqueta = '"' + hashlib.sha1(cuerpo).hexdigest()[:20] + '"'
+            if estado == 200 and cabeceras.get("if-none-match") == etiqueta:
+                estado, cuerpo = 304, b""
+            cabecera = (f"HTTP/1.1 {estado} {ESTADOS[estado]}\r\n"
+                        f"Content-Type: {tipo}\r\n"
+                        f"Content-Length: {len(cuerpo)}\r\n"
+                        f"ETag: {etiqueta}\r\n"
+                        "Cache-Control: no-cache\r\n"
+                        "Connection: close\r\n\r\n")
+            escritor.write(cabecera.encode("latin-1"))
+            if metodo != "HEAD":
+                escritor.write(cuerpo)
+            await escritor.drain()
+        except (ValueError, ConnectionError):
+            pass  # Petición mal formada o conexión cerrada por el cliente
+        finally:
+            escritor.close()
+            print(f"  {metodo} {url} {estado} {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+async def servir(servicio, host=HOST_SERVIDOR, puerto=PUERTO_SERVIDOR):
+    """
+    Pone en marcha el servidor HTTP hasta que se cancela.
+    """
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+    print(f"🌐 Servicio de informes en http://{host}:{puerto}/ (Ctrl+C para terminar)")
+    async with servidor:
+        await servidor.serve_forever()
+
+def main():
+    """
+    Punto de entrada del servicio.
+    """
+    parser = argparse.ArgumentParser(description="Servicio HTTP local con conteos, gráficos y fragmentos de informe")
+    parser.add_argument("--host", default=HOST_SERVIDOR, help=f"Dirección de escucha (por defecto {HOST_SERVIDOR})")
+    parser.add_argument("--puerto", type=int, default=PUERTO_SERVIDOR, help=f"Puerto (por defecto {PUERTO_SERVIDOR})")
+    parser.add_argument("--excels", default=None, help=f"Directorio de los Excel (por defecto {DIRECTORIO_EXCELS})")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No usar la caché persistente de resultados (solo la caché en memoria)")
+    parser.add_argument("--max-entradas", type=int, default=CACHE_SERVIDOR_ENTRADAS,
+                        help="Entradas de la caché en memoria")
+    args = parser.parse_args()
+
+    servicio = ServicioInformes(args.excels, usar_cache=not args.sin_cache, max_entradas=args.max_entradas)
+    try:
+        asyncio.run(servir(servicio, args.host, args.puerto))
+    except KeyboardInterrupt:
+        print("\n👋 Servicio terminado")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Configuración común de las pruebas.
+
+Los módulos del proyecto están en la raíz del repositorio y usan rutas relativas
+(output/, .cache/): cada prueba que escribe archivos se ejecuta en una carpeta
+temporal propia (ver el fixture carpeta_temporal).
+"""
+
+import os
+import sys
+import glob
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+# Actas de ejemplo incluidas en el repositorio
+ACTAS_EJEMPLO = sorted(glob.glob(os.path.join(RAIZ, "excels", "*", "*.xls")))
+
+@pytest.fixture
+def carpeta_temporal(tmp_path, monkeypatch):
+    """
+    Ejecuta la prueba con una carpeta temporal como directorio de trabajo.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
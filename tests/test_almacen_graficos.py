@@ -0,0 +1,101 @@
+"""
+Almacén de gráficos: claves, instalación por enlace y reutilización entre ejecuciones.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import almacen_graficos
+import renderizado_graficos
+from almacen_graficos import AlmacenGraficos, clave_grafico
+from renderizado_graficos import renderizar_graficos
+
+RESULTADOS = {"NP": 1, "SU": 2, "AP": 3, "NO": 2, "EX": 1, "MH": 0}
+
+def trabajo(**cambios):
+    return {"tipo": "sectores", "datos": RESULTADOS, "titulo": "34154 - Grup A",
+            "ruta": "output/graficos/34154_A.png", **cambios}
+
+@pytest.fixture
+def almacen(carpeta_temporal, monkeypatch):
+    """
+    Almacén del proceso vacío, en la carpeta temporal.
+    """
+    monkeypatch.setattr(almacen_graficos, "_almacen", None)
+    return almacen_graficos.obtener_almacen()
+
+def test_clave_grafico():
+    clave = clave_grafico(trabajo())
+    # La ruta de destino no forma parte de la clave, solo su formato
+    assert clave_grafico(trabajo(ruta="output/fragmentos/x/graficos/otro.png")) == clave
+    assert clave_grafico(trabajo(ruta="output/graficos/34154_A.pdf")) != clave
+    assert clave_grafico(trabajo(titulo="34154 - Grup B")) != clave
+    assert clave_grafico(trabajo(datos={**RESULTADOS, "MH": 1})) != clave
+    assert clave_grafico(trabajo(tipo="barras")) != clave
+
+def test_clave_con_arrays():
+    datos = {"codigos": ["34154"], "porcentajes": np.array([[50.0, 50.0]])}
+    como_listas = {"codigos": ["34154"], "porcentajes": [[50.0, 50.0]]}
+    assert clave_grafico(trabajo(tipo="barras", datos=datos)) == \
+        clave_grafico(trabajo(tipo="barras", datos=como_listas))
+
+def test_clave_de_tendencias(monkeypatch):
+    tendencias = trabajo(tipo="tendencias", datos={"34154": {"2023-24": 80.0}})
+    clave = clave_grafico(tendencias)
+    # La leyenda usa el nombre de la asignatura
+    monkeypatch.setitem(almacen_graficos.ASIGNATURAS, "34154", "Otro nombre")
+    assert clave_grafico(tendencias) != clave
+
+def test_guardar_e_instalar(carpeta_temporal):
+    almacen = AlmacenGraficos(str(carpeta_temporal / "almacen"))
+    dibujado = carpeta_temporal / "dibujado.png"
+    dibujado.write_bytes(b"imagen")
+    destino = str(carpeta_temporal / "output" / "graficos" / "a.png")
+
+    assert not almacen.instalar("ab12", destino)
+    almacen.guardar("ab12", str(dibujado))
+    assert almacen.instalar("ab12", destino)
+    with open(destino, "rb") as f:
+        assert f.read() == b"imagen"
+    # Otra extensión es otra imagen
+    assert not almacen.instalar("ab12", destino.replace(".png", ".pdf"))
+    assert [os.path.basename(ruta) for ruta, _, _ in almacen.imagenes()] == ["ab12.png"]
+
+def test_limitar(carpeta_temporal):
+    almacen = AlmacenGraficos(str(carpeta_temporal / "almacen"))
+    for i, clave in enumerate(["aa01", "bb02", "cc03"]):
+        origen = carpeta_temporal / f"{clave}.png"
+        origen.write_bytes(b"x" * 2**19)
+        almacen.guardar(clave, str(origen))
+        os.utime(almacen.ruta(clave, ".png"), (i, i))
+    almacen.instalar("aa01", str(carpeta_temporal / "usada.png"))  # Usada recientemente
+
+    assert almacen.limitar(1) == 1
+    assert sorted(os.path.basename(ruta) for ruta, _, _ in almacen.imagenes()) == ["aa01.png", "cc03.png"]
+    assert almacen.vaciar() == 2
+    assert almacen.imagenes() == []
+
+def test_reutiliza_entre_ejecuciones(almacen, monkeypatch):
+    os.makedirs(os.path.dirname(trabajo()["ruta"]))
+    (ruta, error), = renderizar_graficos([trabajo()], jobs=1)
+    assert error is None
+    with open(ruta, "rb") as f:
+        imagen = f.read()
+    (guardada, _, _), = almacen.imagenes()
+
+    # Sin la carpeta output el gráfico se instala desde el almacén, sin dibujarlo
+    os.remove(ruta)
+    renderizar_grafico = renderizado_graficos.renderizar_grafico
+    def no_dibujar(trabajo):
+        raise AssertionError("El gráfico debería tomarse del almacén")
+    monkeypatch.setattr(renderizado_graficos, "renderizar_grafico", no_dibujar)
+    assert renderizar_graficos([trabajo()], jobs=1) == [(ruta, None)]
+    assert os.path.samefile(ruta, guardada)
+
+    # Volver a dibujarlo sustituye el enlace por la imagen nueva, que pasa al almacén
+    renderizar_grafico(trabajo())
+    assert [ruta for ruta, _, _ in almacen.imagenes()] == [guardada]
+    with open(guardada, "rb") as f:
+        assert f.read() == imagen
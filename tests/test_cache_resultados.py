@@ -0,0 +1,52 @@
+"""
+Invalidación de la caché de resultados por el contenido de las actas.
+"""
+
+import os
+import shutil
+
+from cache_resultados import (
+    extraer_resultados_con_cache, conectar_cache, consultar_cache, calcular_clave, invalidar_cache
+)
+from conftest import ACTAS_EJEMPLO
+
+def cacheados(*rutas):
+    conexion = conectar_cache()
+    try:
+        return consultar_cache(conexion, {ruta: calcular_clave(ruta) for ruta in rutas})
+    finally:
+        conexion.close()
+
+def test_cache_sigue_al_contenido(carpeta_temporal):
+    primera, segunda = ACTAS_EJEMPLO[0], ACTAS_EJEMPLO[-1]
+    acta = str(carpeta_temporal / "acta.xls")
+    shutil.copy(primera, acta)
+    (_, resultados, error), = extraer_resultados_con_cache([acta], 1)
+    assert error is None
+    assert cacheados(acta) == {acta: resultados}
+
+    # Otro contenido en la misma ruta: la entrada anterior ya no sirve
+    shutil.copy(segunda, acta)
+    assert cacheados(acta) == {}
+    (_, nuevos, _), = extraer_resultados_con_cache([acta], 1)
+    assert nuevos != resultados
+    assert cacheados(acta) == {acta: nuevos}
+
+def test_invalidar_por_contenido(carpeta_temporal):
+    original = str(carpeta_temporal / "original.xls")
+    copia = str(carpeta_temporal / "copia.xls")
+    shutil.copy(ACTAS_EJEMPLO[0], original)
+    shutil.copy(ACTAS_EJEMPLO[0], copia)
+    extraer_resultados_con_cache([original], 1)
+    extraer_resultados_con_cache([copia], 1)  # La entrada pasa a anotar la ruta de la copia
+
+    assert invalidar_cache([original]) == 1
+    assert cacheados(original, copia) == {}
+    assert invalidar_cache([original]) == 0
+
+def test_invalidar_archivo_eliminado(carpeta_temporal):
+    acta = str(carpeta_temporal / "acta.xls")
+    shutil.copy(ACTAS_EJEMPLO[0], acta)
+    extraer_resultados_con_cache([acta], 1)
+    os.remove(acta)
+    assert invalidar_cache([acta]) == 1
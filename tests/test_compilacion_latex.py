@@ -0,0 +1,116 @@
+"""
+Formato precompilado del preámbulo común, con un pdflatex simulado (subprocess.run
+y shutil.which sustituidos): no comprueba LaTeX real, solo los comandos y los
+casos en los que se compila sin el formato.
+"""
+
+import os
+import subprocess
+
+import pytest
+
+import compilacion_latex
+from preambulo_latex import preambulo_comun, directorio_formatos
+
+class LatexSimulado:
+    """
+    Sustituto de subprocess.run que anota los comandos y escribe lo que escribiría pdflatex.
+    """
+    def __init__(self, falla_ini=False, falla_fmt=False):
+        self.falla_ini = falla_ini
+        self.falla_fmt = falla_fmt
+        self.comandos = []
+
+    def __call__(self, comando, cwd=None, **kwargs):
+        self.comandos.append((comando, cwd))
+        salida = next(opcion.split("=", 1)[1] for opcion in comando if opcion.startswith("-output-directory="))
+        if "-ini" in comando:
+            if self.falla_ini:
+                return subprocess.CompletedProcess(comando, 1, b"! LaTeX Error: File `mylatexformat.ltx' not found.", b"")
+            nombre = next(opcion.split("=", 1)[1] for opcion in comando if opcion.startswith("-jobname="))
+            open(os.path.join(salida, f"{nombre}.fmt"), "w").close()
+        elif self.falla_fmt and any(opcion.startswith("-fmt=") for opcion in comando):
+            return subprocess.CompletedProcess(comando, 1, b"! Undefined control sequence.", b"")
+        else:
+            documento = os.path.splitext(comando[-1])[0]
+            open(os.path.join(salida, f"{documento}.pdf"), "w").close()
+        return subprocess.CompletedProcess(comando, 0, b"", b"")
+
+@pytest.fixture
+def latex(carpeta_temporal, monkeypatch):
+    ejecutable = carpeta_temporal / "pdflatex"
+    ejecutable.write_text("")
+    monkeypatch.setattr(compilacion_latex.shutil, "which", lambda motor: str(ejecutable))
+    monkeypatch.setattr(compilacion_latex, "_formatos", {})
+
+    def simular(**kwargs):
+        simulado = LatexSimulado(**kwargs)
+        monkeypatch.setattr(compilacion_latex.subprocess, "run", simulado)
+        return simulado
+    return simular
+
+def escribir_documento(nombre, backend="matplotlib"):
+    os.makedirs("output", exist_ok=True)
+    ruta = os.path.join("output", nombre)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(preambulo_comun(backend) + "\\begin{document}\nx\n\\end{document}\n")
+    return ruta
+
+def test_construye_formato_y_compila_con_fmt(latex):
+    simulado = latex()
+    ruta = escribir_documento("informe.tex")
+    resultado = compilacion_latex.compilar_documento(ruta)
+    assert resultado["estado"] == "compilado"
+    assert resultado["formato"] and resultado["aviso"] == ""
+
+    (ini, cwd), *pasadas = simulado.comandos
+    assert ini[1] == "-ini"
+    assert ini[-3:] == ["&pdflatex", "mylatexformat.ltx", "informe.tex"]
+    assert cwd == os.path.abspath("output")
+    clave = next(opcion.split("=", 1)[1] for opcion in ini if opcion.startswith("-jobname="))
+    formato = os.path.join(os.path.abspath(directorio_formatos()), clave)
+    assert os.path.exists(f"{formato}.fmt")
+    assert len(pasadas) == compilacion_latex.COMPILACION_LATEX["pasadas"]
+    assert all(comando[1] == f"-fmt={formato}" for comando, _ in pasadas)
+
+    # Otro documento con el mismo preámbulo reutiliza el formato
+    compilacion_latex.compilar_documento(escribir_documento("otro.tex"))
+    assert sum("-ini" in comando for comando, _ in simulado.comandos) == 1
+
+def test_sin_formato_si_no_se_puede_construir(latex):
+    simulado = latex(falla_ini=True)
+    resultado = compilacion_latex.compilar_documento(escribir_documento("informe.tex"))
+    assert resultado["estado"] == "compilado"
+    assert not resultado["formato"]
+    assert "mylatexformat.ltx" in resultado["aviso"]
+    assert not any(opcion.startswith("-fmt=") for comando, _ in simulado.comandos for opcion in comando)
+    assert os.listdir(directorio_formatos()) == []
+
+def test_reintenta_sin_formato(latex):
+    simulado = latex(falla_fmt=True)
+    resultado = compilacion_latex.compilar_documento(escribir_documento("informe.tex"))
+    assert resultado["estado"] == "compilado"
+    assert not resultado["formato"]
+    assert "Undefined control sequence" in resultado["aviso"]
+
+    # El formato ya no se usa para los demás documentos
+    simulado.comandos.clear()
+    resultado = compilacion_latex.compilar_documento(escribir_documento("otro.tex"))
+    assert not any(opcion.startswith("-fmt=") for comando, _ in simulado.comandos for opcion in comando)
+    assert resultado["aviso"]
+
+def test_formatos_por_clave(latex):
+    latex()
+    compilacion_latex.compilar_documento(escribir_documento("matplotlib.tex"))
+    compilacion_latex.compilar_documento(escribir_documento("tikz.tex", backend="tikz"))
+    # Cambiar de backend no elimina el formato del otro
+    assert len(os.listdir(directorio_formatos())) == 2
+
+def test_limitar_formatos(carpeta_temporal):
+    os.makedirs(directorio_formatos())
+    for i in range(5):
+        ruta = os.path.join(directorio_formatos(), f"{i}.fmt")
+        open(ruta, "w").close()
+        os.utime(ruta, (i, i))
+    assert compilacion_latex.limitar_formatos(2) == 3
+    assert sorted(os.listdir(directorio_formatos())) == ["3.fmt", "4.fmt"]
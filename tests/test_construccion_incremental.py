@@ -0,0 +1,64 @@
+"""
+Manifiesto de la construcción incremental y huellas de las secciones.
+"""
+
+import os
+import json
+
+import config
+from construccion_incremental import ConstruccionIncremental, huella_plantillas
+from escritura_latex import PlantillaLatex
+
+def generar(texto):
+    return lambda: texto
+
+def no_generar():
+    raise AssertionError("La sección debería haberse reutilizado")
+
+def test_manifiesto_incremental(carpeta_temporal):
+    grafico = os.path.join(config.DIRECTORIO_OUTPUT, "graficos", "a.png")
+    os.makedirs(os.path.dirname(grafico))
+
+    construccion = ConstruccionIncremental("prueba")
+    assert construccion.seccion("a", "h1", generar("sección a")) == "sección a"
+    assert construccion.seccion("b", "h2", generar("sección b")) == "sección b"
+    assert not construccion.vigente(grafico, "g1")
+    open(grafico, "w").close()
+    construccion.finalizar()
+
+    # El manifiesto solo guarda huellas
+    with open(construccion.ruta_manifiesto, encoding="utf-8") as f:
+        manifiesto = json.load(f)
+    assert manifiesto["secciones"] == {"a": "h1", "b": "h2"}
+    assert "sección a" not in json.dumps(manifiesto, ensure_ascii=False)
+
+    # Sin cambios se reutiliza todo; con otra huella se regenera
+    construccion = ConstruccionIncremental("prueba")
+    assert construccion.seccion("a", "h1", no_generar) == "sección a"
+    assert construccion.seccion("b", "h3", generar("sección b'")) == "sección b'"
+    assert construccion.vigente(grafico, "g1")
+    construccion.finalizar()
+    assert sorted(os.listdir(construccion.directorio_secciones)) == ["h1.tex", "h3.tex"]
+
+    # Lo que deja de generarse se elimina
+    construccion = ConstruccionIncremental("prueba")
+    construccion.seccion("a", "h1", no_generar)
+    assert construccion.finalizar() == [grafico]
+    assert not os.path.exists(grafico)
+    assert os.listdir(construccion.directorio_secciones) == ["h1.tex"]
+
+def test_manifiesto_no_incremental(carpeta_temporal):
+    construccion = ConstruccionIncremental("prueba", incremental=False)
+    assert construccion.seccion("a", "h1", generar("otra")) == "otra"
+    construccion.finalizar()
+    with open(construccion.ruta_manifiesto, encoding="utf-8") as f:
+        assert json.load(f)["secciones"] == {}
+    assert not os.path.exists(construccion.directorio_secciones)
+
+def test_huella_plantillas(monkeypatch):
+    plantilla = PlantillaLatex(r"\section{@@titulo}")
+    huella = huella_plantillas(plantilla)
+    assert huella_plantillas(PlantillaLatex(r"\subsection{@@titulo}")) != huella
+
+    monkeypatch.setitem(config.TEXTOS, "tabla_estudiantes", "Alumnes")
+    assert huella_plantillas(plantilla) != huella
@@ -0,0 +1,57 @@
+"""
+Cubo de resultados: ejes, agregados y resúmenes por convocatoria.
+"""
+
+import numpy as np
+
+from cubo_resultados import CuboResultados, huella_resumen
+
+def conteos(np_=0, su=0, ap=0, no=0, ex=0, mh=0):
+    return {"NP": np_, "SU": su, "AP": ap, "NO": no, "EX": ex, "MH": mh}
+
+REGISTROS = [
+    ("2Q1", "34156", "A", conteos(su=2, ap=2)),
+    ("1Q1", "34155", "B", conteos(np_=1, ap=3)),
+    ("1Q1", "34155", "A", conteos(su=1, no=2, mh=1)),
+    ("1Q1", "34154", "A", conteos()),
+]
+
+def test_ejes():
+    cubo = CuboResultados.desde_registros(REGISTROS)
+    # Convocatorias en el orden de TIPOS_CONVOCATORIAS; asignaturas y grupos ordenados
+    assert cubo.convocatorias == ["1Q1", "2Q1"]
+    assert cubo.asignaturas == ["34154", "34155", "34156"]
+    assert cubo.grupos == ["A", "B"]
+    assert cubo.categorias == ["NP", "SU", "AP", "NO", "EX", "MH"]
+    assert cubo.conteos.shape == (2, 3, 2, 6)
+    assert cubo.presentes.sum() == len(REGISTROS)
+
+def test_ultimo_registro_prevalece():
+    cubo = CuboResultados.desde_registros(REGISTROS + [("2Q1", "34156", "A", conteos(ex=7))])
+    assert cubo.conteos[1, 2, 0].tolist() == [0, 0, 0, 0, 7, 0]
+
+def test_resumen():
+    cubo = CuboResultados.desde_registros(REGISTROS)
+    resumen = cubo.resumen("1Q1")
+    assert resumen["nombre"] == "Primer Quadrimestre - Primera Convocatòria"
+    # Un acta vacía también cuenta como asignatura con datos
+    assert resumen["codigos"] == ["34154", "34155"]
+    assert resumen["grupos"] == ["A", "AB"]
+    assert resumen["conteos"].tolist() == [[0] * 6, [1, 1, 3, 2, 0, 1]]
+    assert resumen["totales"].tolist() == [0, 8]
+    # Sin alumnos los porcentajes son 0, no NaN
+    assert resumen["porcentajes"][0].tolist() == [0.0] * 6
+    assert np.allclose(resumen["porcentajes"][1], [12.5, 12.5, 37.5, 25.0, 0.0, 12.5])
+    assert cubo.num_asignaturas("1Q1") == 2
+    assert cubo.num_asignaturas("2Q1") == 1
+
+def test_huella_resumen_serializable():
+    cubo = CuboResultados.desde_registros(REGISTROS)
+    huella = huella_resumen(cubo.resumen("2Q1"))
+    assert huella[-1] == [[0, 2, 2, 0, 0, 0]]
+    otro = CuboResultados.desde_registros(REGISTROS[:1] + [("2Q1", "34156", "B", conteos(ap=1))])
+    assert huella_resumen(otro.resumen("2Q1")) != huella
+
+def test_cubo_vacio():
+    cubo = CuboResultados.desde_registros([])
+    assert cubo.conteos.shape == (0, 0, 0, 6)
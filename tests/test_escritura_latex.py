@@ -0,0 +1,47 @@
+"""
+Escapado de textos y plantillas LaTeX con caracteres especiales.
+"""
+
+import pytest
+
+from escritura_latex import PlantillaLatex, EscritorLatex, escapar_latex, ESCAPES_LATEX
+
+@pytest.mark.parametrize("caracter, escapado", sorted(ESCAPES_LATEX.items()))
+def test_escapar_cada_caracter(caracter, escapado):
+    assert escapar_latex(f"a{caracter}b") == f"a{escapado}b"
+
+def test_escapar_texto_completo():
+    texto = r"Àlgebra & Geometria_1 (100% #1) {x} ~ ^ $ \ fi"
+    assert escapar_latex(texto) == (
+        r"Àlgebra \& Geometria\_1 (100\% \#1) \{x\} \textasciitilde{} "
+        r"\textasciicircum{} \$ \textbackslash{} fi"
+    )
+
+def test_escapar_no_escapa_dos_veces():
+    # La barra invertida se sustituye de una vez, sin volver a escapar sus llaves
+    assert escapar_latex("\\{") == r"\textbackslash{}\{"
+
+def test_escapar_convierte_a_texto():
+    assert escapar_latex(42) == "42"
+    assert escapar_latex("Matrícula d'Honor") == "Matrícula d'Honor"
+
+def test_plantilla_respeta_latex():
+    plantilla = PlantillaLatex(r"""\section{@@titulo} $x^2$ 50\% \textbf{@@{valor}px}""")
+    resultado = plantilla.substitute(titulo=escapar_latex("A & B_1"), valor=3)
+    assert resultado == r"""\section{A \& B\_1} $x^2$ 50\% \textbf{3px}"""
+
+def test_plantilla_valores_con_delimitador():
+    # Los valores no se vuelven a interpretar como campos
+    assert PlantillaLatex("@@a").substitute(a="@@b $c$") == "@@b $c$"
+    assert PlantillaLatex("@@@@a").substitute(a=1) == "@@a"
+
+def test_plantilla_campo_desconocido():
+    with pytest.raises(KeyError):
+        PlantillaLatex("@@falta").substitute()
+
+def test_escritor_con_caracteres_especiales(tmp_path):
+    ruta = tmp_path / "documento.tex"
+    with EscritorLatex(str(ruta)) as escritor:
+        escritor.escribir(PlantillaLatex(r"\title{@@titulo}" "\n").substitute(titulo=escapar_latex("Curs 24/25 & 100%")))
+    assert ruta.read_text(encoding="utf-8") == "\\title{Curs 24/25 \\& 100\\%}\n"
+    assert escritor.escrito
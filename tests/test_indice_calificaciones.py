@@ -0,0 +1,37 @@
+"""
+Recuento de calificaciones con el índice de etiquetas normalizadas.
+"""
+
+import pytest
+
+from extraer_resultado_de_excel import (
+    normalizar_etiqueta, construir_indice_calificaciones, contar_calificaciones, INDICE_CALIFICACIONES
+)
+
+@pytest.mark.parametrize("variante", [
+    "Matrícula d'Honor", "MATRICULA D’HONOR", "  matrícula   d`honor ", "Matrícula d'honor",
+])
+def test_variantes_de_matricula(variante):
+    assert INDICE_CALIFICACIONES[normalizar_etiqueta(variante)] == "MH"
+
+@pytest.mark.parametrize("variante", ["Excel·lent", "Excel.lent", "Exceŀlent", "EXCEL·LENT"])
+def test_variantes_de_excelente(variante):
+    assert INDICE_CALIFICACIONES[normalizar_etiqueta(variante)] == "EX"
+
+def test_indice_rechaza_etiquetas_ambiguas():
+    with pytest.raises(ValueError, match="APROVAT"):
+        construir_indice_calificaciones({"AP": ["Aprovat"], "NO": ["APROVAT"]})
+
+def test_contar_calificaciones():
+    valores = ["Cabecera", "Aprovat", "aprobado", None, float("nan"), "  ", "Notable",
+               "Suspès", "Convalidat", "Matrícula de honor", "Convalidat"]
+    resultados, desconocidas = contar_calificaciones(valores, fila_inicio=1)
+    assert resultados == {"NP": 0, "SU": 1, "AP": 2, "NO": 1, "EX": 0, "MH": 1}
+    # Las filas de las etiquetas desconocidas se numeran como en Excel
+    assert desconocidas == [{"etiqueta": "Convalidat", "total": 2, "filas": [9, 11]}]
+
+def test_contar_con_otro_indice():
+    indice = construir_indice_calificaciones({"AP": ["Apte"], "SU": ["No apte"]})
+    resultados, desconocidas = contar_calificaciones(["apte", "No Apte", "Apte"], indice=indice)
+    assert (resultados["AP"], resultados["SU"]) == (2, 1)
+    assert desconocidas == []
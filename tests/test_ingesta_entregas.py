@@ -0,0 +1,124 @@
+"""
+Entregas de actas en un zip o en un libro con una hoja por asignatura y grupo.
+"""
+
+import os
+import shutil
+import zipfile
+
+import pytest
+
+import conjunto_datos
+from ingesta_entregas import (
+    ruta_origen, separar_origen, carpeta_convocatoria, listar_entrega, buscar_entregas,
+    existe_origen, tamano_origen, hash_origen
+)
+from extraer_resultado_de_excel import extraer_resultado_detallado
+from conftest import ACTAS_EJEMPLO
+
+openpyxl = pytest.importorskip("openpyxl")
+
+CABECERA = ["DSP_ALU_DNIALU"] + [f"CAMPO{i}" for i in range(1, 12)] + ["DSP_NOMID1", "EXP_NUMORD"]
+
+def escribir_libro(ruta, hojas):
+    """
+    Escribe un libro xlsx con una hoja por acta: {nombre de hoja: [calificaciones]}.
+    """
+    libro = openpyxl.Workbook()
+    libro.remove(libro.active)
+    for nombre, calificaciones in hojas.items():
+        hoja = libro.create_sheet(nombre)
+        hoja.append(CABECERA)
+        for orden, calificacion in enumerate(calificaciones, start=1):
+            hoja.append([f"{orden:08d}"] + [None] * 11 + [calificacion, orden])
+    libro.save(ruta)
+
+HOJAS = {
+    "34154_A_1Q1": ["Aprovat", "Suspès", "Aprovat"],
+    "34155_B_2Q1": ["Notable", "No presentat"],
+    "Resum": ["Aprovat"],
+}
+
+@pytest.fixture
+def excels(carpeta_temporal):
+    directorio = carpeta_temporal / "excels"
+    directorio.mkdir()
+    return str(directorio)
+
+def test_rutas_de_origen():
+    origen = ruta_origen("excels/entrega.zip", "1Q1/actas.xlsx", "34154_A_1Q1")
+    assert origen == "excels/entrega.zip::1Q1/actas.xlsx#34154_A_1Q1"
+    assert separar_origen(origen) == ("excels/entrega.zip", "1Q1/actas.xlsx", "34154_A_1Q1")
+    assert separar_origen("excels/actas.xlsx#Full 1") == ("excels/actas.xlsx", None, "Full 1")
+    assert separar_origen("excels/1Q1/34154_A_1Q1.xls") == ("excels/1Q1/34154_A_1Q1.xls", None, None)
+
+def test_carpeta_convocatoria():
+    assert carpeta_convocatoria(["2Q1", "34155_A.xls"]) == "2Q1"
+    assert carpeta_convocatoria(["34155_A_2Q2.xls"]) == "2Q2"
+    assert carpeta_convocatoria(["actes", "34155 A 1Q1"]) == "1Q1"
+    assert carpeta_convocatoria(["34155_A.xls"]) is None
+
+def test_zip_de_actas(excels):
+    entrega = os.path.join(excels, "entrega.zip")
+    with zipfile.ZipFile(entrega, "w") as zf:
+        zf.write(ACTAS_EJEMPLO[0], "1Q1/34154_A_1Q1.xls")
+        zf.write(ACTAS_EJEMPLO[0], "__MACOSX/1Q1/._34154_A_1Q1.xls")
+        zf.write(ACTAS_EJEMPLO[0], "34156_A.xls")
+        zf.writestr("LLEGIU-ME.txt", "")
+
+    actas, descartadas = listar_entrega(entrega, excels)
+    assert actas == [{"carpeta": "1Q1", "archivo": f"{excels}/1Q1/34154_A_1Q1.xls",
+                      "origen": f"{entrega}::1Q1/34154_A_1Q1.xls"}]
+    assert descartadas == [(f"{entrega}::34156_A.xls", "no se reconoce la convocatoria")]
+
+    # El miembro del zip se lee igual que el archivo descomprimido
+    origen = actas[0]["origen"]
+    assert existe_origen(origen) and not existe_origen(f"{entrega}::1Q1/falta.xls")
+    assert tamano_origen(origen) == os.path.getsize(ACTAS_EJEMPLO[0])
+    assert hash_origen(origen) == hash_origen(ACTAS_EJEMPLO[0])
+    esperado = extraer_resultado_detallado(ACTAS_EJEMPLO[0])
+    assert extraer_resultado_detallado(origen)["resultados"] == esperado["resultados"]
+
+def test_libro_con_varias_hojas(excels):
+    libro = os.path.join(excels, "actes.xlsx")
+    escribir_libro(libro, HOJAS)
+
+    actas, descartadas = listar_entrega(libro, excels)
+    assert [acta["archivo"] for acta in actas] == [f"{excels}/1Q1/34154_A_1Q1.xls",
+                                                  f"{excels}/2Q1/34155_B_2Q1.xls"]
+    assert descartadas == [(f"{libro}#Resum", "no se reconoce la convocatoria")]
+
+    primera, segunda = (extraer_resultado_detallado(acta["origen"])["resultados"] for acta in actas)
+    assert (primera["AP"], primera["SU"]) == (2, 1)
+    assert (segunda["NO"], segunda["NP"], segunda["AP"]) == (1, 1, 0)
+    # Cada hoja tiene su propia huella de contenido
+    assert hash_origen(actas[0]["origen"]) != hash_origen(actas[1]["origen"])
+
+def test_libro_dentro_de_un_zip(excels, carpeta_temporal):
+    libro = str(carpeta_temporal / "actes.xlsx")
+    escribir_libro(libro, HOJAS)
+    entrega = os.path.join(excels, "entrega.zip")
+    with zipfile.ZipFile(entrega, "w") as zf:
+        zf.write(libro, "convocatoria/actes.xlsx")
+
+    actas, _ = listar_entrega(entrega, excels)
+    assert [acta["origen"] for acta in actas] == [f"{entrega}::convocatoria/actes.xlsx#34154_A_1Q1",
+                                                 f"{entrega}::convocatoria/actes.xlsx#34155_B_2Q1"]
+    resultados = extraer_resultado_detallado(actas[0]["origen"])["resultados"]
+    assert (resultados["AP"], resultados["SU"]) == (2, 1)
+
+def test_descubrir_archivos_con_entregas(excels):
+    os.makedirs(os.path.join(excels, "1Q1"))
+    repartida = os.path.join(excels, "1Q1", "34154_A_1Q1.xls")
+    shutil.copy(ACTAS_EJEMPLO[0], repartida)
+    escribir_libro(os.path.join(excels, "actes.xlsx"), HOJAS)
+    # Las actas ya repartidas por carpetas no son entregas
+    assert buscar_entregas(excels) == [os.path.join(excels, "actes.xlsx")]
+
+    carpetas = conjunto_datos.descubrir_archivos(excels)
+    # El acta repartida prevalece sobre la hoja con la misma ruta lógica
+    assert carpetas["1Q1"]["archivos"] == [repartida]
+    assert "origenes" not in carpetas["1Q1"]
+    archivo = f"{excels}/2Q1/34155_B_2Q1.xls"
+    assert carpetas["2Q1"]["archivos"] == [archivo]
+    assert carpetas["2Q1"]["origenes"] == {archivo: f"{excels}/actes.xlsx#34155_B_2Q1"}
@@ -0,0 +1,40 @@
+"""
+El lector en streaming de lector_columna_m debe leer lo mismo que pandas.
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import extraer_resultado_de_excel
+from lector_columna_m import leer_columna_con_cabecera, FormatoNoCompatible
+from conftest import ACTAS_EJEMPLO
+
+def normalizar(valores):
+    """
+    Celdas vacías como None y el resto como texto (el lector en streaming no convierte tipos).
+    """
+    return [None if valor is None or valor != valor else str(valor) for valor in valores]
+
+@pytest.mark.parametrize("acta", ACTAS_EJEMPLO)
+def test_columna_y_cabecera_como_pandas(acta):
+    valores, cabecera = leer_columna_con_cabecera(acta, "M")
+    df = pd.read_excel(acta, header=None)
+
+    assert normalizar(valores) == normalizar(df.iloc[:, 12].tolist())
+    assert cabecera["columnas"] == len(df.columns)
+    assert normalizar(cabecera["fila"]) == normalizar(df.iloc[cabecera["posicion"]].tolist())
+
+@pytest.mark.parametrize("acta", ACTAS_EJEMPLO)
+def test_resultados_como_pandas(acta, monkeypatch):
+    en_streaming = extraer_resultado_de_excel.extraer_resultado_detallado(acta, usar_cache=False)
+
+    def sin_streaming(*args, **kwargs):
+        raise FormatoNoCompatible("forzar pandas")
+
+    monkeypatch.setattr(extraer_resultado_de_excel, "leer_columna_con_cabecera", sin_streaming)
+    con_pandas = extraer_resultado_de_excel.extraer_resultado_detallado(acta, usar_cache=False)
+
+    assert en_streaming["resultados"] == con_pandas["resultados"]
+    assert en_streaming["fila_inicio"] == con_pandas["fila_inicio"]
+    assert sum(en_streaming["resultados"].values()) > 0
@@ -0,0 +1,89 @@
+"""
+Localizador del marcador DSP_NOMID1: búsqueda, huella de la disposición y
+disposiciones recordadas en la caché.
+"""
+
+import os
+
+import pytest
+
+import localizador_cabecera
+from localizador_cabecera import (
+    LocalizadorCabecera, huella_disposicion, buscar_marcador, es_marcador, obtener_localizador
+)
+from extraer_resultado_de_excel import extraer_resultado_detallado
+from conftest import ACTAS_EJEMPLO
+
+@pytest.fixture
+def localizadores(carpeta_temporal, monkeypatch):
+    """
+    Localizadores del proceso vacíos y caché en la carpeta temporal.
+    """
+    monkeypatch.setattr(localizador_cabecera, "_localizadores", {})
+    return carpeta_temporal
+
+def test_buscar_marcador():
+    assert buscar_marcador([None, float("nan"), 3, " DSP_NOMID1 ", "DSP_NOMID1"]) == 3
+    assert buscar_marcador(["a", None]) is None
+    assert buscar_marcador([]) is None
+    assert buscar_marcador(["X", "DSP_NOMID1"], marcador="X") == 0
+
+def test_es_marcador():
+    valores = [None, "DSP_NOMID1 "]
+    assert es_marcador(valores, 1)
+    assert not es_marcador(valores, 0)
+    assert not es_marcador(valores, 2)
+    assert not es_marcador(valores, -1)
+
+def test_huella_disposicion():
+    cabecera = {"columnas": 14, "fila": ["DSP_NOMID1", None, " Nota "], "posicion": 0}
+    huella = huella_disposicion(cabecera)
+    # Celdas vacías (None o NaN) y espacios no cambian la disposición
+    assert huella_disposicion({**cabecera, "fila": ["DSP_NOMID1", float("nan"), "Nota"]}) == huella
+    assert huella_disposicion({**cabecera, "columnas": 15}) != huella
+    assert huella_disposicion({**cabecera, "posicion": 2}) != huella
+    assert huella_disposicion({**cabecera, "fila": ["DSP_NOMID1", "Nota"]}) != huella
+
+def test_disposiciones_persistentes(carpeta_temporal):
+    ruta = str(carpeta_temporal / "cache.sqlite")
+    LocalizadorCabecera(ruta).recordar("h1", 4, "M", "acta.xls")
+
+    localizador = LocalizadorCabecera(ruta)
+    assert localizador.consultar("h1") == (4, "M")
+    assert [d["archivo"] for d in localizador.listar()] == ["acta.xls"]
+    assert localizador.olvidar("h1") == 1
+    assert LocalizadorCabecera(ruta).consultar("h1") is None
+
+def test_sin_persistencia(carpeta_temporal):
+    ruta = str(carpeta_temporal / "cache.sqlite")
+    localizador = LocalizadorCabecera(ruta, persistente=False)
+    localizador.recordar("h1", 4, "M")
+    assert localizador.consultar("h1") == (4, "M")
+    assert not os.path.exists(ruta)
+
+@pytest.mark.parametrize("usar_cache", [True, False])
+def test_segunda_lectura_usa_la_disposicion(localizadores, usar_cache):
+    acta = ACTAS_EJEMPLO[0]
+    primera = extraer_resultado_detallado(acta, usar_cache=usar_cache)
+    segunda = extraer_resultado_detallado(acta, usar_cache=usar_cache)
+    assert not primera["disposicion_conocida"]
+    assert segunda["disposicion_conocida"]
+    assert segunda["resultados"] == primera["resultados"]
+    assert segunda["fila_inicio"] == primera["fila_inicio"]
+
+    # Solo con caché la disposición se guarda para otras ejecuciones
+    guardadas = obtener_localizador(usar_cache).ruta
+    assert os.path.exists(guardadas) == usar_cache
+
+def test_marcador_movido(localizadores):
+    acta = ACTAS_EJEMPLO[0]
+    esperado = extraer_resultado_detallado(acta)
+    localizador = obtener_localizador()
+    (huella, (fila, columna)), = localizador._cargar().items()
+
+    # Si el marcador ya no está donde se recordaba, se vuelve a buscar
+    localizador.recordar(huella, fila + 1, columna)
+    resultado = extraer_resultado_detallado(acta)
+    assert not resultado["disposicion_conocida"]
+    assert resultado["resultados"] == esperado["resultados"]
+    assert localizador.consultar(huella) == (fila, columna)
@@ -0,0 +1,216 @@
+"""
+Vigilancia de la Carpeta de Excels
+==================================
+
+Modo de ejecución continuo para las semanas de cierre de actas: vigila la
+carpeta de los Excel y, cuando llegan actas nuevas o cambian las existentes,
+actualiza los informes sin repetir la ejecución completa:
+- Solo se vuelven a extraer los archivos añadidos o modificados (si cambia una
+  entrega, las actas que contiene; ver ingesta_entregas)
+- Los informes se regeneran en modo incremental, de modo que solo se redibujan
+  los gráficos y secciones cuyos datos han cambiado y el .tex solo se reescribe
+  si su contenido cambia
+
+Los cambios se agrupan: tras el primer aviso se espera a que pasen unos
+segundos sin cambios (ESPERA_VIGILANCIA) antes de regenerar, para que copiar
+varias actas a la vez produzca una sola actualización.
+
+Si está instalado el paquete opcional watchdog se usan las notificaciones del
+sistema de archivos; si no, se comprueba la carpeta cada INTERVALO_VIGILANCIA
+segundos (fecha de modificación y tamaño de cada archivo).
+
+Uso:
+    python generar_informes.py --vigilar            # Genera los informes y sigue vigilando
+
+Autor: Sergio López Ureña - Coordinació 2o curs
+"""
+
+import os
+import glob
+import time
+import threading
+
+from conjunto_datos import descubrir_archivos, extraer_archivos
+from ingesta_entregas import separar_origen, EXTENSIONES_ACTAS
+from extraer_resultado_de_excel import extraer_resultados_sin_cache
+from cache_resultados import extraer_resultados_con_cache
+from config import DIRECTORIO_EXCELS, ESPERA_VIGILANCIA, INTERVALO_VIGILANCIA
+
+class CambiosPendientes:
+    """
+    Rutas cambiadas desde la última actualización, compartidas entre el hilo que
+    recibe los avisos y el bucle principal.
+    """
+
+    def __init__(self):
+        self._rutas = set()
+        self._ultimo = None
+        self._cerrojo = threading.Lock()
+
+    def anotar(self, ruta):
+        """
+        Anota el cambio de un archivo Excel o de una entrega (las demás rutas se ignoran).
+        """
+        if not ruta.lower().endswith(EXTENSIONES_ACTAS + (".zip",)):
+            return
+        with self._cerrojo:
+            self._rutas.add(os.path.normpath(os.path.relpath(ruta)))
+            self._ultimo = time.monotonic()
+
+    def recoger(self, espera):
+        """
+        Devuelve las rutas cambiadas si han pasado `espera` segundos desde el último
+        cambio, vaciando la lista; si no, devuelve None.
+        """
+        with self._cerrojo:
+            if not self._rutas or time.monotonic() - self._ultimo < espera:
+                return None
+            rutas, self._rutas = self._rutas, set()
+            return rutas
+
+def _instantanea(directorio):
+    """
+    Fecha de modificación y tamaño de cada Excel de la carpeta y de cada entrega de su raíz.
+
+    Returns:
+        dict: {ruta: (mtime_ns, tamaño)}
+    """
+    instantanea = {}
+    rutas = glob.glob(os.path.join(directorio, "*", "*.xls"))
+    rutas += [ruta for ruta in glob.glob(os.path.join(directorio, "*"))
+              if ruta.lower().endswith(EXTENSIONES_ACTAS + (".zip",))]
+    for ruta in rutas:
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            continue  # Eliminado entre el glob y el stat
+        instantanea[os.path.normpath(ruta)] = (estado.st_mtime_ns, estado.st_size)
+    return instantanea
+
+def _vigilar_con_watchdog(directorio, pendientes):
+    """
+    Registra los cambios con las notificaciones del sistema de archivos.
+
+    Returns:
+        Observer: Observador de watchdog en marcha, o None si watchdog no está instalado
+    """
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        return None
+
+    class Manejador(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            pendientes.anotar(event.src_path)
+            if getattr(event, "dest_path", None):  # Renombrados: cuenta el destino
+                pendientes.anotar(event.dest_path)
+
+    observador = Observer()
+    observador.schedule(Manejador(), directorio, recursive=True)
+    observador.start()
+    return observador
+
+def actualizar_conjunto(conjunto, cambiados, jobs=None, usar_cache=True, directorio=None, fragmento=None):
+    """
+    Actualiza un conjunto de datos (ver conjunto_datos) tras cambios en los Excel:
+    vuelve a descubrir los archivos, extrae solo los nuevos o modificados y olvida
+    los eliminados.
+
+    Args:
+        conjunto (dict): Conjunto de datos a actualizar (se modifica en el sitio)
+        cambiados (set): Rutas de los archivos cambiados
+        jobs (int): Número de procesos para extraer los Excel
+        usar_cache (bool): Si True, reutiliza los resultados de la caché persistente
+        directorio (str): Directorio base de los Excel (None = DIRECTORIO_EXCELS)
+        fragmento (str): Si se indica, solo las actas de ese fragmento (ver descubrir_archivos)
+
+    Returns:
+        tuple: (archivos extraídos, archivos eliminados)
+    """
+    carpetas = descubrir_archivos(directorio, fragmento=fragmento)
+    actuales = {archivo for info in carpetas.values() for archivo in info["archivos"]}
+    extracciones = conjunto["extracciones"]
+
+    eliminados = sorted(set(extracciones) - actuales)
+    for archivo in eliminados:
+        del extracciones[archivo]
+
+    # Las actas de una entrega cambian cuando cambia el zip o libro que las contiene
+    origenes = {}
+    for info in carpetas.values():
+        origenes.update(info.get("origenes", {}))
+    cambiados = {os.path.normpath(ruta) for ruta in cambiados}
+    a_extraer = sorted(
+        archivo for archivo in actuales
+        if archivo not in extracciones
+        or os.path.normpath(separar_origen(origenes.get(archivo, archivo))[0]) in cambiados
+    )
+    extraer = extraer_resultados_con_cache if usar_cache else extraer_resultados_sin_cache
+    for archivo, resultados, error in extraer_archivos(carpetas, a_extraer, extraer, jobs):
+        extracciones[archivo] = (resultados, error)
+
+    conjunto["carpetas"] = carpetas
+    return a_extraer, eliminados
+
+def vigilar(conjunto, regenerar, jobs=None, usar_cache=True, directorio=None,
+            espera=None, intervalo=None, fragmento=None):
+    """
+    Vigila la carpeta de los Excel hasta que se interrumpe con Ctrl+C. Tras cada
+    grupo de cambios actualiza el conjunto y llama a regenerar(conjunto).
+
+    Args:
+        conjunto (dict): Conjunto de datos ya extraído (ver conjunto_datos)
+        regenerar (callable): Función que regenera los informes a partir del conjunto
+        jobs (int): Número de procesos para extraer los Excel
+        usar_cache (bool): Si True, reutiliza los resultados de la caché persistente
+        directorio (str): Directorio base de los Excel (None = DIRECTORIO_EXCELS)
+        espera (float): Segundos sin cambios antes de regenerar (None = ESPERA_VIGILANCIA)
+        intervalo (float): Segundos entre comprobaciones sin watchdog (None = INTERVALO_VIGILANCIA)
+        fragmento (str): Si se indica, solo las actas de ese fragmento (ver descubrir_archivos)
+    """
+    directorio = directorio or DIRECTORIO_EXCELS
+    espera = ESPERA_VIGILANCIA if espera is None else espera
+    intervalo = INTERVALO_VIGILANCIA if intervalo is None else intervalo
+
+    pendientes = CambiosPendientes()
+    observador = _vigilar_con_watchdog(directorio, pendientes)
+    if observador is not None:
+        print(f"👀 Vigilando {directorio} (notificaciones del sistema). Ctrl+C para terminar.")
+    else:
+        print(f"👀 Vigilando {directorio} (comprobación cada {intervalo:g} s; "
+              "instala watchdog para recibir notificaciones). Ctrl+C para terminar.")
+    anterior = _instantanea(directorio) if observador is None else None
+
+    try:
+        while True:
+            time.sleep(min(intervalo, espera) if observador is None else 0.2)
+            if observador is None:
+                actual = _instantanea(directorio)
+                for ruta in set(anterior) | set(actual):
+                    if anterior.get(ruta) != actual.get(ruta):
+                        pendientes.anotar(ruta)
+                anterior = actual
+
+            cambiados = pendientes.recoger(espera)
+            if cambiados is None:
+                continue
+
+            inicio = time.perf_counter()
+            extraidos, eliminados = actualizar_conjunto(conjunto, cambiados, jobs, usar_cache, directorio, fragmento)
+            if not extraidos and not eliminados:
+                continue
+            print(f"\n🔄 Cambios detectados: {len(extraidos)} actas leídas, {len(eliminados)} eliminadas")
+            for archivo, (_, error) in ((a, conjunto["extracciones"][a]) for a in extraidos):
+                if error is not None:
+                    print(f"  ❌ Error procesando {archivo}: {error}")
+            regenerar(conjunto)
+            print(f"✅ Informes actualizados en {time.perf_counter() - inicio:.1f} s")
+    except KeyboardInterrupt:
+        print("\n👋 Vigilancia terminada")
+    finally:
+        if observador is not None:
+            observador.stop()
+            observador.join()